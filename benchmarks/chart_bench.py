@@ -0,0 +1,42 @@
+# benchmarks/chart_bench.py
+"""
+mplfinance çizicisi ile hızlı Agg çizicisini karşılaştırır (süre ve çıktı boyutu).
+Kullanım: python -m benchmarks.chart_bench [tekrar]
+"""
+import sys
+import time
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+
+from services.chart_service import ChartService
+from services.fast_chart import FastChartRenderer
+from services.indicator_engine import IndicatorEngine
+from benchmarks.fixtures import synthetic_ohlcv
+
+def measure(func, repeat: int):
+    func()  # ısınma
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return np.median(timings), len(out)
+
+def main(repeat: int = 20):
+    df = synthetic_ohlcv()
+    support, resistance = float(df["Low"].iloc[-50:].min()), float(df["High"].iloc[-50:].max())
+    sma50 = IndicatorEngine.compute(df)["sma50"]
+    renderer = FastChartRenderer(ChartService.WIDTH, ChartService.HEIGHT, bars=ChartService.PLOT_BARS)
+
+    cases = [("mplfinance png", lambda: ChartService.create_chart(df, "BENCH", support, resistance).getvalue())]
+    for fmt in ("png", "webp", "jpeg"):
+        cases.append((f"fast {fmt}", lambda fmt=fmt: renderer.render(df, "BENCH", sma50, support, resistance, fmt=fmt)))
+
+    print(f"{'çizici':<16}{'medyan ms':>12}{'boyut KB':>12}")
+    for name, func in cases:
+        ms, size = measure(func, repeat)
+        print(f"{name:<16}{ms:>12.1f}{size / 1024:>12.1f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
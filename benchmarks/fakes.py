@@ -0,0 +1,234 @@
+# benchmarks/fakes.py
+"""
+Ağsız çalışma için yfinance / Gemini / Telegram (handler ve Bot API) yerine geçenler.
+offline() bağlamı içinde servisler fixture verisini ve sahte Gemini modelini kullanır;
+bar deposu kapatılır ve cache'ler boşaltılır.
+"""
+import json
+import time
+import asyncio
+import contextlib
+from unittest import mock
+import pandas as pd
+import yfinance as yf
+from telegram.request import BaseRequest
+from benchmarks import fixtures
+
+class FakeMarket:
+    """
+    Interval başına bir fixture sunar. Sembolden bağımsızdır (her sembol aynı seriyi görür).
+    latency: her isteğe eklenecek bekleme (sn), ağ gecikmesini taklit etmek için.
+    """
+
+    def __init__(self, frames: dict, latency: float = 0.0, currency: str = "TRY"):
+        self.frames = frames  # interval -> DataFrame
+        self.latency = latency
+        self.currency = currency
+        self.calls = 0
+
+    def history(self, period=None, interval="1d", start=None, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        df = self.frames.get(interval)
+        if df is None:
+            return pd.DataFrame()
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df
+
+    def ticker(self, symbol):
+        market = self
+
+        class _Ticker:
+            def __init__(self, symbol):
+                self.ticker = symbol
+                self.info = {"currency": market.currency}
+
+            @property
+            def fast_info(self):
+                market.calls += 1
+                if market.latency:
+                    time.sleep(market.latency)
+                last = float(market.frames["1d"]["Close"].iloc[-1])
+                return type("FastInfo", (), {
+                    "last_price": last, "currency": market.currency, "exchange": "IST", "timezone": "Europe/Istanbul",
+                })()
+
+            def history(self, **kwargs):
+                return market.history(**kwargs)
+
+        return _Ticker(symbol)
+
+    def download(self, tickers, period=None, interval="1d", **kwargs):
+        """yf.download(group_by="column") biçiminde (alan, sembol) kolonlu çerçeve."""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        df = self.frames.get(interval)
+        if df is None:
+            return pd.DataFrame()
+        panel = pd.concat({t: df for t in tickers}, axis=1)
+        return panel.swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+class _Stream:
+    def __init__(self, words, delay):
+        self.words = words
+        self.delay = delay
+
+    async def __aiter__(self):
+        for word in self.words:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield _Chunk(word + " ")
+
+class FakeGeminiModel:
+    """GenerativeModel yerine geçer; sabit yorum döner."""
+    TEXT = "Teknik görünüm kararsız; destek bölgesi korunursa tepki gelebilir, stop seviyesine dikkat edilmeli."
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return _Chunk(self.TEXT)
+
+    async def generate_content_async(self, prompt, stream=True, **kwargs):
+        self.calls += 1
+        words = self.TEXT.split()
+        return _Stream(words, self.latency / max(len(words), 1))
+
+def clear_caches():
+    """Servis cache'lerini boşaltır (soğuk yol ölçümü için)."""
+    from services.market_data import MarketDataService
+    from services.indicator_engine import IndicatorEngine
+    from services.chart_service import ChartService
+    from services.ai_service import AIService
+    from services.report_service import ReportService
+    from services.media_cache import MediaCache
+    from services.quote_service import QuoteService
+    MarketDataService._cache.clear()
+    ChartService._cache.clear()
+    AIService._cache.clear()
+    ReportService._cache.clear()
+    MediaCache.clear()
+    QuoteService._cache.clear()
+    QuoteService._meta.clear()
+    with IndicatorEngine._lock:
+        IndicatorEngine._cache.clear()
+
+@contextlib.contextmanager
+def offline(daily: str = "daily_500", intraday: str = "m1_1000", market_latency: float = 0.0, ai_latency: float = 0.0):
+    """Servisleri fixture verisi + sahte Gemini ile çalıştırır."""
+    from services.market_data import MarketDataService
+    from services.ai_service import AIService
+
+    market = FakeMarket({"1d": fixtures.load(daily), "1m": fixtures.load(intraday)}, latency=market_latency)
+    model = FakeGeminiModel(latency=ai_latency)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(yf, "Ticker", market.ticker))
+        stack.enter_context(mock.patch.object(yf, "download", market.download))
+        stack.enter_context(mock.patch.object(MarketDataService, "BAR_STORE_PATH", ""))
+        stack.enter_context(mock.patch.object(MarketDataService, "_store", None))
+        stack.enter_context(mock.patch.object(AIService, "_model", model))
+        clear_caches()
+        try:
+            yield market, model
+        finally:
+            clear_caches()
+
+# --- Telegram ---
+
+class FakeMessage:
+    def __init__(self, message_id: int = 1):
+        self.message_id = message_id
+
+    async def reply_text(self, text, **kwargs):
+        return FakeMessage(self.message_id + 1)
+
+class FakeBot:
+    def __init__(self):
+        self.edits = 0
+        self.photos = 0
+
+    async def edit_message_text(self, **kwargs):
+        self.edits += 1
+
+    async def send_photo(self, **kwargs):
+        self.photos += 1
+        message = FakeMessage()
+        message.photo = [type("PhotoSize", (), {"file_id": f"photo-{self.photos}"})()]
+        return message
+
+    async def send_message(self, **kwargs):
+        return FakeMessage()
+
+class FakeUpdate:
+    def __init__(self, chat_id: int = 1, user_id: int = 1):
+        self.effective_chat = type("Chat", (), {"id": chat_id})()
+        self.effective_user = type("User", (), {"id": user_id, "first_name": "Bench"})()
+        self.message = FakeMessage()
+
+class FakeContext:
+    def __init__(self, args, bot: FakeBot = None):
+        self.args = list(args)
+        self.bot = bot or FakeBot()
+
+class FakeTelegramRequest(BaseRequest):
+    """
+    Bot API yerine geçen request: her metoda başarılı, sahte bir yanıt döner.
+    Gerçek Application/Bot ile (webhook sunucusu dahil) ağsız çalışmak için kullanılır.
+    """
+    BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = {}
+        self._message_id = 0
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _message(self, data: dict, photo: bool = False) -> dict:
+        self._message_id += 1
+        message = {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": int(data.get("chat_id") or 1), "type": "private"},
+            "from": self.BOT_USER,
+        }
+        if "text" in data:
+            message["text"] = data["text"]
+        if photo:
+            message["photo"] = [{"file_id": f"photo-{self._message_id}", "file_unique_id": f"u{self._message_id}", "width": 960, "height": 640}]
+        return message
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        data = request_data.parameters if request_data is not None else {}
+        if endpoint == "getMe":
+            result = self.BOT_USER
+        elif endpoint in ("sendMessage", "editMessageText", "sendPhoto"):
+            result = self._message(data, photo=endpoint == "sendPhoto")
+        else:
+            result = True
+        return 200, json.dumps({"ok": True, "result": result}).encode("utf-8")
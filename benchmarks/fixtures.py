@@ -0,0 +1,75 @@
+# benchmarks/fixtures.py
+"""
+Benchmark OHLCV verileri.
+benchmarks/fixtures/<ad>.csv.gz varsa (record ile kaydedilmiş gerçek veri) o kullanılır;
+yoksa aynı boyutta, sabit tohumla üretilmiş sentetik seri döner. Böylece suite ağsız çalışır
+ve her çalıştırmada aynı veriyi görür.
+
+Kayıt: python -m benchmarks.fixtures record THYAO 1d 10y daily_5000
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# ad -> (interval, bar sayısı, tohum)
+FIXTURES = {
+    "daily_60": ("1d", 60, 1),
+    "daily_500": ("1d", 500, 2),
+    "daily_5000": ("1d", 5000, 3),
+    "m1_1000": ("1m", 1000, 4),
+    "m1_10000": ("1m", 10000, 5),
+    "m1_50000": ("1m", 50000, 6),
+}
+
+_FREQ = {"1m": "min", "1h": "h", "1d": "D"}
+_VOL = {"1m": 0.0008, "1h": 0.004, "1d": 0.015}
+_loaded = {}
+
+def synthetic_ohlcv(n: int = 300, seed: int = 0, interval: str = "1d") -> pd.DataFrame:
+    """Rastgele yürüyüş OHLCV (yfinance history() kolonları ve Europe/Istanbul indeksiyle)."""
+    rng = np.random.default_rng(seed)
+    sigma = _VOL.get(interval, 0.01)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, sigma, n)))
+    open_ = close * (1 + rng.normal(0, sigma / 3, n))
+    high = np.maximum(open_, close) * (1 + rng.exponential(sigma / 2, n))
+    low = np.minimum(open_, close) * (1 - rng.exponential(sigma / 2, n))
+    volume = rng.lognormal(12, 0.6, n).round()
+    index = pd.date_range("2020-01-01", periods=n, freq=_FREQ.get(interval, "D"), tz="Europe/Istanbul")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+def load(name: str) -> pd.DataFrame:
+    """Fixture'ı döner (süreç içinde bir kez okunur / üretilir; değiştirilmemelidir)."""
+    if name not in _loaded:
+        path = os.path.join(FIXTURE_DIR, f"{name}.csv.gz")
+        if os.path.exists(path):
+            df = pd.read_csv(path, index_col=0)
+            df.index = pd.to_datetime(df.index, utc=True).tz_convert("Europe/Istanbul")
+        else:
+            interval, bars, seed = FIXTURES[name]
+            df = synthetic_ohlcv(bars, seed, interval)
+        _loaded[name] = df
+    return _loaded[name]
+
+def interval_of(name: str) -> str:
+    return FIXTURES[name][0]
+
+def record(symbol: str, interval: str, period: str, name: str):
+    """Gerçek veriyi (ağ gerekir) fixture olarak kaydeder."""
+    import yfinance as yf
+    data = yf.Ticker(symbol).history(period=period, interval=interval)
+    if data.empty:
+        print("Veri alınamadı.")
+        return
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f"{name}.csv.gz")
+    data[["Open", "High", "Low", "Close", "Volume"]].to_csv(path)
+    print(f"{len(data)} bar -> {path}")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 6 and sys.argv[1] == "record":
+        record(*sys.argv[2:])
+    else:
+        print("Kullanım: python -m benchmarks.fixtures record <SEMBOL> <interval> <period> <ad>")
@@ -0,0 +1,172 @@
+# benchmarks/run.py
+"""
+Ağsız benchmark suite'i. Fixture verisi ve sahte yfinance/Gemini ile analiz, grafik ve
+/analiz handler'ının uçtan uca süresini ölçer; baseline.json ile karşılaştırıp gerilemeleri işaretler.
+
+Kullanım:
+    python -m benchmarks.run                       # ölç + baseline ile karşılaştır
+    python -m benchmarks.run --filter signals      # adında 'signals' geçen vakalar
+    python -m benchmarks.run --save-baseline       # mevcut sonuçları baseline yap
+Gerileme varsa çıkış kodu 1'dir.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+
+from benchmarks import fixtures
+from benchmarks.fakes import offline, clear_caches, FakeUpdate, FakeContext
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+class Case:
+    """Bir ölçüm: setup her tekrardan önce çalışır ve süreye dahil değildir."""
+
+    def __init__(self, name, func, setup=None, repeat=None, is_async=False):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.repeat = repeat
+        self.is_async = is_async
+
+def _fresh_indicators():
+    # IndicatorEngine sonucu çerçeve kimliğiyle hatırlar; her tekrar gerçekten hesaplasın
+    from services.indicator_engine import IndicatorEngine
+    with IndicatorEngine._lock:
+        IndicatorEngine._cache.clear()
+
+def build_cases():
+    from services.analysis_service import AnalysisService
+    from services.chart_service import ChartService
+    from services.fast_chart import FastChartRenderer
+    from services.bar_series import BarSeries
+    from handlers.commands import analyze_command
+
+    cases = []
+    for name in ("daily_60", "daily_500", "daily_5000", "m1_10000", "m1_50000"):
+        # Üretimdeki gibi cache'in tuttuğu diziler üzerinde
+        df = BarSeries.from_frame(fixtures.load(name))
+        close = df["Close"]
+        cases.append(Case(f"peaks_troughs/{name}", lambda s=close: AnalysisService._get_peaks_troughs(s, window=2)))
+        cases.append(Case(f"rsi_divergence/{name}", lambda d=df: AnalysisService.detect_rsi_divergence(d), setup=_fresh_indicators))
+        cases.append(Case(f"technical_signals/{name}", lambda d=df: AnalysisService.calculate_technical_signals(d), setup=_fresh_indicators))
+
+    chart_df = BarSeries.from_frame(fixtures.load("daily_500"))
+    support = float(chart_df["Low"][-51:-1].min())
+    resistance = float(chart_df["High"][-51:-1].max())
+    cases.append(Case(
+        "create_chart/daily_500",
+        lambda: ChartService.create_chart(chart_df, "BENCH", support, resistance),
+        setup=_fresh_indicators, repeat=10,
+    ))
+    renderer = FastChartRenderer(ChartService.WIDTH, ChartService.HEIGHT, bars=ChartService.PLOT_BARS)
+    cases.append(Case(
+        "fast_chart/daily_500",
+        lambda: renderer.render(chart_df, "BENCH", None, support, resistance),
+        repeat=10,
+    ))
+
+    # Uçtan uca: /analiz THYAO 1d (veri çekme + analiz + rapor + grafik + AI akışı)
+    async def analyze():
+        context = FakeContext(["THYAO", "1d"])
+        await analyze_command(FakeUpdate(), context)
+        if context.bot.photos != 1:
+            raise RuntimeError("grafik gönderilmedi")
+
+    cases.append(Case("analyze_e2e/cold", analyze, setup=clear_caches, repeat=10, is_async=True))
+    cases.append(Case("analyze_e2e/warm", analyze, repeat=10, is_async=True))
+    return cases
+
+def measure(case: Case, loop, repeat: int) -> dict:
+    def once():
+        if case.setup:
+            case.setup()
+        started = time.perf_counter()
+        if case.is_async:
+            loop.run_until_complete(case.func())
+        else:
+            case.func()
+        return (time.perf_counter() - started) * 1000
+
+    once()  # ısınma (havuzlar, import'lar, ilk çağrı)
+    timings = np.array([once() for _ in range(case.repeat or repeat)])
+    return {
+        "median_ms": round(float(np.median(timings)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+        "runs": len(timings),
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """Baseline'a göre tolerance oranından VE min_delta_ms'den fazla yavaşlayan vakalar."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        delta = result["median_ms"] - base["median_ms"]
+        if delta > min_delta_ms and result["median_ms"] > base["median_ms"] * (1 + tolerance):
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Ağsız benchmark suite'i")
+    parser.add_argument("--filter", default="", help="Sadece adında bu metin geçen vakalar")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="İzin verilen yavaşlama oranı")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Bunun altındaki farklar gürültü sayılır")
+    parser.add_argument("--json", help="Sonuçları bu dosyaya da yaz")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        with offline():
+            for case in build_cases():
+                if args.filter not in case.name:
+                    continue
+                results[case.name] = measure(case, loop, args.repeat)
+                base = baseline.get(case.name, {}).get("median_ms")
+                ratio = f"{results[case.name]['median_ms'] / base:.2f}x" if base else "-"
+                print(f"{case.name:<32}{results[case.name]['median_ms']:>12.2f} ms{ratio:>10}")
+    finally:
+        from services.executor import ExecutionService
+        from services.chart_service import ChartService
+        ExecutionService.shutdown()
+        ChartService.shutdown()
+        loop.close()
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "regressions": regressions}, f, indent=2)
+    if args.save_baseline:
+        merged = dict(baseline, **results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "results": merged,
+            }, f, indent=2)
+        print(f"Baseline güncellendi: {args.baseline}")
+
+    if regressions:
+        print(f"⚠️ Gerileme ({int(args.tolerance * 100)}% üstü): {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
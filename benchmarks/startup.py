@@ -0,0 +1,68 @@
+# benchmarks/startup.py
+"""
+Soğuk başlangıç raporu. `python -X importtime` ile temiz bir süreçte bot modülünü import eder
+ve import süresini üst seviye paket bazında toplar (kendi süreleri, iç içe import'lar çift sayılmaz).
+
+Kullanım:
+    python -m benchmarks.startup                   # main.py'nin import maliyeti
+    python -m benchmarks.startup --module handlers.commands --top 20
+    python -m benchmarks.startup --target-ms 1500  # hedef aşılırsa çıkış kodu 1
+"""
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure(module: str) -> list:
+    """[(modül, kendi süresi µs, kümülatif µs)] — import sırasıyla."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import başarısız")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+def by_package(rows) -> dict:
+    """Kendi sürelerini üst seviye pakete göre toplar (ms)."""
+    totals = defaultdict(float)
+    for name, self_us, _ in rows:
+        totals[name.split(".")[0]] += self_us / 1000
+    return dict(totals)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import süresi raporu")
+    parser.add_argument("--module", default="main", help="Import edilecek modül")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target-ms", type=float, default=float(os.getenv("STARTUP_TARGET_MS", "0") or 0),
+                        help="Toplam import süresi hedefi (0: kontrol yok)")
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    packages = by_package(rows)
+    total_ms = sum(packages.values())
+
+    print(f"{'paket':<28}{'ms':>10}{'pay':>8}")
+    for name, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<28}{ms:>10.1f}{ms / total_ms * 100 if total_ms else 0:>7.0f}%")
+    print(f"{'toplam':<28}{total_ms:>10.1f}   ({len(rows)} modül)")
+
+    if args.target_ms and total_ms > args.target_ms:
+        print(f"⚠️ Hedef aşıldı: {total_ms:.0f} ms > {args.target_ms:.0f} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# benchmarks/webhook_local.py
+"""
+Webhook modunu yerelde dener. Gerçek Application'ı (main.build_app) sahte Bot API,
+fixture verisi ve sahte Gemini ile webhook sunucusu olarak başlatır; sonra sentetik
+Telegram güncellemelerini HTTP ile webhook'a POST eder ve eşzamanlılık / geri basınç
+sonuçlarını raporlar. Ağ veya token gerekmez (python-telegram-bot[webhooks] gerekir).
+
+Kullanım:
+    python -m benchmarks.webhook_local                        # 8 kullanıcı x 3 /analiz
+    python -m benchmarks.webhook_local --users 50 --per-user 5 --text "/fiyat THYAO"
+    python -m benchmarks.webhook_local --market-latency 0.5   # yavaş Yahoo taklidi
+"""
+import sys
+import time
+import asyncio
+import argparse
+import httpx
+import matplotlib
+matplotlib.use("Agg")
+
+from benchmarks.fakes import offline, FakeTelegramRequest
+
+SECRET = "local-secret"
+
+def synthetic_update(update_id: int, user_id: int, text: str, chat_id: int = None) -> dict:
+    """Bot komutu içeren özel sohbet mesajı güncellemesi (Bot API JSON biçiminde)."""
+    command = text.split()[0]
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id or user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+        },
+    }
+
+async def post_updates(url: str, updates: list) -> list:
+    """Güncellemeleri aynı anda POST eder; HTTP durum kodlarını döner."""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+    async with httpx.AsyncClient(timeout=30) as client:
+        responses = await asyncio.gather(*(client.post(url, json=u, headers=headers) for u in updates))
+    return [r.status_code for r in responses]
+
+async def wait_idle(processor, expected: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = processor.stats()
+        if stats["processed"] + stats["rejected"] >= expected and stats["in_flight"] == 0:
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+async def run(args) -> int:
+    from main import build_app
+    from services.metrics import Metrics
+    from services.executor import ExecutionService
+    from services.chart_service import ChartService
+
+    telegram = FakeTelegramRequest(latency=args.api_latency)
+    app = build_app("123456:LOCAL", telegram)
+    processor = app.update_processor
+    url = f"http://127.0.0.1:{args.port}/{args.path}"
+
+    await app.initialize()
+    await app.updater.start_webhook(
+        listen="127.0.0.1", port=args.port, url_path=args.path,
+        webhook_url=f"https://local.invalid/{args.path}", secret_token=SECRET,
+    )
+    await app.start()
+    try:
+        updates = [
+            synthetic_update(user * args.per_user + i + 1, user_id=1000 + user, text=args.text)
+            for user in range(args.users)
+            for i in range(args.per_user)
+        ]
+        started = time.perf_counter()
+        codes = await post_updates(url, updates)
+        accepted_ms = (time.perf_counter() - started) * 1000
+        idle = await wait_idle(processor, len(updates), args.timeout)
+        total_ms = (time.perf_counter() - started) * 1000
+    finally:
+        await app.updater.stop()
+        await app.stop()
+        await app.shutdown()
+        ExecutionService.shutdown()
+        ChartService.shutdown()
+
+    stats = processor.stats()
+    print(f"gönderilen       {len(updates)} (HTTP 200: {codes.count(200)})")
+    print(f"kabul süresi     {accepted_ms:.0f} ms (webhook yanıtları)")
+    print(f"toplam süre      {total_ms:.0f} ms")
+    print(f"işlenen          {stats['processed']}")
+    print(f"sıraya alınan    {stats['queued']}")
+    print(f"reddedilen       {stats['rejected']}")
+    print(f"Bot API çağrıları {dict(sorted(telegram.calls.items()))}")
+    for stage, m in Metrics.snapshot().items():
+        if stage.startswith(("cmd.", "update.")):
+            print(f"  {stage:<22}{m['count']:>6}  p50 {m['p50_ms']} ms  p95 {m['p95_ms']} ms")
+
+    if not idle:
+        print(f"⚠️ {args.timeout}s içinde tüm güncellemeler bitmedi.")
+        return 1
+    return 0 if codes.count(200) == len(updates) else 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel webhook yük denemesi")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--per-user", type=int, default=3, help="Kullanıcı başına aynı anda gönderilen güncelleme")
+    parser.add_argument("--text", default="/analiz THYAO 1d")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--path", default="telegram")
+    parser.add_argument("--market-latency", type=float, default=0.0, help="Sahte Yahoo gecikmesi (sn)")
+    parser.add_argument("--ai-latency", type=float, default=0.0, help="Sahte Gemini gecikmesi (sn)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Sahte Bot API gecikmesi (sn)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    with offline(market_latency=args.market_latency, ai_latency=args.ai_latency):
+        code = asyncio.run(run(args))
+    sys.exit(code)
+
+if __name__ == "__main__":
+    main()
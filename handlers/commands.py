@@ -1,11 +1,35 @@
 # handlers/commands.py
-from telegram import Update
+import os
+import asyncio
+from uuid import uuid4
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
+from telegram.error import RetryAfter, Forbidden, BadRequest, TelegramError
 from services.market_data import MarketDataService
-from services.analysis_service import AnalysisService
+from services.quote_service import QuoteService
 from services.chart_service import ChartService
 from services.ai_service import AIService
+from services.executor import ExecutionService
+from services.scanner_service import ScannerService
+from services.alert_service import AlertService
+from services.backtest_service import BacktestService
+from services.report_service import ReportService
+from services.media_cache import MediaCache
+from services.symbol_directory import SymbolDirectory
+from services.job_queue import JobQueue
+from services.metrics import Metrics
+from services import lazy
+
+# /fiyat komutunda tek mesajda en fazla bu kadar sembol
+MAX_QUOTE_SYMBOLS = int(os.getenv("MAX_QUOTE_SYMBOLS", "10"))
+# Telegram aynı mesajın sık düzenlenmesini kısıtlar (~1 düzenleme/sn)
+AI_EDIT_INTERVAL = float(os.getenv("AI_EDIT_INTERVAL", "1.5"))
+# /stats komutunu kullanabilecek Telegram kullanıcı id'leri (virgülle)
+ADMIN_IDS = {int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit()}
+# Inline sorguda gösterilecek en fazla sonuç ve Telegram tarafında cache süresi (sn)
+INLINE_RESULTS = 10
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_first_name = update.effective_user.first_name
@@ -13,37 +37,74 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"Selam {user_first_name}! 👋\n"
         "Borsa Takip Asistanı hazırım.\n\n"
         "📊 Komutlar:\n"
-        "`/fiyat <KOD>` -> Anlık fiyat\n"
+        "`/fiyat <KOD> [<KOD> ...]` -> Anlık fiyat\n"
         "`/analiz <KOD> [<interval>]` -> Teknik analiz. Interval örn: 1d, 1h, 15m\n"
+        "`/tara [BIST30|BIST100|KRIPTO] [<interval>] [<adet>]` -> Piyasa taraması\n"
+        "`/alarm <KOD> <fiyat>` -> Fiyat alarmı (`/alarm` liste, `/alarm sil <no>` sil)\n"
+        "`/backtest <KOD> [<interval>]` -> Sinyallerin geçmiş performansı\n"
         "Örn: `/analiz THYAO 1d` veya `/analiz BTC-USD 60m`",
         parse_mode=ParseMode.MARKDOWN
     )
 
+async def _resolve_symbol(update: Update, symbol: str):
+    """
+    Sembolü yerel dizinle ağa çıkmadan doğrular. Yahoo'da olmadığı bilinen sembol tek adaya
+    denk geliyorsa düzeltilmiş kodu döner; belirsizse adayları yazıp None döner. Diğer semboller
+    olduğu gibi denenir.
+    """
+    resolved = SymbolDirectory.resolve(symbol)
+    if resolved["symbol"] is None:
+        hint = _did_you_mean(resolved["suggestions"]) or " Sembol kodunu kontrol edin."
+        await update.message.reply_text(f"❌ *{symbol.upper()}* bulunamadı.{hint}", parse_mode=ParseMode.MARKDOWN)
+        return None
+    if resolved["corrected"]:
+        await update.message.reply_text(f"✏️ *{symbol.upper()}* yerine *{resolved['symbol']}* kullanılıyor.", parse_mode=ParseMode.MARKDOWN)
+    return resolved["symbol"]
+
+def _did_you_mean(suggestions) -> str:
+    """Veri alınamayan sembol için yazım hatası adayları (yoksa boş)."""
+    if not suggestions:
+        return ""
+    return " Bunu mu demek istediniz: " + ", ".join(f"`{s}`" for s in suggestions)
+
+@Metrics.instrument("cmd.fiyat")
 async def get_price_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
-        await update.message.reply_text("⚠️ Lütfen bir hisse kodu girin.\nÖrn: `/fiyat GARAN`", parse_mode=ParseMode.MARKDOWN)
+        await update.message.reply_text("⚠️ Lütfen bir hisse kodu girin.\nÖrn: `/fiyat GARAN` veya `/fiyat GARAN THYAO`", parse_mode=ParseMode.MARKDOWN)
         return
 
-    symbol = context.args[0]
-    wait_msg = await update.message.reply_text(f"🔍 *{symbol.upper()}* verileri çekiliyor...", parse_mode=ParseMode.MARKDOWN)
-
-    result = MarketDataService.get_stock_price(symbol)
+    # Birden çok sembol tek toplu istekle fiyatlanır
+    symbols = []
+    for arg in context.args[:MAX_QUOTE_SYMBOLS]:
+        resolved = SymbolDirectory.resolve(arg)
+        symbols.append(resolved["symbol"] or arg.upper())
+    symbols = list(dict.fromkeys(symbols))
+    wait_msg = await update.message.reply_text(f"🔍 *{', '.join(symbols)}* verileri çekiliyor...", parse_mode=ParseMode.MARKDOWN)
 
-    if result:
-        message = (
-            f"📈 *{result['symbol']}*\n"
-            f"💰 Fiyat: `{result['price']} {result['currency']}`"
-        )
-        await context.bot.edit_message_text(chat_id=update.effective_chat.id, message_id=wait_msg.message_id, text=message, parse_mode=ParseMode.MARKDOWN)
+    if len(symbols) == 1:
+        quote = await Metrics.timed("fetch.price", ExecutionService.run_io("fetch", QuoteService.get_quote, symbols[0]))
+        quotes = {symbols[0]: quote}
     else:
-        await context.bot.edit_message_text(chat_id=update.effective_chat.id, message_id=wait_msg.message_id, text=f"❌ *{symbol}* bulunamadı veya veri çekilemedi.", parse_mode=ParseMode.MARKDOWN)
+        quotes = await Metrics.timed("fetch.price", QuoteService.get_quotes(symbols))
+
+    lines = []
+    for symbol in symbols:
+        result = quotes.get(symbol)
+        if result:
+            lines.append(f"📈 *{result['symbol']}*\n💰 Fiyat: `{result['price']} {result['currency']}`")
+        else:
+            lines.append(f"❌ *{symbol}* bulunamadı veya veri çekilemedi.{_did_you_mean(SymbolDirectory.suggestions(symbol))}")
+    await context.bot.edit_message_text(chat_id=update.effective_chat.id, message_id=wait_msg.message_id, text="\n\n".join(lines), parse_mode=ParseMode.MARKDOWN)
 
+@Metrics.instrument("cmd.analiz")
 async def analyze_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not context.args:
         await update.message.reply_text("⚠️ Örn: `/analiz THYAO 1h`", parse_mode=ParseMode.MARKDOWN)
         return
 
-    symbol = context.args[0].upper()
+    symbol = await _resolve_symbol(update, context.args[0])
+    if symbol is None:
+        return
     interval = context.args[1] if len(context.args) > 1 else "1d"
     
     # 1. Macro Periyodu Belirle
@@ -55,26 +116,15 @@ async def analyze_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         parse_mode=ParseMode.MARKDOWN
     )
 
-    # Period ayarlamaları (Veri çekme optimizasyonu)
-    # yfinance period formatları: 1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
-    period_mapping = {
-        "1m": "5d", "5m": "5d", "15m": "1mo", "30m": "1mo",
-        "1h": "6mo", "4h": "1y", "1d": "2y", "1wk": "5y"
-    }
-    period = period_mapping.get(interval, "1y")
-    macro_period = period_mapping.get(macro_interval, "2y")
-
-    # 2. Verileri Çek (Parallel yapılabilir ama şimdilik sıralı yeterli)
-    stock_df = MarketDataService.get_historical_data(symbol, period=period, interval=interval)
-    macro_df = MarketDataService.get_historical_data(symbol, period=macro_period, interval=macro_interval)
-
-    if stock_df is None:
-        await context.bot.edit_message_text(chat_id=update.effective_chat.id, message_id=wait_msg.message_id, text="❌ Veri alınamadı.")
+    # Aynı (sembol, interval, son bar) için eşzamanlı / tekrar eden istekler tek raporu paylaşır
+    report = await ReportService.get(symbol, interval)
+    if report is None:
+        text = f"❌ Veri alınamadı.{_did_you_mean(SymbolDirectory.suggestions(symbol))}"
+        await context.bot.edit_message_text(chat_id=update.effective_chat.id, message_id=wait_msg.message_id, text=text, parse_mode=ParseMode.MARKDOWN)
         return
 
-    # 3. Analizi Başlat (Macro veriyi de gönderiyoruz)
-    analysis = AnalysisService.calculate_technical_signals(stock_df, macro_df=macro_df)
-    price_info = MarketDataService.get_stock_price(symbol)
+    analysis = report.analysis
+    price_info = report.price_info
 
     if analysis and price_info:
         # Detay listesini madde imiyle birleştir
@@ -99,62 +149,383 @@ async def analyze_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         risk_data = analysis['risk_data']
         rr_emoji = "✅" if risk_data['rr_ratio'] >= 1.5 else "⚠️"
 
-        analysis['price'] = price_info['price']
-        ai_comment = AIService.generate_market_comment(symbol, analysis)
-        
-        ai_text_block = ""
-        if ai_comment:
-            ai_text_block = f"\n🤖 *AI YORUMU (GEMINI):*\n_{ai_comment}_\n"
-        
-        message = (
-            f"📊 *{price_info['symbol']} ANALİZ RAPORU* ({interval})\n"
-            f"💰 Fiyat: `{price_info['price']} {price_info['currency']}`\n"
-            f"🏆 Skor: `{analysis['score']}` | Sinyal: *{analysis['risk_label']}*\n\n"
-            
-            f"🌍 *GENEL TREND ({macro_interval}):*\n"
-            f"Yön: `{analysis['mtf']['label']}`\n"
-            f"{div_msg}"
-            
-            f"\n🏗️ *FİYAT YAPISI (50 Mum):*\n"
-            f"{levels_txt}"
-            f"{candle_msg}"
-            f"{whale_msg}\n\n"
-            
-            f"📐 *TEKNİK GÖSTERGELER:*\n"
-            f"RSI: `{analysis['rsi']}`\n"
-            f"Hacim Trendi: `{analysis['obv_trend']}`\n\n"
-            
-            f"{ai_text_block}\n"
-            f"📋 *DETAYLAR:*\n{details_text}\n\n"
-            
-            f"⚖️ *RİSK YÖNETİMİ:*\n"
-            f"Stop: `{analysis['stop_loss']}`\n"
-            f"Hedef: `{analysis['take_profit']}`\n"
-            f"R/R Oranı: `{risk_data['rr_ratio']}` {rr_emoji}\n"
-            f"_💡 1000 TL risk için: {risk_data['qty_for_1k_risk']} adet_"
-        )
-        
-        # 1. Önce Raporu Güncelle (Metin Olarak)
+        def build_report(ai_text_block: str) -> str:
+            return (
+                f"📊 *{price_info['symbol']} ANALİZ RAPORU* ({interval})\n"
+                f"💰 Fiyat: `{price_info['price']} {price_info['currency']}`\n"
+                f"🏆 Skor: `{analysis['score']}` | Sinyal: *{analysis['risk_label']}*\n\n"
+
+                f"🌍 *GENEL TREND ({macro_interval}):*\n"
+                f"Yön: `{analysis['mtf']['label']}`\n"
+                f"{div_msg}"
+
+                f"\n🏗️ *FİYAT YAPISI (50 Mum):*\n"
+                f"{levels_txt}"
+                f"{candle_msg}"
+                f"{whale_msg}\n\n"
+
+                f"📐 *TEKNİK GÖSTERGELER:*\n"
+                f"RSI: `{analysis['rsi']}`\n"
+                f"Hacim Trendi: `{analysis['obv_trend']}`\n\n"
+
+                f"{ai_text_block}\n"
+                f"📋 *DETAYLAR:*\n{details_text}\n\n"
+
+                f"⚖️ *RİSK YÖNETİMİ:*\n"
+                f"Stop: `{analysis['stop_loss']}`\n"
+                f"Hedef: `{analysis['take_profit']}`\n"
+                f"R/R Oranı: `{risk_data['rr_ratio']}` {rr_emoji}\n"
+                f"_💡 1000 TL risk için: {risk_data['qty_for_1k_risk']} adet_"
+            )
+
+        # 1. Önce Raporu Güncelle (Metin Olarak) - AI yorumu beklenmez
+        await _edit_report(context, update.effective_chat.id, wait_msg.message_id, build_report(_ai_block(None, done=False)))
+
+        # 2. Grafik ve AI yorumu birbirini beklemez
+        async def send_chart():
+            # Aynı grafik daha önce yüklendiyse Telegram file_id'si ile gönderilir (render/yükleme yok)
+            await MediaCache.send_photo(
+                context.bot,
+                update.effective_chat.id,
+                report.chart_key,
+                lambda: Metrics.timed("chart", report.chart_image()),
+                caption=f"📈 *{symbol}* Teknik Görünüm (Sarı: SMA50 | Mavi: Destek | Turuncu: Direnç)",
+                parse_mode=ParseMode.MARKDOWN
+            )
+
+        async def stream_ai():
+            # Gelen parçalar biriktirilir; mesaj en fazla AI_EDIT_INTERVAL'de bir düzenlenir
+            loop = asyncio.get_running_loop()
+            next_edit = loop.time() + AI_EDIT_INTERVAL
+            comment = None
+            blocked_until = 0.0  # Flood limiti (RetryAfter) bitene kadar düzenleme yapılmaz
+            with Metrics.span("ai") as span:
+                async for comment in report.comments():
+                    if loop.time() < next_edit:
+                        continue
+                    wait = await _edit_report(context, update.effective_chat.id, wait_msg.message_id, build_report(_ai_block(comment, done=False)))
+                    blocked_until = loop.time() + wait
+                    next_edit = loop.time() + max(AI_EDIT_INTERVAL, wait)
+                if comment is None:
+                    span.fail()
+
+            # Son hal: tam yorum ya da (yorum yoksa) yer tutucu kaldırılır
+            final = build_report(_ai_block(comment, done=True))
+            await asyncio.sleep(max(blocked_until - loop.time(), 0))
+            for _ in range(3):
+                wait = await _edit_report(context, update.effective_chat.id, wait_msg.message_id, final)
+                if not wait:
+                    break
+                await asyncio.sleep(wait)
+
+        await asyncio.gather(send_chart(), stream_ai())
+
+def _ai_block(comment, done: bool) -> str:
+    """Rapordaki AI bölümü. Yorumdaki Markdown karakterleri italik bloğu bozmasın diye atılır."""
+    if comment:
+        clean = comment.translate(str.maketrans("", "", "_*`["))
+        suffix = "" if done else " ▌"
+        return f"\n🤖 *AI YORUMU (GEMINI):*\n_{clean.strip()}_{suffix}\n"
+    if done:
+        return ""
+    return "\n🤖 _AI yorumu hazırlanıyor..._\n"
+
+async def _edit_report(context, chat_id: int, message_id: int, text: str) -> float:
+    """
+    Rapor mesajını düzenler. Değişiklik yoksa sessizce geçer.
+    Flood limitine takılırsa beklenmesi gereken süreyi (sn) döner, aksi halde 0.
+    """
+    try:
+        await context.bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=text, parse_mode=ParseMode.MARKDOWN)
+    except RetryAfter as e:
+        retry = e.retry_after
+        return retry.total_seconds() if hasattr(retry, "total_seconds") else float(retry)
+    except BadRequest as e:
+        if "not modified" not in str(e).lower():
+            print(f"[Bot] Rapor düzenleme hatası: {e}")
+    return 0.0
+
+@Metrics.instrument("cmd.tara")
+async def scan_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    universe = context.args[0].upper() if context.args else "BIST30"
+    interval = context.args[1] if len(context.args) > 1 else "1d"
+    top_n = 5
+    if len(context.args) > 2 and context.args[2].isdigit():
+        top_n = max(1, min(int(context.args[2]), 20))
+
+    wait_msg = await update.message.reply_text(
+        f"🔎 *{universe}* taranıyor... ({interval})",
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+    result = await ExecutionService.run_io("scan", ScannerService.scan, universe, interval, top_n)
+
+    if not result:
         await context.bot.edit_message_text(
-            chat_id=update.effective_chat.id, 
-            message_id=wait_msg.message_id, 
-            text=message, 
+            chat_id=update.effective_chat.id,
+            message_id=wait_msg.message_id,
+            text="❌ Tarama yapılamadı. Evren: `BIST30`, `BIST100`, `KRIPTO`",
             parse_mode=ParseMode.MARKDOWN
         )
+        return
 
-        # 2. Grafiği Oluştur ve Gönder
-        chart_buf = ChartService.create_chart(
-            stock_df, 
-            symbol, 
-            support=analysis['levels']['support'], 
-            resistance=analysis['levels']['resistance']
+    def format_rows(rows):
+        if not rows:
+            return "• Aday yok."
+        return "\n".join(
+            f"• *{r['symbol']}* `{r['price']}` | Skor: `{r['score']}` | RSI: `{r['rsi']}`"
+            for r in rows
         )
 
-        if chart_buf:
-            await context.bot.send_photo(
-                chat_id=update.effective_chat.id,
-                photo=chart_buf,
-                caption=f"📈 *{symbol}* Teknik Görünüm (Sarı: SMA50 | Mavi: Destek | Turuncu: Direnç)",
-                parse_mode=ParseMode.MARKDOWN
-            )
-            chart_buf.close() # Belleği temizle
\ No newline at end of file
+    message = (
+        f"🔎 *{result['universe']} TARAMA* ({result['interval']}) - {result['count']} sembol\n\n"
+        f"📈 *AL ADAYLARI:*\n{format_rows(result['buy'])}\n\n"
+        f"📉 *SAT ADAYLARI:*\n{format_rows(result['sell'])}\n\n"
+        f"_Detay için: /analiz <KOD> {result['interval']}_"
+    )
+    await context.bot.edit_message_text(
+        chat_id=update.effective_chat.id,
+        message_id=wait_msg.message_id,
+        text=message,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+
+@Metrics.instrument("cmd.backtest")
+async def backtest_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not context.args:
+        await update.message.reply_text("⚠️ Örn: `/backtest THYAO 1h`", parse_mode=ParseMode.MARKDOWN)
+        return
+
+    symbol = await _resolve_symbol(update, context.args[0])
+    if symbol is None:
+        return
+    interval = context.args[1] if len(context.args) > 1 else "1d"
+
+    wait_msg = await update.message.reply_text(
+        f"⏳ *{symbol}* için backtest yapılıyor... ({interval})",
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+    result = await ExecutionService.run_io("backtest", BacktestService.run, symbol, interval)
+
+    if not result:
+        text = f"❌ Veri alınamadı.{_did_you_mean(SymbolDirectory.suggestions(symbol))}"
+        await context.bot.edit_message_text(chat_id=update.effective_chat.id, message_id=wait_msg.message_id, text=text, parse_mode=ParseMode.MARKDOWN)
+        return
+
+    message = (
+        f"🧪 *{result['symbol']} BACKTEST* ({result['interval']}, {result['period']})\n"
+        f"Bar: `{result['bars']}` | İşlem: `{result['trades']}` (Skor ≥ {result['min_score']})\n\n"
+        f"🎯 Hedef (3 ATR): `%{round(result['hit_rate'] * 100, 1)}`\n"
+        f"🛑 Stop (2 ATR): `%{round(result['stop_rate'] * 100, 1)}`\n"
+        f"📈 Beklenen Getiri: `{result['expectancy_r']}R` (`%{result['avg_return_pct']}`)\n"
+        f"📉 Maks. Düşüş: `{result['max_drawdown_r']}R` | Toplam: `{result['total_r']}R`\n"
+        f"⏱️ Ort. Süre: `{result['avg_bars']}` bar (en fazla {result['horizon']})\n\n"
+        f"_Geçmiş performans gelecek için garanti değildir (YTD)._"
+    )
+    await context.bot.edit_message_text(
+        chat_id=update.effective_chat.id,
+        message_id=wait_msg.message_id,
+        text=message,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.effective_user.id not in ADMIN_IDS:
+        return  # Yöneticiler dışında komut yokmuş gibi davran
+
+    stages = Metrics.snapshot()
+    if not stages:
+        await update.message.reply_text("Henüz ölçüm yok.")
+        return
+
+    lines = [f"{'aşama':<18}{'adet':>6}{'hata':>6}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+    for stage, m in stages.items():
+        lines.append(
+            f"{stage[:18]:<18}{m['count']:>6}{m['errors']:>6}"
+            f"{m['p50_ms']:>7.0f}{m['p95_ms']:>7.0f}{m['p99_ms']:>7.0f}"
+        )
+
+    ai = AIService.stats()["cache"]
+    chart = ChartService.stats()["cache"]
+    ohlcv = MarketDataService.cache_stats()
+    report = ReportService.stats()
+    lines.append("")
+    lines.append(
+        f"cache isabet: ohlcv %{ohlcv['hit_rate'] * 100:.0f} | "
+        f"ai %{ai['hit_rate'] * 100:.0f} | grafik %{chart['hit_rate'] * 100:.0f} | "
+        f"rapor %{report['hit_rate'] * 100:.0f} (birleşen {report['coalesced']})"
+    )
+    processor = context.application.update_processor
+    if hasattr(processor, "stats"):
+        updates = processor.stats()
+        lines.append(
+            f"güncelleme: {updates['in_flight']}/{updates['max_concurrent']} çalışıyor | "
+            f"sıra {updates['queued']} | red {updates['rejected']}"
+        )
+    media = MediaCache.stats()
+    lines.append(
+        f"grafik yükleme: {media['uploads']} | file_id ile {media['reused']} "
+        f"({media['bytes_saved'] / 1024:.0f} KB tasarruf)"
+    )
+    if report["mode"] == "queue":
+        jobs = await ExecutionService.run_io("fetch", JobQueue.get().stats) or {}
+        workers = await ExecutionService.run_io("fetch", JobQueue.get().workers) or []
+        healthy = sum(1 for w in workers if w["healthy"])
+        lines.append(
+            f"iş kuyruğu: sıra {jobs.get('queued', 0)} {jobs.get('by_priority', {})} | çalışan {jobs.get('running', 0)} | "
+            f"biten {jobs.get('done', 0)} | hata {jobs.get('failed', 0)} | tekrar {jobs.get('retried', 0)}"
+        )
+        lines.append(f"worker: {healthy}/{len(workers)} sağlıklı")
+        for w in workers:
+            state = f"#{w['current_job']}" if w.get("current_job") else "boşta"
+            lines.append(f"  {'✓' if w['healthy'] else '✗'} {w['worker'][-24:]} {state} biten {w.get('processed', 0)} hata {w.get('failed', 0)}")
+    directory = SymbolDirectory.stats()
+    lines.append(
+        f"sembol dizini: {directory['symbols']} | bilinmeyen {directory['unknown']['size']} "
+        f"(engellenen {directory['unknown']['hits']})"
+    )
+    if lazy.IMPORT_TIMES:
+        # Tembel modüllerin ilk kullanımda ödediği import süresi
+        lines.append("import: " + " | ".join(
+            f"{name} {seconds * 1000:.0f}ms" for name, seconds in sorted(lazy.IMPORT_TIMES.items())
+        ))
+    await update.message.reply_text("```\n" + "\n".join(lines) + "\n```", parse_mode=ParseMode.MARKDOWN)
+
+
+@Metrics.instrument("cmd.alarm")
+async def alarm_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    chat_id = update.effective_chat.id
+
+    # /alarm -> Liste
+    if not context.args:
+        alerts = AlertService.list_alerts(chat_id)
+        if not alerts:
+            await update.message.reply_text("🔕 Kayıtlı alarmınız yok.\nÖrn: `/alarm THYAO 300`", parse_mode=ParseMode.MARKDOWN)
+            return
+        lines = [
+            f"`#{a['id']}` *{a['symbol']}* {'⬆️' if a['direction'] == 'above' else '⬇️'} `{a['threshold']}`"
+            for a in alerts
+        ]
+        await update.message.reply_text("🔔 *ALARMLARINIZ:*\n" + "\n".join(lines), parse_mode=ParseMode.MARKDOWN)
+        return
+
+    # /alarm sil <no>
+    if context.args[0].lower() == "sil":
+        alert_id = context.args[1].lstrip("#") if len(context.args) > 1 else ""
+        removed = AlertService.remove_alert(chat_id, int(alert_id)) if alert_id.isdigit() else None
+        text = f"🗑️ `#{alert_id}` silindi." if removed else "⚠️ Alarm bulunamadı. Örn: `/alarm sil 12`"
+        await update.message.reply_text(text, parse_mode=ParseMode.MARKDOWN)
+        return
+
+    # /alarm <KOD> <fiyat>
+    if len(context.args) < 2:
+        await update.message.reply_text("⚠️ Örn: `/alarm THYAO 300`", parse_mode=ParseMode.MARKDOWN)
+        return
+
+    symbol = await _resolve_symbol(update, context.args[0])
+    if symbol is None:
+        return
+    try:
+        threshold = float(context.args[1].replace(",", "."))
+    except ValueError:
+        await update.message.reply_text("⚠️ Geçersiz fiyat. Örn: `/alarm THYAO 300,5`", parse_mode=ParseMode.MARKDOWN)
+        return
+
+    price_info = await ExecutionService.run_io("fetch", QuoteService.get_quote, symbol)
+    if not price_info:
+        await update.message.reply_text(f"❌ *{symbol}* bulunamadı veya veri çekilemedi.{_did_you_mean(SymbolDirectory.suggestions(symbol))}", parse_mode=ParseMode.MARKDOWN)
+        return
+
+    alert = AlertService.add_alert(chat_id, update.effective_user.id, symbol, threshold, price_info['price'])
+    if alert is None:
+        await update.message.reply_text(f"⚠️ En fazla {AlertService.MAX_PER_CHAT} alarm kurabilirsiniz.")
+        return
+
+    direction = "üstüne çıkınca" if alert['direction'] == "above" else "altına inince"
+    await update.message.reply_text(
+        f"🔔 `#{alert['id']}` *{symbol}* `{threshold}` {direction} haber vereceğim.\n"
+        f"Şu an: `{price_info['price']} {price_info['currency']}`",
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    @bot <önek> yazıldıkça yerel dizinden sembol önerir (ağa çıkmaz).
+    Seçilen sonuç sohbete `/analiz KOD` olarak gönderilir. BotFather'da /setinline açık olmalı.
+    """
+    query = update.inline_query.query
+    results = [
+        InlineQueryResultArticle(
+            id=str(uuid4()),
+            title=entry["code"],
+            description=" · ".join(part for part in (entry["name"], entry["kind"]) if part) or None,
+            input_message_content=InputTextMessageContent(f"/analiz {entry['code']}"),
+        )
+        for entry in SymbolDirectory.search(query, limit=INLINE_RESULTS)
+    ]
+    await update.inline_query.answer(results, cache_time=INLINE_CACHE_TIME)
+
+async def alert_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    JobQueue ile periyodik çalışır: alarmlı tüm semboller tek toplu istekle fiyatlanır,
+    tetiklenen alarmlar indeksten bulunur ve bildirimler arka planda hız sınırıyla gönderilir.
+    """
+    symbols = AlertService.symbols()
+    if not symbols:
+        return
+
+    prices = await ExecutionService.run_io("fetch", QuoteService.get_prices, symbols)
+    if not prices:
+        return
+
+    triggered = AlertService.collect_triggered(prices)
+    if triggered:
+        context.application.create_task(_send_alerts(context.bot, triggered))
+
+async def _send_alerts(bot, alerts):
+    """
+    Bildirimleri hız sınırıyla gönderir. Alarm depodan sadece mesaj gidince (veya sohbete hiç
+    gönderilemeyecekse) silinir; gönderilemeyenler indekse döner, sonraki döngüde tekrar denenir.
+    """
+    delay = 1.0 / AlertService.SEND_RATE
+    pending = list(alerts)
+    try:
+        while pending:
+            alert = pending[0]
+            if await _send_alert(bot, alert):
+                AlertService.acknowledge(alert)
+            else:
+                AlertService.restore([alert])
+            pending.pop(0)
+            await asyncio.sleep(delay)
+    finally:
+        # Bot kapanırken iptal edildiyse kalanlar kaybolmaz (depoda da duruyorlar)
+        AlertService.restore(pending)
+
+async def _send_alert(bot, alert) -> bool:
+    """True: iletildi veya bu sohbete iletilemeyecek; False: geçici hata, sonra tekrar denenmeli."""
+    arrow = "⬆️" if alert['direction'] == "above" else "⬇️"
+    text = (
+        f"🔔 *ALARM:* *{alert['symbol']}* {arrow} `{alert['threshold']}`\n"
+        f"💰 Fiyat: `{round(alert['price'], 2)}`"
+    )
+    for _ in range(2):
+        try:
+            await bot.send_message(chat_id=alert['chat_id'], text=text, parse_mode=ParseMode.MARKDOWN)
+            return True
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            await asyncio.sleep(retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after)
+        except Forbidden:
+            return True  # Kullanıcı botu engellemiş
+        except BadRequest as e:
+            if "chat not found" in str(e).lower():
+                return True  # Sohbet silinmiş
+            print(f"[alert_job] Gönderim Hatası: {e}")
+            return False
+        except TelegramError as e:
+            print(f"[alert_job] Gönderim Hatası: {e}")
+            return False
+    return False
@@ -1,16 +1,86 @@
 # main.py
 import os
+import time
 import logging
+
+# Soğuk başlangıç süresi (import'lar dahil); ağır modüller servislerde tembel yüklenir
+_STARTED = time.perf_counter()
+
 from dotenv import load_dotenv
-from telegram.ext import ApplicationBuilder, CommandHandler
-from handlers.commands import start, get_price_command, analyze_command
+
+# Servisler ayarlarını (.env) import anında okur; bu yüzden önce yüklenir
+load_dotenv()
+
+from telegram.ext import ApplicationBuilder, CommandHandler, InlineQueryHandler
+from handlers.commands import start, get_price_command, analyze_command, scan_command, alarm_command, backtest_command, stats_command, inline_query, alert_job
+from services.executor import ExecutionService
+from services.alert_service import AlertService
+from services.chart_service import ChartService
+from services.metrics import Metrics, InstrumentedRequest
+from services.warmup import WarmupService
+from services.throttle import ThrottledUpdateProcessor
+from services.report_service import ReportService
+from services.job_queue import JobQueue
+from services.analysis_worker import AnalysisWorker
+
+IMPORT_SECONDS = time.perf_counter() - _STARTED
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO
 )
 
-load_dotenv()
+async def on_startup(app):
+    # Kuyruk modunda bellek kuyruğunu tüketecek başka süreç yok; worker'lar bu süreçte thread olarak çalışır
+    if ReportService.MODE == "queue" and JobQueue.BACKEND == "memory":
+        AnalysisWorker.start_threads(JobQueue.get())
+    # WARMUP=1 ise ısınma polling'i bekletmeden arka planda çalışır
+    WarmupService.start()
+
+async def on_shutdown(app):
+    await WarmupService.stop()
+    AnalysisWorker.stop_threads()
+    # Thread/process havuzlarını kapat
+    ExecutionService.shutdown()
+    ChartService.shutdown()
+    Metrics.stop_server()
+
+# "polling" (varsayılan) veya "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+# Telegram'ın çağıracağı dış adres (ör. https://bot.example.com/telegram); ters proxy TLS'i sonlandırır
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+
+def build_app(token: str, request=None):
+    """Handler'ları ve alarm job'unu kurulmuş Application (yerel webhook testi sahte request verir)."""
+    # Güncellemeler eşzamanlı işlenir; kullanıcı/sohbet başına çalışan istek sınırlıdır
+    builder = (
+        ApplicationBuilder().token(token)
+        .concurrent_updates(ThrottledUpdateProcessor())
+        .post_init(on_startup).post_shutdown(on_shutdown)
+    )
+    if request is not None:
+        builder = builder.request(request)
+    app = builder.build()
+
+    app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("fiyat", get_price_command))
+    app.add_handler(CommandHandler("analiz", analyze_command))
+    app.add_handler(CommandHandler("tara", scan_command))
+    app.add_handler(CommandHandler("alarm", alarm_command))
+    app.add_handler(CommandHandler("backtest", backtest_command))
+    app.add_handler(CommandHandler("stats", stats_command))
+    app.add_handler(InlineQueryHandler(inline_query))
+
+    # Fiyat alarmları (python-telegram-bot[job-queue] gerekir)
+    if app.job_queue:
+        app.job_queue.run_repeating(alert_job, interval=AlertService.POLL_SECONDS, first=10)
+    else:
+        print("⚠️ JobQueue yok, fiyat alarmları kontrol edilmeyecek (APScheduler kurulu değil).")
+    return app
 
 def main():
     token = os.getenv("TOKEN")
@@ -18,14 +88,27 @@ def main():
         print("🚨 HATA: .env dosyasında TOKEN bulunamadı!")
         return
 
-    app = ApplicationBuilder().token(token).build()
+    # Telegram API çağrıları "telegram.<metod>" aşaması olarak ölçülür (getUpdates hariç)
+    app = build_app(token, InstrumentedRequest(connection_pool_size=256))
 
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("fiyat", get_price_command))
-    app.add_handler(CommandHandler("analiz", analyze_command))
+    # METRICS_PORT verilmişse /metrics uç noktası
+    Metrics.start_server()
 
-    print("✅ Bot başarıyla başlatıldı!")
-    app.run_polling()
+    Metrics.observe("startup.imports", IMPORT_SECONDS)
+    Metrics.observe("startup.ready", time.perf_counter() - _STARTED)
+    print(f"✅ Bot başarıyla başlatıldı! (import {IMPORT_SECONDS * 1000:.0f} ms, mod: {BOT_MODE})")
+    if BOT_MODE == "webhook":
+        # python-telegram-bot[webhooks] (tornado) gerekir
+        app.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=WEBHOOK_URL or None,
+            secret_token=WEBHOOK_SECRET,
+            max_connections=100,
+        )
+    else:
+        app.run_polling()
 
 if __name__ == '__main__':
     main()
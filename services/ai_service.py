@@ -1,55 +1,209 @@
 # services/ai_service.py
 import os
-import google.generativeai as genai
+import time
+import asyncio
+import threading
 from dotenv import load_dotenv
+from services.cache import TTLCache
+from services.lazy import lazy_import
+
+# ~0.6 sn'lik import; ilk yorum isteğinde (veya ısınmada) yüklenir
+genai = lazy_import("google.generativeai")
 
 load_dotenv()
 
 class AIService:
+    """
+    Gemini yorum katmanı. Model bir kez yapılandırılır; yorumlar, prompt'a giren
+    özelliklerin kabaca gruplanmış hali ile cache'lenir. Aynı sembolde aynı tabloyu
+    gören kullanıcılar yeni bir Gemini isteği beklemez.
+    """
+    MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    # Süre dolarsa rapor AI yorumu olmadan gönderilir
+    TIMEOUT = float(os.getenv("AI_TIMEOUT", "25"))
+    # Skor bu genişlikte gruplanır (ör. 2 -> 3 ve 4 aynı yorum)
+    SCORE_BUCKET = int(os.getenv("AI_SCORE_BUCKET", "2"))
+    # RSI bantları: <30 aşırı satım, 30-45, 45-55, 55-70, >70 aşırı alım
+    RSI_BANDS = (30, 45, 55, 70)
+
+    _model = None
+    _model_lock = threading.Lock()
+    _inflight = {}  # anahtar -> asyncio.Future (aynı özellikler için tek istek)
+    _cache = TTLCache(
+        "ai",
+        max_entries=int(os.getenv("AI_CACHE_SIZE", "256")),
+        default_ttl=float(os.getenv("AI_CACHE_TTL", "1800")),
+    )
+    _stats = {"requests": 0, "api_calls": 0, "timeouts": 0, "errors": 0, "latency_ms_total": 0.0}
+
     @staticmethod
-    def generate_market_comment(symbol: str, analysis_data: dict):
+    def _get_model():
+        """Gemini'yi ilk kullanımda bir kez yapılandırır. Anahtar yoksa None."""
+        if AIService._model is None:
+            with AIService._model_lock:
+                if AIService._model is None:
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if not api_key:
+                        print("[AIService] Hata: GEMINI_API_KEY bulunamadı.")
+                        return None
+                    genai.configure(api_key=api_key)
+                    AIService._model = genai.GenerativeModel(AIService.MODEL_NAME)
+        return AIService._model
+
+    @staticmethod
+    def _rsi_band(rsi) -> int:
+        try:
+            rsi = float(rsi)
+        except (TypeError, ValueError):
+            return -1
+        return sum(rsi >= edge for edge in AIService.RSI_BANDS)
+
+    @staticmethod
+    def feature_key(symbol: str, analysis_data: dict) -> tuple:
         """
-        Teknik verileri Google Gemini API'ye gönderir ve yorum alır.
+        Yorumu belirleyen girdiler: sembol, gruplanmış skor, sinyal, RSI bandı,
+        trend, uyumsuzluk, formasyon ve balina. Fiyat / R:R anahtara girmez;
+        prompt zaten sayıları tekrar etmemesini ister.
         """
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            print("[AIService] Hata: GEMINI_API_KEY bulunamadı.")
-            return None
+        return (
+            symbol,
+            analysis_data["score"] // AIService.SCORE_BUCKET,
+            analysis_data["risk_label"],
+            AIService._rsi_band(analysis_data["rsi"]),
+            analysis_data["mtf"]["label"],
+            analysis_data["divergence"]["label"],
+            analysis_data["candle"],
+            analysis_data["whale"],
+        )
+
+    @staticmethod
+    def build_prompt(symbol: str, analysis_data: dict) -> str:
+        # Verileri Metne Dök
+        technical_summary = (
+            f"Hisse: {symbol}\n"
+            f"Fiyat: {analysis_data.get('price', 'Bilinmiyor')}\n"
+            f"Skor: {analysis_data['score']} / Sinyal: {analysis_data['risk_label']}\n"
+            f"RSI: {analysis_data['rsi']}\n"
+            f"Trend: {analysis_data['mtf']['label']}\n"
+            f"Uyumsuzluk: {analysis_data['divergence']['label'] or 'Yok'}\n"
+            f"Formasyon: {analysis_data['candle'] or 'Yok'}\n"
+            f"Balina Hacmi: {analysis_data['whale'] or 'Yok'}\n"
+            f"R/R Oranı: {analysis_data['risk_data']['rr_ratio']}\n"
+        )
 
+        return (
+            "Sen deneyimli bir borsa uzmanısın. Aşağıdaki teknik verilere dayanarak "
+            "kullanıcıya 2-3 cümlelik, samimi, net ve yatırım tavsiyesi vermeden (YTD) "
+            "bir piyasa yorumu yap. Sayıları tekrar etme, ne anlama geldiklerini yorumla. "
+            "Eğer riskli bir durum varsa uyar.\n\n"
+            f"VERİLER:\n{technical_summary}"
+        )
+
+    @staticmethod
+    def _record(started: float, text):
+        AIService._stats["api_calls"] += 1
+        AIService._stats["latency_ms_total"] += (time.perf_counter() - started) * 1000
+        return text.strip() if text else None
+
+    @staticmethod
+    async def stream_market_comment(symbol: str, analysis_data: dict):
+        """
+        Yorumu Gemini'den parça parça alır; her parçada o ana kadarki metni yield eder.
+        Cache'te varsa / aynı istek sürüyorsa tam metin tek seferde gelir.
+        TIMEOUT tüm akış için geçerlidir; aşılırsa o ana kadar gelen metin son halidir.
+        """
+        AIService._stats["requests"] += 1
+        key = AIService.feature_key(symbol, analysis_data)
+        cached = AIService._cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        pending = AIService._inflight.get(key)
+        if pending is not None:
+            AIService._cache.coalesced += 1
+            comment = await asyncio.shield(pending)
+            if comment:
+                yield comment
+            return
+
+        model = AIService._get_model()
+        if model is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        AIService._inflight[key] = result
+        text = ""
+        complete = False
+        started = time.perf_counter()
+        deadline = loop.time() + AIService.TIMEOUT
         try:
-            # Gemini Konfigürasyonu
-            genai.configure(api_key=api_key)
-            
-            # DÜZELTME: Senin listendeki en uygun modeli seçtik:
-            model = genai.GenerativeModel('gemini-2.5-flash')
-
-            # Verileri Metne Dök
-            technical_summary = (
-                f"Hisse: {symbol}\n"
-                f"Fiyat: {analysis_data.get('price', 'Bilinmiyor')}\n"
-                f"Skor: {analysis_data['score']} / Sinyal: {analysis_data['risk_label']}\n"
-                f"RSI: {analysis_data['rsi']}\n"
-                f"Trend: {analysis_data['mtf']['label']}\n"
-                f"Uyumsuzluk: {analysis_data['divergence']['label'] or 'Yok'}\n"
-                f"Formasyon: {analysis_data['candle'] or 'Yok'}\n"
-                f"Balina Hacmi: {analysis_data['whale'] or 'Yok'}\n"
-                f"R/R Oranı: {analysis_data['risk_data']['rr_ratio']}\n"
+            response = await asyncio.wait_for(
+                model.generate_content_async(AIService.build_prompt(symbol, analysis_data), stream=True),
+                timeout=AIService.TIMEOUT,
             )
+            chunks = response.__aiter__()
+            while True:
+                # Süre her parça için değil, akışın tamamı için sayılır
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - loop.time(), 0))
+                except StopAsyncIteration:
+                    complete = True
+                    break
+                if chunk.text:
+                    text += chunk.text
+                    yield text
+            AIService._record(started, text)
+        except asyncio.TimeoutError:
+            AIService._stats["timeouts"] += 1
+            print(f"[AIService] Gemini akışı {AIService.TIMEOUT}s içinde bitmedi, yorum kesildi.")
+        except Exception as e:
+            AIService._stats["errors"] += 1
+            print(f"[AIService] Gemini Hatası: {e}")
+        finally:
+            comment = text.strip() or None
+            # Yarım kalan yorum cache'lenmez
+            if complete and comment:
+                AIService._cache.set(key, comment)
+            AIService._inflight.pop(key, None)
+            result.set_result(comment)
 
-            prompt = (
-                "Sen deneyimli bir borsa uzmanısın. Aşağıdaki teknik verilere dayanarak "
-                "kullanıcıya 2-3 cümlelik, samimi, net ve yatırım tavsiyesi vermeden (YTD) "
-                "bir piyasa yorumu yap. Sayıları tekrar etme, ne anlama geldiklerini yorumla. "
-                "Eğer riskli bir durum varsa uyar.\n\n"
-                f"VERİLER:\n{technical_summary}"
-            )
+    @staticmethod
+    def generate_market_comment(symbol: str, analysis_data: dict):
+        """
+        Teknik verileri Google Gemini API'ye gönderir ve yorum alır (bloklayan sürüm).
+        """
+        AIService._stats["requests"] += 1
+        key = AIService.feature_key(symbol, analysis_data)
+        cached = AIService._cache.get(key)
+        if cached is not None:
+            return cached
+
+        model = AIService._get_model()
+        if model is None:
+            return None
 
-            # İsteği Gönder
-            response = model.generate_content(prompt)
-            
-            # Cevabı Dön
-            return response.text.strip()
+        started = time.perf_counter()
+        try:
+            response = model.generate_content(
+                AIService.build_prompt(symbol, analysis_data),
+                request_options={"timeout": AIService.TIMEOUT},
+            )
+            comment = AIService._record(started, response.text)
+            if comment:
+                AIService._cache.set(key, comment)
+            return comment
 
         except Exception as e:
+            AIService._stats["errors"] += 1
             print(f"[AIService] Gemini Hatası: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def stats() -> dict:
+        stats = dict(AIService._stats)
+        latency = stats.pop("latency_ms_total")
+        stats["latency_ms_avg"] = round(latency / stats["api_calls"], 1) if stats["api_calls"] else 0.0
+        stats["cache"] = AIService._cache.stats()
+        return stats
@@ -0,0 +1,229 @@
+# services/alert_service.py
+import os
+import time
+import sqlite3
+import bisect
+import threading
+
+class AlertBook:
+    """
+    Fiyat alarmlarının bellek içi indeksi.
+    Her sembol için iki sıralı liste tutulur:
+    - above: fiyat eşiğin ÜSTÜNE çıkınca tetiklenecekler, anahtar = -eşik
+    - below: fiyat eşiğin ALTINA inince tetiklenecekler, anahtar = eşik
+    Her iki listede de tetiklenenler listenin sonundadır; bisect ile bulunup tek dilimde silinir.
+    Bir döngünün maliyeti alarm sayısıyla değil, sembol sayısı ve tetiklenen alarm sayısıyla büyür.
+    """
+
+    def __init__(self):
+        self._alerts = {}  # id -> alarm dict
+        self._above = {}   # sembol -> [(-eşik, id), ...] artan
+        self._below = {}   # sembol -> [(eşik, id), ...] artan
+        self._by_chat = {} # chat_id -> {id, ...}
+
+    def __len__(self):
+        return len(self._alerts)
+
+    def symbols(self):
+        return [s for s in set(self._above) | set(self._below) if self._above.get(s) or self._below.get(s)]
+
+    def get(self, alert_id):
+        return self._alerts.get(alert_id)
+
+    def for_chat(self, chat_id):
+        return [self._alerts[i] for i in sorted(self._by_chat.get(chat_id, ()))]
+
+    def count_for_chat(self, chat_id):
+        return len(self._by_chat.get(chat_id, ()))
+
+    def add(self, alert: dict):
+        self._alerts[alert["id"]] = alert
+        self._by_chat.setdefault(alert["chat_id"], set()).add(alert["id"])
+        if alert["direction"] == "above":
+            bisect.insort(self._above.setdefault(alert["symbol"], []), (-alert["threshold"], alert["id"]))
+        else:
+            bisect.insort(self._below.setdefault(alert["symbol"], []), (alert["threshold"], alert["id"]))
+
+    def remove(self, alert_id):
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+        self._by_chat.get(alert["chat_id"], set()).discard(alert_id)
+        if alert["direction"] == "above":
+            book, key = self._above.get(alert["symbol"], []), (-alert["threshold"], alert_id)
+        else:
+            book, key = self._below.get(alert["symbol"], []), (alert["threshold"], alert_id)
+        i = bisect.bisect_left(book, key)
+        if i < len(book) and book[i] == key:
+            del book[i]
+        return alert
+
+    def pop_triggered(self, symbol: str, price: float):
+        """Bu fiyatla tetiklenen alarmları indeksten çıkarıp döner."""
+        triggered = []
+
+        # above: eşik <= fiyat  <=>  -eşik >= -fiyat  -> listenin sonu
+        above = self._above.get(symbol)
+        if above:
+            i = bisect.bisect_left(above, (-price,))
+            triggered.extend(above[i:])
+            del above[i:]
+
+        # below: eşik >= fiyat -> listenin sonu
+        below = self._below.get(symbol)
+        if below:
+            i = bisect.bisect_left(below, (price,))
+            triggered.extend(below[i:])
+            del below[i:]
+
+        alerts = [self._alerts.pop(alert_id) for _, alert_id in triggered]
+        for alert in alerts:
+            self._by_chat[alert["chat_id"]].discard(alert["id"])
+        return alerts
+
+class AlertStore:
+    """Alarmların SQLite'ta kalıcı saklanması (yeniden başlatmada geri yüklenir)."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chat_id INTEGER NOT NULL,
+                user_id INTEGER,
+                symbol TEXT NOT NULL,
+                threshold REAL NOT NULL,
+                direction TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def load_all(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, chat_id, user_id, symbol, threshold, direction, created_at FROM alerts"
+            ).fetchall()
+        keys = ("id", "chat_id", "user_id", "symbol", "threshold", "direction", "created_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def insert(self, alert: dict) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO alerts (chat_id, user_id, symbol, threshold, direction, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (alert["chat_id"], alert["user_id"], alert["symbol"], alert["threshold"], alert["direction"], alert["created_at"]),
+            )
+            self._conn.commit()
+            return cur.lastrowid
+
+    def delete_many(self, alert_ids):
+        if not alert_ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM alerts WHERE id=?", [(i,) for i in alert_ids])
+            self._conn.commit()
+
+class AlertService:
+    """Alarm motoru: indeks + kalıcı depo. Event loop içinden kullanılır."""
+    STORE_PATH = os.getenv("ALERT_STORE_PATH", "data/alerts.sqlite")
+    MAX_PER_CHAT = int(os.getenv("ALERT_MAX_PER_CHAT", "20"))
+    POLL_SECONDS = float(os.getenv("ALERT_POLL_SECONDS", "60"))
+    # Telegram genel limiti ~30 mesaj/sn; altında kalınır
+    SEND_RATE = float(os.getenv("ALERT_SEND_RATE", "25"))
+
+    _book = None
+    _store = None
+    _sending = {}  # id -> alarm: tetiklenmiş, bildirimi henüz gönderilmemiş (depoda duruyor)
+
+    @staticmethod
+    def _ensure_loaded():
+        if AlertService._book is None:
+            AlertService._store = AlertStore(AlertService.STORE_PATH)
+            book = AlertBook()
+            for alert in AlertService._store.load_all():
+                book.add(alert)
+            AlertService._book = book
+        return AlertService._book
+
+    @staticmethod
+    def add_alert(chat_id: int, user_id: int, symbol: str, threshold: float, current_price: float):
+        """
+        Alarm ekler. Yön mevcut fiyata göre belirlenir (eşik üstteyse yükseliş alarmı).
+        Dönüş: alarm dict veya limit aşıldıysa None.
+        """
+        book = AlertService._ensure_loaded()
+        if book.count_for_chat(chat_id) >= AlertService.MAX_PER_CHAT:
+            return None
+
+        alert = {
+            "chat_id": chat_id,
+            "user_id": user_id,
+            "symbol": symbol,
+            "threshold": float(threshold),
+            "direction": "above" if threshold > current_price else "below",
+            "created_at": time.time(),
+        }
+        alert["id"] = AlertService._store.insert(alert)
+        book.add(alert)
+        return alert
+
+    @staticmethod
+    def remove_alert(chat_id: int, alert_id: int):
+        book = AlertService._ensure_loaded()
+        alert = book.get(alert_id) or AlertService._sending.get(alert_id)
+        if alert is None or alert["chat_id"] != chat_id:
+            return None
+        book.remove(alert_id)
+        AlertService._sending.pop(alert_id, None)  # gönderilemezse geri yüklenmesin
+        AlertService._store.delete_many([alert_id])
+        return alert
+
+    @staticmethod
+    def list_alerts(chat_id: int):
+        return AlertService._ensure_loaded().for_chat(chat_id)
+
+    @staticmethod
+    def symbols():
+        return AlertService._ensure_loaded().symbols()
+
+    @staticmethod
+    def collect_triggered(prices: dict):
+        """
+        {sembol: fiyat} ile tetiklenen alarmları indeksten çıkarıp döner (gönderilirken tekrar
+        tetiklenmez). Depodan silinmez: bildirim gidince acknowledge(), gitmezse restore() çağrılır;
+        bot arada kapanırsa alarm yeniden başlatmada depodan yüklenir.
+        """
+        book = AlertService._ensure_loaded()
+        triggered = []
+        for symbol, price in prices.items():
+            if price is None:
+                continue
+            for alert in book.pop_triggered(symbol, price):
+                alert["price"] = price
+                AlertService._sending[alert["id"]] = alert
+                triggered.append(alert)
+        return triggered
+
+    @staticmethod
+    def acknowledge(alert: dict):
+        """Bildirimi gönderilen (veya hiç gönderilemeyecek) alarmı depodan siler."""
+        AlertService._sending.pop(alert["id"], None)
+        AlertService._store.delete_many([alert["id"]])
+
+    @staticmethod
+    def restore(alerts):
+        """Bildirimi gönderilemeyen alarmları indekse geri koyar; sonraki döngüde tekrar denenir."""
+        book = AlertService._ensure_loaded()
+        for alert in alerts:
+            # Gönderim sırasında /alarm sil ile silinmişse geri gelmez
+            if AlertService._sending.pop(alert["id"], None) is None:
+                continue
+            alert.pop("price", None)
+            book.add(alert)
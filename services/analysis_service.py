@@ -1,14 +1,55 @@
 # services/analysis_service.py
-import pandas as pd
+from __future__ import annotations
+import os
+import json
 import numpy as np
-from ta.momentum import RSIIndicator
-from ta.trend import MACD, SMAIndicator, EMAIndicator
-from ta.volatility import BollingerBands, AverageTrueRange
-from ta.volume import OnBalanceVolumeIndicator
+from services.indicator_engine import IndicatorEngine
+from services.bar_series import BarSeries, as_bars
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+ta_trend = lazy_import("ta.trend")
+
+# Puanlama eşikleri. Optimizasyon aracının (services/param_optimizer.py) yazdığı dosya
+# varsa başlangıçta bunların üzerine yüklenir.
+DEFAULT_PARAMS = {
+    "rsi_oversold": 30.0,
+    "rsi_overbought": 70.0,
+    "stop_atr": 2.0,           # Stop = fiyat - k x ATR
+    "target_atr": 3.0,         # Hedef = fiyat + k x ATR
+    "min_rr": 1.5,             # Altındaki R:R oranında AL puanı kırılır
+    "whale_ratio": 2.0,        # Hacim / 20 mum ortalaması
+    "whale_ultra_ratio": 3.0,
+    "sr_proximity": 0.02,      # Destek/dirence bu oranda yakınlık
+    "mean_reversion_band": 0.15,  # SMA50'den sapma
+}
+
+PARAMS_PATH = os.getenv("ANALYSIS_PARAMS_PATH", "data/tuned_params.json")
+
+def load_params(path: str = PARAMS_PATH) -> dict:
+    """Dosyadaki ayarları varsayılanların üzerine yazar; dosya yoksa / bozuksa varsayılanlar."""
+    params = dict(DEFAULT_PARAMS)
+    if not path or not os.path.exists(path):
+        return params
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        tuned = data.get("params", data)
+        params.update({k: float(v) for k, v in tuned.items() if k in DEFAULT_PARAMS})
+    except Exception as e:
+        print(f"[AnalysisService] Parametre dosyası okunamadı ({path}): {e}")
+    return params
 
 class AnalysisService:
+    """
+    Teknik analiz. Girdi BarSeries'tir (MarketDataService cache'i); pandas DataFrame verilirse
+    bir kez BarSeries'e çevrilir. Hesaplar doğrudan sütun dizileri üzerinde yapılır.
+    """
+    # Process pool worker'ları da import anında aynı dosyayı okur
+    PARAMS = load_params()
+
     @staticmethod
-    def _volatility_metrics(df: pd.DataFrame):
+    def _volatility_metrics(df: BarSeries):
         """
         Basit volatilite ölçüleri:
         - pct_std: günlük (veya verilen timeframe) getiri standart sapması
@@ -16,13 +57,14 @@ class AnalysisService:
         """
         res = {"pct_std": None, "atr": None}
         try:
-            returns = df["Close"].pct_change().dropna()
+            close = np.asarray(df["Close"], dtype="float64")
+            returns = close[1:] / close[:-1] - 1
+            returns = returns[~np.isnan(returns)]
             if len(returns) >= 2:
-                res["pct_std"] = float(returns.std())
+                res["pct_std"] = float(returns.std(ddof=1))
 
             # ATR (14)
-            atr = AverageTrueRange(high=df["High"], low=df["Low"], close=df["Close"], window=14)
-            res["atr"] = float(atr.average_true_range().iloc[-1])
+            res["atr"] = float(IndicatorEngine.compute(df)["atr"][-1])
         except Exception as e:
             print(f"[volatility_metrics] Hata: {e}")
         return res
@@ -33,39 +75,59 @@ class AnalysisService:
         Veri serisindeki yerel tepe (peaks) ve dipleri (troughs) bulur.
         window: Sağında ve solunda kaç mumun daha düşük/yüksek olması gerektiği.
         Titiz analiz için window=2 veya 3 idealdir.
+        Seri pandas Series ise ilk eleman tarihtir, dizi ise konum.
         """
-        peaks = []
-        troughs = []
-        
-        # Son 'window' kadar veri henüz teyit edilmediği için işlenmez.
-        # Bu yüzden range(window, len - window)
-        for i in range(window, len(series) - window):
-            current = series.iloc[i]
-            
-            # Tepe Kontrolü
-            is_peak = all(current > series.iloc[i-w] for w in range(1, window+1)) and \
-                      all(current > series.iloc[i+w] for w in range(1, window+1))
-            if is_peak:
-                peaks.append((series.index[i], current, i)) # (Tarih, Değer, Index)
-                
-            # Dip Kontrolü
-            is_trough = all(current < series.iloc[i-w] for w in range(1, window+1)) and \
-                        all(current < series.iloc[i+w] for w in range(1, window+1))
-            if is_trough:
-                troughs.append((series.index[i], current, i))
-                
+        values = np.asarray(series)
+        n = len(values)
+        if n <= 2 * window:
+            return [], []
+
+        is_peak, is_trough = AnalysisService._pivot_masks(values, window)
+
+        index = getattr(series, "index", None)
+        if index is None:
+            index = range(n)
+        peaks = [(index[i], values[i], i) for i in np.flatnonzero(is_peak)]  # (Tarih, Değer, Index)
+        troughs = [(index[i], values[i], i) for i in np.flatnonzero(is_trough)]
         return peaks, troughs
 
     @staticmethod
-    def detect_rsi_divergence(df: pd.DataFrame):
+    def _pivot_masks(values: np.ndarray, window: int):
+        """
+        Tepe/dip maskeleri (values ile aynı boyutta). 0. eksen zamandır; 2D panelde her sütun ayrı seridir.
+        Son 'window' kadar veri henüz teyit edilmediği için işlenmez.
+        Aday barlar: [window, n - window). Her kaydırma için tüm adaylar tek seferde karşılaştırılır.
+        """
+        n = len(values)
+        is_peak = np.zeros(values.shape, dtype=bool)
+        is_trough = np.zeros(values.shape, dtype=bool)
+        if n <= 2 * window:
+            return is_peak, is_trough
+
+        current = values[window:n - window]
+        peak = np.ones(current.shape, dtype=bool)
+        trough = np.ones(current.shape, dtype=bool)
+        for w in range(1, window + 1):
+            left = values[window - w:n - window - w]
+            right = values[window + w:n - window + w]
+            peak &= (current > left) & (current > right)
+            trough &= (current < left) & (current < right)
+
+        is_peak[window:n - window] = peak
+        is_trough[window:n - window] = trough
+        return is_peak, is_trough
+
+    @staticmethod
+    def detect_rsi_divergence(df: BarSeries):
         """
         Fiyat ve RSI arasındaki uyumsuzlukları (Divergence) tespit eder.
         Dönüş: (Label, Açıklama) örn: ('POZİTİF UYUMSUZLUK', 'Fiyat düşerken RSI yükseliyor')
         """
-        if len(df) < 20: return None, None
+        df = as_bars(df)
+        if df is None or len(df) < 20: return None, None
 
-        # RSI Hesapla
-        rsi_series = RSIIndicator(close=df["Close"], window=14).rsi()
+        # RSI (Ortak indikatör sonucundan)
+        rsi_series = IndicatorEngine.compute(df)["rsi"]
         
         # Fiyat (Low/High) ve RSI için tepe/dip bul (Window=2 kullanıyoruz ki yakın dönüşleri yakalayalım)
         price_peaks, price_troughs = AnalysisService._get_peaks_troughs(df["Close"], window=2)
@@ -122,20 +184,22 @@ class AnalysisService:
         return None, None
 
     @staticmethod
-    def calculate_mtf_trend(macro_df: pd.DataFrame):
+    def calculate_mtf_trend(macro_df: BarSeries):
         """
         Üst zaman dilimindeki (Macro) trendi analiz eder.
         EMA 50 ve RSI referans alınır.
         """
+        macro_df = as_bars(macro_df)
         if macro_df is None or macro_df.empty:
             return "Veri Yok", "Nötr"
             
         try:
-            current_close = macro_df["Close"].iloc[-1]
+            current_close = float(macro_df["Close"][-1])
+            indicators = IndicatorEngine.compute(macro_df)
             # EMA 50
-            ema50 = EMAIndicator(close=macro_df["Close"], window=50).ema_indicator().iloc[-1]
+            ema50 = indicators["ema50"][-1]
             # RSI
-            rsi = RSIIndicator(close=macro_df["Close"], window=14).rsi().iloc[-1]
+            rsi = indicators["rsi"][-1]
             
             trend = "Nötr"
             color = "⚪"
@@ -163,30 +227,30 @@ class AnalysisService:
     # --- ANA ANALİZ FONKSİYONU (GÜNCELLENDİ) ---
     
     @staticmethod
-    def calculate_technical_signals(df: pd.DataFrame, macro_df: pd.DataFrame = None):
+    def calculate_technical_signals(df: BarSeries, macro_df: BarSeries = None):
+        df = as_bars(df)
         if df is None or df.empty: return None
 
         try:
             # --- 1. Veri Hazırlığı ---
-            current_row = df.iloc[-1]
+            p = AnalysisService.PARAMS
+            current_row = df.bar(-1)
             current_price = float(current_row["Close"])
             
-            # İndikatörler
-            rsi = float(RSIIndicator(close=df["Close"], window=14).rsi().iloc[-1])
+            # İndikatörler (tek geçişte hesaplanır, divergence/grafik aynı sonucu kullanır)
+            indicators = IndicatorEngine.compute(df)
+            rsi = float(indicators["rsi"][-1])
             
-            macd_ind = MACD(close=df["Close"])
-            macd = float(macd_ind.macd().iloc[-1])
-            signal = float(macd_ind.macd_signal().iloc[-1])
+            macd = float(indicators["macd"][-1])
+            signal = float(indicators["macd_signal"][-1])
             
-            bb = BollingerBands(close=df["Close"], window=20, window_dev=2)
-            bb_lower = float(bb.bollinger_lband().iloc[-1])
+            bb_lower = float(indicators["bb_lower"][-1])
             
-            atr = float(AverageTrueRange(high=df["High"], low=df["Low"], close=df["Close"], window=14).average_true_range().iloc[-1])
-            sma50 = SMAIndicator(close=df["Close"], window=50).sma_indicator().iloc[-1]
+            atr = float(indicators["atr"][-1])
+            sma50 = indicators["sma50"][-1]
             
-            obv_ind = OnBalanceVolumeIndicator(close=df["Close"], volume=df["Volume"])
-            obv_curr = obv_ind.on_balance_volume().iloc[-1]
-            obv_prev = obv_ind.on_balance_volume().iloc[-5]
+            obv_curr = indicators["obv"][-1]
+            obv_prev = indicators["obv"][-5]
             obv_trend = "Artıyor 🟢" if obv_curr > obv_prev else "Azalıyor 🔴"
 
             # --- 2. Özel Analizler ---
@@ -197,13 +261,13 @@ class AnalysisService:
                 mtf_label, mtf_desc = AnalysisService.calculate_mtf_trend(macro_df)
                 
             supp, res = AnalysisService._calculate_support_resistance(df)
-            mr_status = AnalysisService._check_mean_reversion(current_price, sma50)
-            whale_signal = AnalysisService._detect_whale_volume(df)
+            mr_status = AnalysisService._check_mean_reversion(current_price, sma50, p["mean_reversion_band"])
+            whale_signal = AnalysisService._detect_whale_volume(df, p["whale_ratio"], p["whale_ultra_ratio"])
             candle_pattern = AnalysisService._analyze_candlestick_pattern(current_row)
 
             # --- 3. Risk Yönetimi (YENİ) ---
-            stop_loss = round(current_price - 2 * atr, 4)
-            take_profit = round(current_price + 3 * atr, 4)
+            stop_loss = round(current_price - p["stop_atr"] * atr, 4)
+            take_profit = round(current_price + p["target_atr"] * atr, 4)
             
             # Risk/Reward Hesaplama
             risk_per_share = current_price - stop_loss
@@ -224,17 +288,17 @@ class AnalysisService:
             details = []
             
             # İndikatör Puanları
-            if rsi < 30: score += 2; details.append("RSI: Aşırı Satım (Dip)")
-            elif rsi > 70: score -= 2; details.append("RSI: Aşırı Alım (Tepe)")
+            if rsi < p["rsi_oversold"]: score += 2; details.append("RSI: Aşırı Satım (Dip)")
+            elif rsi > p["rsi_overbought"]: score -= 2; details.append("RSI: Aşırı Alım (Tepe)")
             
             if macd > signal: score += 1
             else: score -= 1
             
             if current_price < bb_lower: score += 2; details.append("BB: Alt Bant Delindi")
             
-            if supp and abs(current_price - supp)/current_price < 0.02:
+            if supp and abs(current_price - supp)/current_price < p["sr_proximity"]:
                 score += 2; details.append("YAPI: Desteğe Yakın 🛡️")
-            elif res and abs(current_price - res)/current_price < 0.02:
+            elif res and abs(current_price - res)/current_price < p["sr_proximity"]:
                 score -= 2; details.append("YAPI: Dirence Yakın 🚧")
                 
             if div_label:
@@ -242,7 +306,7 @@ class AnalysisService:
                 details.append(f"🔥 {div_label}")
 
             if whale_signal:
-                if current_price > df["Open"].iloc[-1]: score += 2; details.append(f"🐋 HACİM: {whale_signal}")
+                if current_price > df["Open"][-1]: score += 2; details.append(f"🐋 HACİM: {whale_signal}")
                 else: score -= 2; details.append(f"🐋 HACİM: {whale_signal}")
 
             if candle_pattern:
@@ -253,15 +317,11 @@ class AnalysisService:
             elif "DÜŞÜŞ" in mtf_label and score < 0: score -= 1
             
             # R:R Filtresi (Puan Kırma)
-            if rr_ratio < 1.5 and score > 0:
+            if rr_ratio < p["min_rr"] and score > 0:
                 score -= 2
                 details.append("RİSK: R/R Oranı Düşük (Verimsiz)")
 
-            risk_label = "NÖTR"
-            if score >= 6: risk_label = "GÜÇLÜ AL 🚀"
-            elif score >= 2: risk_label = "AL 📈"
-            elif score <= -6: risk_label = "GÜÇLÜ SAT 🛑"
-            elif score <= -2: risk_label = "SAT 📉"
+            risk_label = AnalysisService.score_label(score)
 
             return {
                 "score": score,
@@ -288,7 +348,16 @@ class AnalysisService:
             return None
 
     @staticmethod
-    def analyze_market_health(df: pd.DataFrame):
+    def score_label(score):
+        """Puanı sinyal etiketine çevirir."""
+        if score >= 6: return "GÜÇLÜ AL 🚀"
+        if score >= 2: return "AL 📈"
+        if score <= -6: return "GÜÇLÜ SAT 🛑"
+        if score <= -2: return "SAT 📉"
+        return "NÖTR"
+
+    @staticmethod
+    def analyze_market_health(df: BarSeries):
         """
         Piyasa yönü (SMA50 / SMA200) kontrolü. Eksik veri durumuna toleranslı.
         """
@@ -301,9 +370,10 @@ class AnalysisService:
             window50 = 50 if length >= 50 else max(5, int(length / 4))
             window200 = 200 if length >= 200 else max(window50 + 1, int(length / 2))
 
-            sma50 = SMAIndicator(close=df["Close"], window=window50).sma_indicator().iloc[-1]
-            sma200 = SMAIndicator(close=df["Close"], window=window200).sma_indicator().iloc[-1]
-            current_price = float(df["Close"].iloc[-1])
+            close = pd.Series(np.asarray(df["Close"], dtype="float64"))
+            sma50 = ta_trend.SMAIndicator(close=close, window=window50).sma_indicator().iloc[-1]
+            sma200 = ta_trend.SMAIndicator(close=close, window=window200).sma_indicator().iloc[-1]
+            current_price = float(close.iloc[-1])
 
             status = "Nötr"
             trend_desc = ""
@@ -330,7 +400,7 @@ class AnalysisService:
             return "Hata", "Hesaplanamadı"
         
     @staticmethod
-    def _calculate_support_resistance(df: pd.DataFrame):
+    def _calculate_support_resistance(df: BarSeries):
         """
         Son 50 mumdaki en yüksek ve en düşük seviyeleri (Basit Destek/Direnç) bulur.
         """
@@ -338,14 +408,13 @@ class AnalysisService:
             return None, None
         
         # Son 50 mumluk pencere (Güncel mum hariç)
-        subset = df.iloc[-51:-1]
-        resistance = float(subset["High"].max())
-        support = float(subset["Low"].min())
+        resistance = float(np.nanmax(df["High"][-51:-1]))
+        support = float(np.nanmin(df["Low"][-51:-1]))
         
         return support, resistance
 
     @staticmethod
-    def _check_mean_reversion(current_price, sma50):
+    def _check_mean_reversion(current_price, sma50, band=0.15):
         """
         Fiyatın 50 ortalamadan ne kadar uzaklaştığını ölçer.
         Aşırı sapma varsa 'Mean Reversion' (Ortalamaya Dönüş) ihtimali artar.
@@ -354,30 +423,30 @@ class AnalysisService:
         
         diff_pct = (current_price - sma50) / sma50
         
-        # %15'ten fazla sapma varsa uyarı (Kripto/BIST için genelleme)
-        if diff_pct > 0.15:
+        # %15'ten (band) fazla sapma varsa uyarı (Kripto/BIST için genelleme)
+        if diff_pct > band:
             return "Aşırı Pahalı (Düzeltme Riski) ⚠️"
-        elif diff_pct < -0.15:
+        elif diff_pct < -band:
             return "Aşırı Ucuz (Tepki Gelebilir) 🛒"
         return None
     
     @staticmethod
-    def _detect_whale_volume(df: pd.DataFrame):
+    def _detect_whale_volume(df: BarSeries, ratio_high=2.0, ratio_ultra=3.0):
         """
         Son mumdaki hacmi, ortalama hacimle kıyaslar.
         """
         if len(df) < 20: return None
         
-        current_vol = df["Volume"].iloc[-1]
-        avg_vol = df["Volume"].iloc[-21:-1].mean() # Son mum hariç ortalama
+        current_vol = df["Volume"][-1]
+        avg_vol = np.nanmean(df["Volume"][-21:-1]) # Son mum hariç ortalama
         
         if avg_vol == 0: return None
         
         ratio = current_vol / avg_vol
         
-        if ratio >= 3.0:
+        if ratio >= ratio_ultra:
             return "ULTRA YÜKSEK (Balina 🐋)"
-        elif ratio >= 2.0:
+        elif ratio >= ratio_high:
             return "YÜKSEK (Dikkat) 🔥"
         return None
 
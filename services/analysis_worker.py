@@ -0,0 +1,178 @@
+# services/analysis_worker.py
+import os
+import time
+import socket
+import threading
+from services import lazy
+from services.market_data import MarketDataService
+from services.analysis_service import AnalysisService
+from services.chart_service import ChartService, _init_worker, _render_worker
+from services.quote_service import QuoteService
+from services.symbol_directory import SymbolDirectory
+from services.job_queue import JobQueueBackend
+from services.metrics import Metrics
+
+# Kuyruktaki /analiz işlerinin türü
+ANALYSIS_JOB = "analysis"
+
+class AnalysisWorker:
+    """
+    Kuyruktan /analiz işlerini alıp MarketDataService -> AnalysisService -> ChartService hattını
+    çalıştıran worker. Sonuç (fiyat, analiz, grafik bytes) kuyruğa geri yazılır; Telegram'a
+    sadece bot süreci konuşur. Her worker süreci tek iş çalıştırır, ölçek süreç sayısıyla artar
+    (`python worker.py --processes N`, kuyruk paylaşılıyorsa başka makinelerde de).
+    """
+    POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "0.2"))
+    HEARTBEAT = float(os.getenv("WORKER_HEARTBEAT", "5"))
+    # İş bu süre içinde heartbeat ile uzatılmazsa başka worker'a geçer
+    LEASE = float(os.getenv("WORKER_LEASE", "60"))
+    # Hata alan iş bu gecikmeyle (her denemede iki katı) tekrar sıraya girer
+    RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "2"))
+    # Bellek kuyruğunda bot sürecinde çalışan worker thread sayısı
+    LOCAL_WORKERS = int(os.getenv("JOB_LOCAL_WORKERS", "1"))
+
+    # matplotlib thread-safe değil; aynı süreçteki worker thread'leri sırayla çizer
+    _chart_lock = threading.Lock()
+    _threads = []
+    _stop = None
+
+    @staticmethod
+    def process(payload: dict):
+        """Tek iş: (sonuç sözlüğü, grafik bytes veya None). Sembol/veri bulunamazsa found=False."""
+        symbol, interval = payload["symbol"], payload["interval"]
+        macro_interval = MarketDataService.get_macro_interval(interval)
+        period = MarketDataService.get_period_for_interval(interval, "1y")
+
+        with Metrics.span("worker.fetch"):
+            stock_df = MarketDataService.get_historical_data(symbol, period=period, interval=interval)
+            meta = QuoteService.get_meta(symbol)
+        price_info = QuoteService.from_bars(symbol, stock_df)
+        if price_info is None:
+            # Yahoo "yok" dediyse bilinmeyen sayılır (bot da negatif cache'ine yazar); ağ hatası geçicidir
+            unknown = meta is None and QuoteService.confirmed_missing(symbol)
+            if unknown:
+                SymbolDirectory.mark_unknown(symbol)
+            return {"found": False, "unknown": unknown}, None
+        SymbolDirectory.learn(symbol)
+
+        with Metrics.span("worker.analysis"):
+            macro_df = MarketDataService.get_macro_data(
+                symbol, stock_df, interval, macro_interval,
+                MarketDataService.get_period_for_interval(macro_interval, "2y"),
+            )
+            analysis = AnalysisService.calculate_technical_signals(stock_df, macro_df=macro_df)
+        if not analysis:
+            return {"found": False}, None
+        analysis["price"] = price_info["price"]
+
+        levels = analysis["levels"]
+        with Metrics.span("worker.chart"), AnalysisWorker._chart_lock:
+            image, _ = _render_worker(stock_df[-ChartService.TAIL_BARS:], symbol, levels["support"], levels["resistance"])
+
+        return {
+            "found": True,
+            "symbol": symbol,
+            "interval": interval,
+            "macro_interval": macro_interval,
+            "bar": stock_df.last_time,
+            "revision": ChartService.bar_revision(stock_df),
+            "price_info": price_info,
+            "analysis": analysis,
+        }, image
+
+    @staticmethod
+    def worker_id() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def run(queue: JobQueueBackend, worker_id: str = None, stop: threading.Event = None):
+        """İşleri stop set edilene kadar alır ve çalıştırır."""
+        AnalysisWorker.prepare()
+        worker_id = worker_id or AnalysisWorker.worker_id()
+        stop = stop or threading.Event()
+        state = {
+            "host": socket.gethostname(), "pid": os.getpid(), "started_at": time.time(),
+            "current_job": None, "processed": 0, "failed": 0, "last_job_ms": None,
+        }
+
+        def beat():
+            while True:
+                try:
+                    queue.heartbeat(worker_id, dict(state), lease=AnalysisWorker.LEASE)
+                except Exception as e:
+                    print(f"[AnalysisWorker] Heartbeat Hatası: {e}")
+                if stop.wait(AnalysisWorker.HEARTBEAT):
+                    return
+
+        heart = threading.Thread(target=beat, name=f"heartbeat-{worker_id}", daemon=True)
+        heart.start()
+        print(f"[AnalysisWorker] {worker_id} hazır.")
+
+        while not stop.is_set():
+            try:
+                job = queue.claim(worker_id, kinds=(ANALYSIS_JOB,), lease=AnalysisWorker.LEASE)
+            except Exception as e:
+                print(f"[AnalysisWorker] Kuyruk Hatası: {e}")
+                job = None
+            if job is None:
+                stop.wait(AnalysisWorker.POLL_INTERVAL)
+                continue
+
+            state["current_job"] = job["id"]
+            started = time.perf_counter()
+            failed = False
+            try:
+                result, image = AnalysisWorker.process(job["payload"])
+                queue.complete(job["id"], result, image)
+                state["processed"] += 1
+            except Exception as e:
+                print(f"[AnalysisWorker] İş #{job['id']} Hatası (deneme {job['attempts']}/{job['max_attempts']}): {e}")
+                failed = True
+                state["failed"] += 1
+                try:
+                    queue.fail(job["id"], str(e), retry_delay=AnalysisWorker.RETRY_DELAY * 2 ** (job["attempts"] - 1))
+                except Exception as queue_error:
+                    # Kira dolunca iş zaten tekrar sıraya girer
+                    print(f"[AnalysisWorker] Kuyruk Hatası: {queue_error}")
+            finally:
+                seconds = time.perf_counter() - started
+                state["current_job"] = None
+                state["last_job_ms"] = round(seconds * 1000, 1)
+                Metrics.observe("worker.job", seconds, error=failed)
+            try:
+                # Durum /stats'ta hemen görünsün
+                queue.heartbeat(worker_id, dict(state), lease=AnalysisWorker.LEASE)
+            except Exception as e:
+                print(f"[AnalysisWorker] Heartbeat Hatası: {e}")
+
+        heart.join(timeout=1)
+
+    @staticmethod
+    def prepare():
+        """Worker sürecinin ilk işi soğuk başlamasın: ağır modüller ve çizici önceden yüklenir."""
+        for name in ("pandas", "yfinance", "ta.trend"):
+            lazy.load(lazy.lazy_import(name))
+        _init_worker()
+
+    @staticmethod
+    def start_threads(queue: JobQueueBackend, count: int = None):
+        """Bellek kuyruğu için worker'ları bot sürecinde thread olarak başlatır."""
+        if AnalysisWorker._threads:
+            return
+        AnalysisWorker._stop = threading.Event()
+        for i in range(count or AnalysisWorker.LOCAL_WORKERS):
+            thread = threading.Thread(
+                target=AnalysisWorker.run,
+                args=(queue, f"{socket.gethostname()}:{os.getpid()}:local-{i}", AnalysisWorker._stop),
+                name=f"analysis-worker-{i}", daemon=True,
+            )
+            thread.start()
+            AnalysisWorker._threads.append(thread)
+
+    @staticmethod
+    def stop_threads():
+        if AnalysisWorker._stop is not None:
+            AnalysisWorker._stop.set()
+        for thread in AnalysisWorker._threads:
+            thread.join(timeout=5)
+        AnalysisWorker._threads = []
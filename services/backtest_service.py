@@ -0,0 +1,326 @@
+# services/backtest_service.py
+from __future__ import annotations
+import os
+import sys
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from services.market_data import MarketDataService
+from services.analysis_service import AnalysisService
+from services.indicator_engine import IndicatorEngine, _ewm
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+class BacktestService:
+    """
+    calculate_technical_signals puanlamasını geçmişin HER barı için tek vektörel geçişte
+    hesaplar (bar bar fonksiyon çağrısı yok) ve ATR tabanlı stop/hedef çıkışlarını simüle eder.
+    t barındaki puan, df.iloc[:t+1] ile calculate_technical_signals çağrılsaydı çıkacak puandır:
+    - Tepe/dipler ancak 2 bar sonra teyit edildiği için t-2'ye kadar olanlar görülür.
+    - MTF: üst zaman dilimi micro barlardan türetilir; t anındaki açık kovanın EMA50'si
+      bir önceki kapanmış kovanın EMA durumundan tek adımda hesaplanır.
+    """
+    # İşlem açılan en düşük puan ("AL" ve üstü)
+    MIN_SCORE = int(os.getenv("BACKTEST_MIN_SCORE", "2"))
+    # Stop/hedef bu kadar bar içinde gelmezse pozisyon kapanışta kapatılır
+    HORIZON = int(os.getenv("BACKTEST_HORIZON", "20"))
+    # İlk barlar indikatörler ve 50 mumluk destek/direnç için ısınma
+    WARMUP_BARS = 50
+    # Yahoo'nun izin verdiği en uzun geçmiş (1h için ~730 gün)
+    PERIODS = {
+        "1m": "5d", "5m": "1mo", "15m": "1mo", "30m": "1mo",
+        "1h": "1y", "4h": "1y", "1d": "10y", "1wk": "10y",
+    }
+
+    @staticmethod
+    def run(symbol: str, interval: str = "1d", period: str = None, min_score: int = None, horizon: int = None):
+        """
+        Sembolün geçmişini indirir ve backtest eder.
+        Dönüş: summarize() sözlüğü (+ "symbol", "interval", "period") veya veri yoksa None.
+        """
+        period = period or BacktestService.PERIODS.get(interval, "2y")
+        df = MarketDataService.get_historical_data(symbol, period=period, interval=interval)
+        if df is None or len(df) <= BacktestService.WARMUP_BARS + 1:
+            return None
+
+        search_symbol = MarketDataService._normalize_symbol(symbol)
+        result = BacktestService.backtest(df, interval, search_symbol, min_score=min_score, horizon=horizon)
+        result.update({"symbol": symbol.upper(), "interval": interval, "period": period})
+        return result
+
+    @staticmethod
+    def backtest(df: pd.DataFrame, interval: str, symbol: str = "", min_score: int = None, horizon: int = None,
+                 params: dict = None) -> dict:
+        min_score = BacktestService.MIN_SCORE if min_score is None else min_score
+        horizon = BacktestService.HORIZON if horizon is None else horizon
+
+        signals = BacktestService.score_history(df, interval, symbol, params)
+        trades = BacktestService.simulate(df, signals, min_score=min_score, horizon=horizon)
+        summary = BacktestService.summarize(trades)
+        summary.update({"bars": len(df), "min_score": min_score, "horizon": horizon})
+        return summary
+
+    @staticmethod
+    def score_history(df: pd.DataFrame, interval: str, symbol: str = "", params: dict = None) -> pd.DataFrame:
+        """Her bar için puan, stop ve hedef (ısınma barları 0 puan)."""
+        return BacktestService.score_features(BacktestService.features(df, interval, symbol), params)
+
+    @staticmethod
+    def features(df: pd.DataFrame, interval: str, symbol: str = "") -> dict:
+        """
+        Puanlamanın parametreden bağımsız girdileri (indikatörler, S/R uzaklığı, uyumsuzluk,
+        hacim oranı, pinbar, MTF). Bir kez hesaplanıp farklı parametre setleriyle tekrar puanlanabilir.
+        """
+        o, h, l, c, v = (np.asarray(df[col], dtype="float64") for col in ("Open", "High", "Low", "Close", "Volume"))
+        n = len(c)
+        ind = IndicatorEngine.compute(df)
+
+        # Destek / Direnç: t'den önceki 50 mum
+        supp = np.full(n, np.nan)
+        res = np.full(n, np.nan)
+        if n > 50:
+            supp[50:] = sliding_window_view(l[:-1], 50).min(axis=1)
+            res[50:] = sliding_window_view(h[:-1], 50).max(axis=1)
+
+        # Balina Hacmi: t'den önceki 20 mumun ortalaması
+        avg_vol = np.full(n, np.nan)
+        if n > 20:
+            avg_vol[20:] = sliding_window_view(v[:-1], 20).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volume_ratio = np.where(avg_vol == 0, np.nan, v / avg_vol)
+
+        # Mum Formasyonu (calculate_technical_signals gibi ters çekiç de +3)
+        body = np.abs(c - o)
+        upper_wick = h - np.maximum(o, c)
+        lower_wick = np.minimum(o, c) - l
+        min_body = np.maximum(body, 0.0001)
+        hammer = (lower_wick > 2 * min_body) & (lower_wick > 1.5 * upper_wick)
+        shooting = (upper_wick > 2 * min_body) & (upper_wick > 1.5 * lower_wick)
+
+        bullish, bearish = BacktestService._divergence_history(c, ind["rsi"])
+        with np.errstate(invalid="ignore"):
+            return {
+                "index": df.index,
+                "close": c,
+                "rising": c > o,
+                "rsi": ind["rsi"],
+                "atr": ind["atr"],
+                "macd_up": ind["macd"] > ind["macd_signal"],
+                "below_bb": c < ind["bb_lower"],
+                "supp_dist": np.abs(c - supp) / c,
+                "res_dist": np.abs(c - res) / c,
+                "divergence": np.where(bullish, 1, np.where(bearish, -1, 0)),
+                "volume_ratio": volume_ratio,
+                "pinbar": hammer | shooting,
+                "macro_up": BacktestService._macro_trend_history(df, c, interval, symbol),
+            }
+
+    @staticmethod
+    def score_features(f: dict, params: dict = None) -> pd.DataFrame:
+        """features() çıktısını verilen eşiklerle (varsayılan: AnalysisService.PARAMS) puanlar."""
+        p = AnalysisService.PARAMS if params is None else params
+        c, rsi, atr = f["close"], f["rsi"], f["atr"]
+        score = np.zeros(len(c), dtype=int)
+
+        with np.errstate(invalid="ignore"):
+            # İndikatör Puanları
+            score += np.where(rsi < p["rsi_oversold"], 2, np.where(rsi > p["rsi_overbought"], -2, 0))
+            score += np.where(f["macd_up"], 1, -1)
+            score += np.where(f["below_bb"], 2, 0)
+
+            # Destek / Direnç
+            score += np.where(f["supp_dist"] < p["sr_proximity"], 2,
+                              np.where(f["res_dist"] < p["sr_proximity"], -2, 0))
+
+            # RSI Uyumsuzluğu
+            score += 3 * f["divergence"]
+
+            # Balina Hacmi
+            whale = f["volume_ratio"] >= p["whale_ratio"]
+            score += np.where(whale, np.where(f["rising"], 2, -2), 0)
+
+        # Mum Formasyonu
+        score += np.where(f["pinbar"], 3, 0)
+
+        # MTF Bonus
+        macro_up = f["macro_up"]
+        if macro_up is not None:
+            score += np.where((macro_up == 1) & (score > 0), 1, 0)
+            score -= np.where((macro_up == 0) & (score < 0), 1, 0)
+
+        # R:R Filtresi
+        stop_loss = np.round(c - p["stop_atr"] * atr, 4)
+        take_profit = np.round(c + p["target_atr"] * atr, 4)
+        risk = c - stop_loss
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rr_ratio = np.where(risk > 0, np.round((take_profit - c) / risk, 2), 0.0)
+        score -= np.where((rr_ratio < p["min_rr"]) & (score > 0), 2, 0)
+
+        score[:BacktestService.WARMUP_BARS] = 0
+        return pd.DataFrame(
+            {"score": score, "close": c, "stop_loss": stop_loss, "take_profit": take_profit},
+            index=f["index"],
+        )
+
+    @staticmethod
+    def _confirmed_pivots(mask: np.ndarray, values: np.ndarray, lag: int = 2):
+        """
+        Her t için t-lag'e kadar teyit edilmiş son iki pivotun indeks ve değerleri.
+        Pivot yoksa indeks -1.
+        """
+        n = len(mask)
+        positions = np.flatnonzero(mask)
+        # t anında görülebilen pivot sayısı
+        count = np.zeros(n, dtype=int)
+        if lag < n:
+            count[lag:] = np.cumsum(mask)[:n - lag]
+        padded = np.concatenate([[-1, -1], positions])
+        last_idx = padded[count + 1]
+        prev_idx = padded[count]
+        values = np.append(values, np.nan)  # -1 indeksi NaN'a düşer
+        return last_idx, prev_idx, values[last_idx], values[prev_idx]
+
+    @staticmethod
+    def _divergence_history(close: np.ndarray, rsi: np.ndarray):
+        """detect_rsi_divergence kurallarının her bar için (sadece teyitli pivotlarla) karşılığı."""
+        price_peaks, price_troughs = AnalysisService._pivot_masks(close, 2)
+        rsi_peaks, rsi_troughs = AnalysisService._pivot_masks(rsi, 2)
+
+        p_tr, p_tr_prev, p_tr_val, p_tr_prev_val = BacktestService._confirmed_pivots(price_troughs, close)
+        r_tr, r_tr_prev, r_tr_val, r_tr_prev_val = BacktestService._confirmed_pivots(rsi_troughs, rsi)
+        has_troughs = (p_tr_prev >= 0) & (r_tr_prev >= 0)
+        bullish = has_troughs & (np.abs(p_tr - r_tr) <= 3) & (p_tr_val < p_tr_prev_val) & (r_tr_val > r_tr_prev_val)
+
+        p_pk, p_pk_prev, p_pk_val, p_pk_prev_val = BacktestService._confirmed_pivots(price_peaks, close)
+        r_pk, r_pk_prev, r_pk_val, r_pk_prev_val = BacktestService._confirmed_pivots(rsi_peaks, rsi)
+        bearish = (
+            has_troughs & ~bullish
+            & (p_pk_prev >= 0) & (r_pk_prev >= 0)
+            & (np.abs(p_pk - r_pk) <= 3)
+            & (p_pk_val > p_pk_prev_val) & (r_pk_val < r_pk_prev_val)
+        )
+
+        # detect_rsi_divergence 20 mumdan kısa seride çalışmaz
+        bullish[:19] = False
+        bearish[:19] = False
+        return bullish, bearish
+
+    @staticmethod
+    def _macro_trend_history(df: pd.DataFrame, close: np.ndarray, interval: str, symbol: str):
+        """
+        Her bar için üst zaman diliminde Close > EMA50 (1), değil (0) veya bilinmiyor (-1).
+        O an açık olan kovanın kapanışı güncel micro kapanıştır; EMA50'si bir önceki kapanmış
+        kovanın EMA'sından tek adımda çıkar. Üst zaman dilimi türetilemiyorsa None.
+        """
+        macro_interval = MarketDataService.get_macro_interval(interval)
+        if not MarketDataService._can_resample(interval, macro_interval):
+            return None
+        buckets = MarketDataService.bucket_index(df.index, macro_interval, symbol)
+        bucket_no = np.concatenate([[0], np.cumsum(np.asarray(buckets[1:] != buckets[:-1]))])
+
+        # Kapanmış kovaların kapanışları ve (min_periods maskesiz) EMA50 durumu
+        macro_close = pd.Series(close).groupby(bucket_no).last().to_numpy()
+        alpha = 2 / (50 + 1)
+        state = _ewm(macro_close, alpha, 0)
+
+        prev_state = np.where(bucket_no > 0, state[np.maximum(bucket_no - 1, 0)], np.nan)
+        live_ema = np.where(bucket_no > 0, alpha * close + (1 - alpha) * prev_state, close)
+        trend = np.where(close > live_ema, 1, 0)
+        # EMA50 için en az MIN_MACRO_BARS kova (açık kova dahil) gerekir
+        trend[bucket_no + 1 < MarketDataService.MIN_MACRO_BARS] = -1
+        return trend
+
+    @staticmethod
+    def simulate(df: pd.DataFrame, signals: pd.DataFrame, min_score: int = 2, horizon: int = 20) -> pd.DataFrame:
+        """
+        Puanı min_score ve üstü olan her barda kapanıştan long açılır.
+        Sonraki 'horizon' bar içinde önce stop mu hedef mi geldiğine bakılır; aynı barda
+        ikisi birden olursa stop sayılır. Hiçbiri yoksa horizon sonundaki kapanışta çıkılır.
+        Getiri R cinsindendir (1R = giriş - stop).
+        """
+        h = np.asarray(df["High"], dtype="float64")
+        l = np.asarray(df["Low"], dtype="float64")
+        c = np.asarray(df["Close"], dtype="float64")
+        n = len(c)
+
+        entry_price = signals["close"].to_numpy()
+        stop = signals["stop_loss"].to_numpy()
+        target = signals["take_profit"].to_numpy()
+        risk = entry_price - stop
+
+        entries = np.flatnonzero((signals["score"].to_numpy() >= min_score) & (risk > 0))
+        # Sonucu görülebilecek kadar gelecek barı olanlar
+        entries = entries[entries + horizon < n]
+        columns = ["entry_time", "entry", "stop_loss", "take_profit", "exit", "outcome", "bars", "r", "return_pct"]
+        if len(entries) == 0:
+            return pd.DataFrame(columns=columns)
+
+        future_high = sliding_window_view(h[1:], horizon)[entries]
+        future_low = sliding_window_view(l[1:], horizon)[entries]
+        hit_stop = future_low <= stop[entries, None]
+        hit_target = future_high >= target[entries, None]
+
+        never = horizon
+        first_stop = np.where(hit_stop.any(axis=1), hit_stop.argmax(axis=1), never)
+        first_target = np.where(hit_target.any(axis=1), hit_target.argmax(axis=1), never)
+
+        stopped = (first_stop <= first_target) & (first_stop < never)
+        targeted = ~stopped & (first_target < never)
+        outcome = np.where(stopped, "stop", np.where(targeted, "target", "time"))
+
+        time_exit = c[entries + horizon]
+        exit_price = np.where(stopped, stop[entries], np.where(targeted, target[entries], time_exit))
+        bars = np.where(stopped, first_stop + 1, np.where(targeted, first_target + 1, horizon))
+
+        return pd.DataFrame({
+            "entry_time": df.index[entries],
+            "entry": entry_price[entries],
+            "stop_loss": stop[entries],
+            "take_profit": target[entries],
+            "exit": exit_price,
+            "outcome": outcome,
+            "bars": bars,
+            "r": (exit_price - entry_price[entries]) / risk[entries],
+            "return_pct": (exit_price / entry_price[entries] - 1) * 100,
+        }, columns=columns)
+
+    @staticmethod
+    def summarize(trades: pd.DataFrame) -> dict:
+        """İsabet oranı, beklenen getiri (R ve %), R bazlı en büyük düşüş."""
+        count = len(trades)
+        if count == 0:
+            return {"trades": 0, "hit_rate": 0.0, "stop_rate": 0.0, "expectancy_r": 0.0,
+                    "avg_return_pct": 0.0, "total_r": 0.0, "max_drawdown_r": 0.0, "avg_bars": 0.0}
+
+        r = trades["r"].to_numpy()
+        equity = np.cumsum(r)
+        drawdown = np.maximum.accumulate(np.maximum(equity, 0)) - equity
+        return {
+            "trades": count,
+            "hit_rate": round(float((trades["outcome"] == "target").mean()), 3),
+            "stop_rate": round(float((trades["outcome"] == "stop").mean()), 3),
+            "expectancy_r": round(float(r.mean()), 3),
+            "avg_return_pct": round(float(trades["return_pct"].mean()), 3),
+            "total_r": round(float(equity[-1]), 2),
+            "max_drawdown_r": round(float(drawdown.max()), 2),
+            "avg_bars": round(float(trades["bars"].mean()), 1),
+        }
+
+if __name__ == "__main__":
+    # Kullanım: python -m services.backtest_service THYAO 1h [period] [min_score] [horizon]
+    args = sys.argv[1:]
+    if not args:
+        print("Kullanım: python -m services.backtest_service <KOD> [interval] [period] [min_score] [horizon]")
+        sys.exit(1)
+    report = BacktestService.run(
+        args[0],
+        args[1] if len(args) > 1 else "1d",
+        period=args[2] if len(args) > 2 else None,
+        min_score=int(args[3]) if len(args) > 3 else None,
+        horizon=int(args[4]) if len(args) > 4 else None,
+    )
+    if report is None:
+        print("Veri alınamadı.")
+        sys.exit(1)
+    for key, value in report.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,105 @@
+# services/bar_series.py
+from __future__ import annotations
+import os
+import numpy as np
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+class BarSeries:
+    """
+    Cache'te tutulan ve analize giden OHLCV serisi: her sütun ayrı, bitişik bir NumPy dizisi.
+    - time: UTC epoch nanosaniye (int64); tz sadece gösterim / takvim hesapları için saklanır
+    - Fiyatlar BAR_PRICE_DTYPE (float64 veya bellek için float32), hacim float64
+    - Dividends / Stock Splits gibi kullanılmayan sütunlar taşınmaz
+    - bars[a:b] kopyasız görünüm döner; bars["Close"] sütun dizisinin kendisidir
+    Paylaşımlıdır, dizileri değiştirilmemelidir. pandas'a sadece gerektiğinde (mplfinance,
+    takvim gruplama) to_frame() / index ile çevrilir.
+    """
+    __slots__ = ("time", "open", "high", "low", "close", "volume", "tz", "__weakref__")
+
+    PRICE_DTYPE = np.dtype(os.getenv("BAR_PRICE_DTYPE", "float64"))
+
+    def __init__(self, time, open, high, low, close, volume, tz: str = "UTC"):
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.tz = tz
+
+    @staticmethod
+    def from_arrays(time, open, high, low, close, volume, tz: str = "UTC", dtype=None):
+        """Dizileri serinin dtype'larına çevirir (zaten uygunsa kopyalamaz)."""
+        dtype = BarSeries.PRICE_DTYPE if dtype is None else np.dtype(dtype)
+        prices = [np.ascontiguousarray(a, dtype=dtype) for a in (open, high, low, close)]
+        return BarSeries(
+            np.ascontiguousarray(time, dtype="int64"), *prices,
+            np.ascontiguousarray(volume, dtype="float64"), tz,
+        )
+
+    @staticmethod
+    def from_frame(df, dtype=None):
+        """yfinance / pandas çerçevesinden seri; boş veya None ise None."""
+        if df is None or df.empty:
+            return None
+        index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+        return BarSeries.from_arrays(
+            index.asi8, *(df[col].to_numpy() for col in OHLCV_COLUMNS),
+            tz=str(index.tz), dtype=dtype,
+        )
+
+    def to_frame(self):
+        """pandas DataFrame (borsa saat diliminde). Her çağrıda yeni çerçeve kurulur."""
+        return pd.DataFrame(
+            {"Open": self.open, "High": self.high, "Low": self.low, "Close": self.close, "Volume": self.volume},
+            index=self.index,
+        )
+
+    @property
+    def index(self):
+        """Zaman damgaları DatetimeIndex olarak (int64 dizinin üzerine kurulur)."""
+        return pd.DatetimeIndex(self.time.view("M8[ns]")).tz_localize("UTC").tz_convert(self.tz)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.time) == 0
+
+    @property
+    def last_time(self) -> int:
+        """Son barın epoch ns zaman damgası (cache anahtarlarında kullanılır)."""
+        return int(self.time[-1])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.time, self.open, self.high, self.low, self.close, self.volume))
+
+    def bar(self, i: int) -> dict:
+        """Tek bar: {"Open", "High", "Low", "Close", "Volume"} (float)."""
+        return {col: float(self[col][i]) for col in OHLCV_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, key.lower())
+        if isinstance(key, slice):
+            return BarSeries(
+                self.time[key], self.open[key], self.high[key], self.low[key],
+                self.close[key], self.volume[key], self.tz,
+            )
+        raise TypeError(f"BarSeries sütun adı veya dilim bekler: {key!r}")
+
+    def __repr__(self) -> str:
+        span = f"{self.index[0]} .. {self.index[-1]}" if len(self) else "boş"
+        return f"<BarSeries {len(self)} bar, {self.close.dtype}, {span}>"
+
+def as_bars(df):
+    """BarSeries'i olduğu gibi, pandas çerçevesini çevirerek döner (None -> None)."""
+    if df is None or isinstance(df, BarSeries):
+        return df
+    return BarSeries.from_frame(df)
@@ -0,0 +1,173 @@
+# services/bar_store.py
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import numpy as np
+from services.bar_series import BarSeries, OHLCV_COLUMNS
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+class BarStore:
+    """
+    (sembol, interval) bazında OHLCV barlarını SQLite'ta saklayan kalıcı depo.
+    - bars: her bar için tek satır (ts = UTC epoch saniye), aynı ts gelirse üzerine yazılır
+    - coverage: hangi tarihten itibaren kesintisiz veri tutulduğu ve borsanın saat dilimi
+    - symbol_meta: sembolün değişmeyen bilgileri (para birimi, borsa, saat dilimi)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, interval, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS coverage (
+                symbol TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                start_ts INTEGER NOT NULL,
+                tz TEXT,
+                PRIMARY KEY (symbol, interval)
+            );
+            CREATE TABLE IF NOT EXISTS symbol_meta (
+                symbol TEXT PRIMARY KEY,
+                currency TEXT,
+                exchange TEXT,
+                tz TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+    def coverage(self, symbol: str, interval: str):
+        """(start_ts, last_ts, tz) döner; kayıt yoksa None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT start_ts, tz FROM coverage WHERE symbol=? AND interval=?", (symbol, interval)
+            ).fetchone()
+            if row is None:
+                return None
+            last = self._conn.execute(
+                "SELECT MAX(ts) FROM bars WHERE symbol=? AND interval=?", (symbol, interval)
+            ).fetchone()[0]
+        if last is None:
+            return None
+        return row[0], last, row[1]
+
+    def load(self, symbol: str, interval: str, start_ts: int = 0):
+        """start_ts'den itibaren barları BarSeries olarak döner (borsa saat diliminde)."""
+        with self._lock:
+            tz_row = self._conn.execute(
+                "SELECT tz FROM coverage WHERE symbol=? AND interval=?", (symbol, interval)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM bars "
+                "WHERE symbol=? AND interval=? AND ts>=? ORDER BY ts",
+                (symbol, interval, int(start_ts)),
+            ).fetchall()
+        if not rows:
+            return None
+
+        arr = np.asarray(rows, dtype="float64")
+        return BarSeries.from_arrays(
+            arr[:, 0].astype("int64") * 1_000_000_000, *arr[:, 1:].T,
+            tz=(tz_row[0] if tz_row and tz_row[0] else "UTC"),
+        )
+
+    def session_start(self, symbol: str, interval: str, sessions: int, since: int = 0):
+        """
+        Son 'sessions' işlem gününün (borsa saat dilimindeki tarih) ilk barının ts'i ve since'ten
+        beri depoda bulunan işlem günü sayısı: (ts, adet). Bar yoksa (None, 0).
+        """
+        with self._lock:
+            tz_row = self._conn.execute(
+                "SELECT tz FROM coverage WHERE symbol=? AND interval=?", (symbol, interval)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT ts FROM bars WHERE symbol=? AND interval=? AND ts>=? ORDER BY ts",
+                (symbol, interval, int(since)),
+            ).fetchall()
+        if not rows:
+            return None, 0
+
+        ts = np.fromiter((row[0] for row in rows), dtype="int64", count=len(rows))
+        tz = tz_row[0] if tz_row and tz_row[0] else "UTC"
+        # Yerel gece yarısı (ns): aynı işlem gününün barları aynı değeri alır
+        days = pd.DatetimeIndex(ts * 1_000_000_000, tz="UTC").tz_convert(tz).normalize().asi8
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        first = starts[-sessions] if len(starts) >= sessions else starts[0]
+        return int(ts[first]), len(starts)
+
+    def upsert(self, symbol: str, interval: str, df: pd.DataFrame, covered_from: int = None):
+        """
+        Barları ekler/günceller (aynı zaman damgası tekrar gelirse son hali yazılır).
+        covered_from verilirse kesintisiz kapsama başlangıcı bu değere ayarlanır.
+        """
+        if df is None or df.empty:
+            return
+        index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+        ts = index.asi8 // 1_000_000_000
+        values = df[OHLCV_COLUMNS].to_numpy(dtype="float64")
+        rows = [
+            (symbol, interval, int(t), *map(float, v))
+            for t, v in zip(ts, values)
+        ]
+        tz = str(index.tz)
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            if covered_from is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+                    (symbol, interval, int(covered_from), tz),
+                )
+            self._conn.commit()
+
+    def load_meta(self, symbol: str):
+        """{"currency", "exchange", "timezone"} veya kayıt yoksa None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT currency, exchange, tz FROM symbol_meta WHERE symbol=?", (symbol,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"currency": row[0], "exchange": row[1], "timezone": row[2]}
+
+    def save_meta(self, symbol: str, meta: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO symbol_meta VALUES (?, ?, ?, ?)",
+                (symbol, meta.get("currency"), meta.get("exchange"), meta.get("timezone")),
+            )
+            self._conn.commit()
+
+    def known_symbols(self) -> list:
+        """Daha önce verisi veya bilgisi başarıyla alınmış semboller."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol FROM symbol_meta UNION SELECT DISTINCT symbol FROM coverage"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self, symbol: str, interval: str):
+        """Sembolün bu interval'deki tüm verisini siler (ör. temettü sonrası yeniden indirme)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM bars WHERE symbol=? AND interval=?", (symbol, interval))
+            self._conn.execute("DELETE FROM coverage WHERE symbol=? AND interval=?", (symbol, interval))
+            self._conn.commit()
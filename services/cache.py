@@ -0,0 +1,125 @@
+# services/cache.py
+import time
+import threading
+from collections import OrderedDict
+
+class _Flight:
+    """Aynı anahtar için devam eden tek bir yükleme işlemi."""
+    __slots__ = ("event", "value")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+class TTLCache:
+    """
+    Thread-safe, boyut sınırlı (LRU) ve süreli (TTL) bellek içi cache.
+    get_or_load() single-flight çalışır: aynı anahtar için eşzamanlı
+    cache miss'lerde loader sadece bir kez çağrılır, diğerleri sonucu bekler.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256, default_ttl: float = 60.0):
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}         # key -> _Flight
+        self._lock = threading.Lock()
+
+        # Sayaçlar
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # Başka bir yüklemeyi bekleyip sonucunu paylaşanlar
+        self.evictions = 0
+
+    def _lookup(self, key, now):
+        """Lock altında çağrılır. Süresi dolmuş kaydı siler."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        """Lock altında çağrılır. Boyut aşılırsa en eski kaydı atar."""
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        with self._lock:
+            self._store(key, value, self.default_ttl if ttl is None else ttl)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key, loader, ttl: float = None):
+        """
+        Cache'te varsa döner; yoksa loader() ile yükler.
+        loader None dönerse (hata) sonuç cache'lenmez.
+        """
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is not None:
+                self.hits += 1
+                return value
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                leader = False
+                self.coalesced += 1
+            else:
+                leader = True
+                self.misses += 1
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            return flight.value
+
+        try:
+            value = loader()
+            flight.value = value
+            if value is not None:
+                with self._lock:
+                    self._store(key, value, self.default_ttl if ttl is None else ttl)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            }
@@ -1,54 +1,134 @@
 # services/chart_service.py
+from __future__ import annotations
 import io
-import mplfinance as mpf
-import pandas as pd
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from services.cache import TTLCache
+from services.indicator_engine import IndicatorEngine
+from services.bar_series import BarSeries, as_bars
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Sadece klasik çizici kullanır; ana süreçte hiç yüklenmeyebilir
+mpf = lazy_import("mplfinance")
+
+# Süreç başına bir kez oluşturulan grafik stili / hızlı çizici (worker başlarken ısıtılır)
+_STYLE = None
+_RENDERER = None
+
+def _get_style():
+    global _STYLE
+    if _STYLE is None:
+        # Yahoo tarzı, koyu tema
+        mc = mpf.make_marketcolors(up='#00ff00', down='#ff0000', inherit=True)
+        _STYLE = mpf.make_mpf_style(base_mpf_style='nightclouds', marketcolors=mc)
+    return _STYLE
+
+def _get_renderer():
+    global _RENDERER
+    if _RENDERER is None:
+        from services.fast_chart import FastChartRenderer
+        _RENDERER = FastChartRenderer(ChartService.WIDTH, ChartService.HEIGHT, bars=ChartService.PLOT_BARS)
+    return _RENDERER
+
+def _init_worker():
+    """Render worker'ı başlarken backend, font cache'i ve stili hazırlar; ilk grafik soğuk başlamaz."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import font_manager
+    font_manager.findfont(font_manager.FontProperties())
+    if ChartService.BACKEND == "fast":
+        _get_renderer()
+    else:
+        _get_style()
+
+def _render_worker(df: BarSeries, symbol: str, support, resistance):
+    """Worker sürecinde çalışır: (görüntü bytes, render süresi ms) döner."""
+    started = time.perf_counter()
+    if ChartService.BACKEND == "fast":
+        image = ChartService.create_fast_chart(df, symbol, support=support, resistance=resistance)
+    else:
+        buf = ChartService.create_chart(df, symbol, support=support, resistance=resistance)
+        image = buf.getvalue() if buf is not None else None
+    if image is None:
+        return None, 0.0
+    return image, (time.perf_counter() - started) * 1000
 
 class ChartService:
+    # --- Render havuzu ayarları ---
+    WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+    # Aynı anda bekleyen/çizilen en fazla grafik; aşılırsa grafik atlanır
+    QUEUE_DEPTH = int(os.getenv("CHART_QUEUE_DEPTH", "16"))
+    TIMEOUT = float(os.getenv("CHART_TIMEOUT", "20"))
+    # SMA50'nin son 60 mumu için gereken en kısa geçmiş (worker'a sadece bu kadarı gönderilir)
+    PLOT_BARS = 60
+    TAIL_BARS = PLOT_BARS + 49
+
+    # --- Çizici ---
+    # "mplfinance": klasik çıktı | "fast": tekrar kullanılan Agg figürü, sabit boyut
+    BACKEND = os.getenv("CHART_BACKEND", "mplfinance").lower()
+    # Sadece "fast" çizicide: png (palet + optimize) / webp / jpeg
+    FORMAT = os.getenv("CHART_FORMAT", "png").lower()
+    QUALITY = int(os.getenv("CHART_QUALITY", "80"))
+    WIDTH = int(os.getenv("CHART_WIDTH", "960"))
+    HEIGHT = int(os.getenv("CHART_HEIGHT", "640"))
+
+    _pool = None
+    _inflight = {}  # anahtar -> asyncio.Future (aynı grafik için eşzamanlı istekler tek render bekler)
+    _orphaned = 0   # süresi dolduğu halde worker'da çalışmaya devam eden render'lar
+    _cache = TTLCache(
+        "chart",
+        max_entries=int(os.getenv("CHART_CACHE_SIZE", "128")),
+        default_ttl=float(os.getenv("CHART_CACHE_TTL", "900")),
+    )
+    _stats = {"renders": 0, "rejected": 0, "timeouts": 0, "errors": 0, "render_ms_total": 0.0, "render_ms_last": 0.0}
+
     @staticmethod
-    def create_chart(df: pd.DataFrame, symbol: str, support=None, resistance=None):
+    def create_chart(df: BarSeries, symbol: str, support=None, resistance=None):
         """
-        Verilen DF'den mum grafiği oluşturur ve ByteIO (resim dosyası) olarak döner.
+        Verilen seriden mum grafiği oluşturur ve ByteIO (resim dosyası) olarak döner.
+        mplfinance DataFrame istediği için pandas'a sadece çizilen mumlar çevrilir.
         """
         try:
+            df = as_bars(df)
             # Son 60 mumu al (Grafik çok sıkışık olmasın)
-            plot_df = df.iloc[-60:].copy()
-            
-            # --- Stil Ayarları ---
-            # Yahoo tarzı, koyu tema
-            mc = mpf.make_marketcolors(up='#00ff00', down='#ff0000', inherit=True)
-            s = mpf.make_mpf_style(base_mpf_style='nightclouds', marketcolors=mc)
-            
+            plot_df = df[-ChartService.PLOT_BARS:].to_frame()
+
             # --- Ekstra Çizgiler (AddPlots) ---
             add_plots = []
-            
+
             # 1. SMA 50 (Sarı Çizgi)
             # plot_df uzunluğunda bir SMA serisi hesapla veya var olanı kes
             if len(df) >= 50:
-                sma50 = df['Close'].rolling(window=50).mean().iloc[-60:]
+                sma50 = pd.Series(IndicatorEngine.compute(df)["sma50"][-ChartService.PLOT_BARS:], index=plot_df.index)
                 add_plots.append(
                     mpf.make_addplot(sma50, color='yellow', width=1.5, label='SMA 50')
                 )
-            
+
             # 2. Destek / Direnç Çizgileri (Yatay)
             # Hline (Horizontal Line) mantığı mplfinance'da hlines parametresi ile verilir
             h_lines = []
             h_colors = []
-            
+
             if support:
                 h_lines.append(support)
                 h_colors.append('cyan') # Destek Mavi
-            
+
             if resistance:
                 h_lines.append(resistance)
                 h_colors.append('orange') # Direnç Turuncu
 
             # --- Çizim İşlemi ---
             buf = io.BytesIO()
-            
+
             mpf.plot(
                 plot_df,
                 type='candle',
-                style=s,
+                style=_get_style(),
                 title=f"\n{symbol} Analiz Grafigi",
                 ylabel='Fiyat',
                 ylabel_lower='Hacim',
@@ -58,10 +138,133 @@ class ChartService:
                 savefig=dict(fname=buf, dpi=100, bbox_inches='tight'),
                 figscale=1.2
             )
-            
+
             buf.seek(0)
             return buf
-            
+
+        except Exception as e:
+            print(f"[ChartService] Grafik Hatası: {e}")
+            return None
+
+    @staticmethod
+    def create_fast_chart(df: BarSeries, symbol: str, support=None, resistance=None):
+        """create_chart'ın hızlı karşılığı: figür yeniden kurulmaz, kodlanmış bytes döner."""
+        try:
+            df = as_bars(df)
+            sma50 = IndicatorEngine.compute(df)["sma50"] if len(df) >= 50 else None
+            return _get_renderer().render(
+                df, symbol, sma50=sma50, support=support, resistance=resistance,
+                fmt=ChartService.FORMAT, quality=ChartService.QUALITY,
+            )
         except Exception as e:
             print(f"[ChartService] Grafik Hatası: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _get_pool():
+        if ChartService._pool is None:
+            ctx = multiprocessing.get_context(os.getenv("CPU_START_METHOD", "spawn"))
+            ChartService._pool = ProcessPoolExecutor(
+                max_workers=ChartService.WORKERS, mp_context=ctx, initializer=_init_worker
+            )
+        return ChartService._pool
+
+    @staticmethod
+    def warm_up():
+        """Worker'ları önceden başlatır (her biri stilini / çizicisini kurar)."""
+        pool = ChartService._get_pool()
+        for _ in range(ChartService.WORKERS):
+            pool.submit(time.sleep, 0)
+
+    @staticmethod
+    def bar_revision(df: BarSeries) -> tuple:
+        """Son barın güncel hali (kapanış, yüksek, düşük, hacim); bar kapanana kadar zaman damgası aynı kalır."""
+        last = df.bar(-1)
+        return last["Close"], last["High"], last["Low"], last["Volume"]
+
+    @staticmethod
+    def cache_key(df: BarSeries, symbol: str, interval: str, support=None, resistance=None):
+        # Açık bar güncellendikçe grafik (ve MediaCache'teki file_id'si) de değişmiş sayılır
+        return symbol, interval, df.last_time, ChartService.bar_revision(df), support, resistance
+
+    @staticmethod
+    async def render(df: BarSeries, symbol: str, interval: str, support=None, resistance=None):
+        """
+        Grafiği render havuzunda çizer ve görüntü bytes'ı döner (CHART_FORMAT).
+        Aynı (sembol, interval, son bar ve güncel hali, destek, direnç) için sonuç cache'ten gelir;
+        eşzamanlı aynı istekler tek render'ı bekler. Kuyruk doluysa veya süre aşılırsa None.
+        Süresi dolan ama başlamış render process'te bitene kadar kuyruk kapasitesinden düşülür.
+        """
+        key = ChartService.cache_key(df, symbol, interval, support, resistance)
+        cached = ChartService._cache.get(key)
+        if cached is not None:
+            return cached
+
+        pending = ChartService._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        if len(ChartService._inflight) + ChartService._orphaned >= ChartService.QUEUE_DEPTH:
+            ChartService._stats["rejected"] += 1
+            print("[ChartService] Render kuyruğu dolu, grafik atlandı.")
+            return None
+
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        ChartService._inflight[key] = result
+        image = None
+        submitted = job = None
+        try:
+            # Kopyasız dilim; worker'a sadece bu barların dizileri gönderilir
+            tail = df[-ChartService.TAIL_BARS:]
+            submitted = ChartService._get_pool().submit(_render_worker, tail, symbol, support, resistance)
+            job = asyncio.wrap_future(submitted)
+            # shield: süre dolunca iş iptal edilmez, aşağıda ne olacağına karar verilir
+            image, render_ms = await asyncio.wait_for(asyncio.shield(job), timeout=ChartService.TIMEOUT)
+            if image is None:
+                ChartService._stats["errors"] += 1
+            else:
+                ChartService._stats["renders"] += 1
+                ChartService._stats["render_ms_total"] += render_ms
+                ChartService._stats["render_ms_last"] = render_ms
+                ChartService._cache.set(key, image)
+        except asyncio.TimeoutError:
+            ChartService._stats["timeouts"] += 1
+            print(f"[ChartService] Render {ChartService.TIMEOUT}s içinde bitmedi.")
+        except Exception as e:
+            ChartService._stats["errors"] += 1
+            print(f"[ChartService] Render Hatası: {e}")
+        finally:
+            if job is not None and not job.done() and not submitted.cancel():
+                # Worker'da başlamış iş durdurulamaz; slotu bitene kadar dolu sayılır
+                ChartService._orphaned += 1
+                job.add_done_callback(ChartService._release_orphan)
+            ChartService._inflight.pop(key, None)
+            result.set_result(image)
+        return image
+
+    @staticmethod
+    def _release_orphan(job):
+        ChartService._orphaned -= 1
+        if not job.cancelled():
+            job.exception()  # sonucu kimse beklemiyor; "exception never retrieved" uyarısı çıkmasın
+
+    @staticmethod
+    def stats() -> dict:
+        stats = dict(ChartService._stats)
+        renders = stats.pop("render_ms_total")
+        stats["render_ms_avg"] = round(renders / stats["renders"], 1) if stats["renders"] else 0.0
+        stats["render_ms_last"] = round(stats["render_ms_last"], 1)
+        stats["in_flight"] = len(ChartService._inflight)
+        stats["orphaned"] = ChartService._orphaned
+        stats["workers"] = ChartService.WORKERS
+        stats["queue_depth"] = ChartService.QUEUE_DEPTH
+        stats["cache"] = ChartService._cache.stats()
+        return stats
+
+    @staticmethod
+    def shutdown():
+        if ChartService._pool is not None:
+            ChartService._pool.shutdown(wait=False, cancel_futures=True)
+            ChartService._pool = None
+            ChartService._orphaned = 0
@@ -0,0 +1,87 @@
+# services/executor.py
+import os
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+class ExecutionService:
+    """
+    Bloklayan işleri asyncio event loop'u dışına taşıyan yürütme katmanı.
+    - I/O işleri (yfinance, Gemini) -> thread pool
+    - CPU işleri (analiz, grafik) -> process pool
+    Her aşamanın kendi zaman aşımı vardır; süre dolarsa iş iptal edilir ve None döner.
+    """
+    IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+    # 0 verilirse CPU işleri de thread pool'da çalışır (ör. tek çekirdekli sunucu)
+    CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+    CPU_START_METHOD = os.getenv("CPU_START_METHOD", "spawn")
+
+    # Aşama bazlı zaman aşımları (saniye)
+    TIMEOUTS = {
+        "fetch": float(os.getenv("FETCH_TIMEOUT", "20")),
+        "analysis": float(os.getenv("ANALYSIS_TIMEOUT", "15")),
+        "ai": float(os.getenv("AI_TIMEOUT", "25")),
+        "chart": float(os.getenv("CHART_TIMEOUT", "20")),
+        "scan": float(os.getenv("SCAN_TIMEOUT", "60")),
+        "backtest": float(os.getenv("BACKTEST_TIMEOUT", "60")),
+    }
+    DEFAULT_TIMEOUT = 30.0
+
+    _io_pool = None
+    _cpu_pool = None
+
+    @classmethod
+    def _get_io_pool(cls):
+        if cls._io_pool is None:
+            cls._io_pool = ThreadPoolExecutor(max_workers=cls.IO_WORKERS, thread_name_prefix="io")
+        return cls._io_pool
+
+    @classmethod
+    def _get_cpu_pool(cls):
+        if cls.CPU_WORKERS <= 0:
+            return cls._get_io_pool()
+        if cls._cpu_pool is None:
+            ctx = multiprocessing.get_context(cls.CPU_START_METHOD)
+            cls._cpu_pool = ProcessPoolExecutor(max_workers=cls.CPU_WORKERS, mp_context=ctx)
+        return cls._cpu_pool
+
+    @classmethod
+    async def _run(cls, pool, stage: str, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        timeout = cls.TIMEOUTS.get(stage, cls.DEFAULT_TIMEOUT)
+
+        try:
+            # wait_for, süre dolunca veya çağıran task iptal edilince future'ı da iptal eder.
+            # Henüz başlamamış iş kuyruktan düşer; başlamış iş sonucu yok sayılır.
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"[ExecutionService] '{stage}' aşaması {timeout}s içinde bitmedi, iptal edildi.")
+            return None
+        except Exception as e:
+            print(f"[ExecutionService] '{stage}' aşamasında hata: {e}")
+            return None
+
+    @classmethod
+    async def run_io(cls, stage: str, func, *args, **kwargs):
+        """Ağ/disk bekleyen bloklayan çağrıyı thread pool'da çalıştırır."""
+        return await cls._run(cls._get_io_pool(), stage, func, *args, **kwargs)
+
+    @classmethod
+    async def run_cpu(cls, stage: str, func, *args, **kwargs):
+        """
+        CPU yoğun çağrıyı process pool'da çalıştırır.
+        Fonksiyon ve argümanlar pickle edilebilir olmalı (modül seviyesi / staticmethod).
+        """
+        return await cls._run(cls._get_cpu_pool(), stage, func, *args, **kwargs)
+
+    @classmethod
+    def shutdown(cls):
+        """Havuzları kapatır (bot kapanırken çağrılır)."""
+        if cls._cpu_pool is not None:
+            cls._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            cls._cpu_pool = None
+        if cls._io_pool is not None:
+            cls._io_pool.shutdown(wait=False, cancel_futures=True)
+            cls._io_pool = None
@@ -0,0 +1,141 @@
+# services/fast_chart.py
+import io
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from PIL import Image
+from services.bar_series import BarSeries
+
+# mplfinance 'nightclouds' temasına yakın renkler
+BG_COLOR = "#0a0a0a"
+GRID_COLOR = "#2a2a2a"
+TEXT_COLOR = "#e0e0e0"
+UP_COLOR = "#00ff00"
+DOWN_COLOR = "#ff0000"
+SMA_COLOR = "yellow"
+SUPPORT_COLOR = "cyan"
+RESISTANCE_COLOR = "orange"
+
+FORMATS = {"png": "PNG", "webp": "WEBP", "jpeg": "JPEG", "jpg": "JPEG"}
+
+class FastChartRenderer:
+    """
+    mplfinance'sız, tekrar kullanılan Agg figürüyle mum grafiği çizer.
+    Figür, eksenler ve tüm artist'ler bir kez oluşturulur; her grafikte sadece
+    verileri (mum köşeleri, hacim çubukları, SMA, yatay çizgiler) güncellenir.
+    Çıktı sabit boyuttadır (bbox_inches='tight' yerleşim turu yok) ve PIL ile kodlanır.
+    """
+
+    def __init__(self, width: int = 960, height: int = 640, dpi: int = 100, bars: int = 60):
+        self.bars = bars
+        self.fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi, facecolor=BG_COLOR)
+        self.canvas = FigureCanvasAgg(self.fig)
+
+        grid = self.fig.add_gridspec(2, 1, height_ratios=(3, 1), hspace=0.05,
+                                     left=0.03, right=0.92, top=0.93, bottom=0.08)
+        self.ax = self.fig.add_subplot(grid[0])
+        self.ax_vol = self.fig.add_subplot(grid[1], sharex=self.ax)
+        for ax in (self.ax, self.ax_vol):
+            ax.set_facecolor(BG_COLOR)
+            ax.grid(True, color=GRID_COLOR, linestyle="--", linewidth=0.5)
+            ax.tick_params(colors=TEXT_COLOR, labelsize=8)
+            ax.yaxis.tick_right()
+            ax.yaxis.set_label_position("right")
+            for spine in ax.spines.values():
+                spine.set_color(GRID_COLOR)
+        self.ax.tick_params(labelbottom=False)
+        self.ax.set_ylabel("Fiyat", color=TEXT_COLOR)
+        self.ax_vol.set_ylabel("Hacim", color=TEXT_COLOR)
+        self.title = self.ax.set_title("", color=TEXT_COLOR)
+
+        # Güncellenecek artist'ler
+        self.wicks = LineCollection([], linewidths=0.8)
+        self.bodies = PolyCollection([], linewidths=0)
+        self.volumes = PolyCollection([], linewidths=0)
+        self.ax.add_collection(self.wicks)
+        self.ax.add_collection(self.bodies)
+        self.ax_vol.add_collection(self.volumes)
+        (self.sma_line,) = self.ax.plot([], [], color=SMA_COLOR, linewidth=1.5, label="SMA 50")
+        self.support_line = self.ax.axhline(np.nan, color=SUPPORT_COLOR, linestyle="-.", linewidth=1.0)
+        self.resistance_line = self.ax.axhline(np.nan, color=RESISTANCE_COLOR, linestyle="-.", linewidth=1.0)
+
+        # Çubuk ofsetleri sabit; sadece y değerleri değişir
+        x = np.arange(bars, dtype=float)
+        self._x = x
+        self._left = x - 0.3
+        self._right = x + 0.3
+        self.ax.set_xlim(-1, bars)
+
+    def _set_ticks(self, index):
+        step = max(len(index) // 6, 1)
+        positions = list(range(0, len(index), step))
+        fmt = "%d %b %H:%M" if len(index) > 1 and (index[1] - index[0]).days < 1 else "%d %b %Y"
+        self.ax_vol.set_xticks(positions)
+        self.ax_vol.set_xticklabels([index[i].strftime(fmt) for i in positions], rotation=0)
+
+    def draw(self, o, h, l, c, v, index, title: str, sma=None, support=None, resistance=None):
+        n = len(c)
+        x, left, right = self._x[:n], self._left[:n], self._right[:n]
+        colors = np.where(c >= o, UP_COLOR, DOWN_COLOR)
+
+        self.wicks.set_segments(np.stack([np.column_stack([x, l]), np.column_stack([x, h])], axis=1))
+        self.wicks.set_color(colors)
+
+        lo = np.minimum(o, c)
+        hi = np.maximum(o, c)
+        self.bodies.set_verts(np.stack([
+            np.column_stack([left, lo]), np.column_stack([left, hi]),
+            np.column_stack([right, hi]), np.column_stack([right, lo]),
+        ], axis=1))
+        self.bodies.set_facecolor(colors)
+
+        zero = np.zeros(n)
+        self.volumes.set_verts(np.stack([
+            np.column_stack([left, zero]), np.column_stack([left, v]),
+            np.column_stack([right, v]), np.column_stack([right, zero]),
+        ], axis=1))
+        self.volumes.set_facecolor(colors)
+
+        if sma is not None:
+            self.sma_line.set_data(x, sma)
+        else:
+            self.sma_line.set_data([], [])
+        self.support_line.set_ydata([support or np.nan] * 2)
+        self.resistance_line.set_ydata([resistance or np.nan] * 2)
+
+        # Eksen sınırları elle: autoscale/relim turu yok
+        levels = [l.min(), h.max()] + [lvl for lvl in (support, resistance) if lvl]
+        y_min, y_max = min(levels), max(levels)
+        pad = (y_max - y_min) * 0.05 or abs(y_max) * 0.01 or 1.0
+        self.ax.set_ylim(y_min - pad, y_max + pad)
+        self.ax_vol.set_ylim(0, (v.max() or 1.0) * 1.1)
+
+        self.title.set_text(title)
+        self._set_ticks(index)
+        self.canvas.draw()
+
+    def encode(self, fmt: str = "png", quality: int = 80) -> bytes:
+        """Çizili figürü istenen formatta kodlar (png / webp / jpeg)."""
+        pil_format = FORMATS.get(fmt.lower(), "PNG")
+        image = Image.frombuffer("RGBA", self.canvas.get_width_height(), self.canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+        buf = io.BytesIO()
+        if pil_format == "PNG":
+            # Koyu tema az renkli; palete indirgemek dosyayı belirgin küçültür
+            image.convert("RGB").quantize(colors=128).save(buf, format="PNG", optimize=True)
+        elif pil_format == "WEBP":
+            image.convert("RGB").save(buf, format="WEBP", quality=quality, method=4)
+        else:
+            image.convert("RGB").save(buf, format="JPEG", quality=quality, optimize=True)
+        return buf.getvalue()
+
+    def render(self, df, symbol: str, sma50=None, support=None, resistance=None, fmt: str = "png", quality: int = 80) -> bytes:
+        """Serinin (BarSeries veya DataFrame) son `bars` mumunu çizer ve kodlanmış görüntü bytes'ı döner."""
+        plot_df = df[-self.bars:] if isinstance(df, BarSeries) else df.iloc[-self.bars:]
+        o, h, l, c, v = (np.asarray(plot_df[col], dtype="float64") for col in ("Open", "High", "Low", "Close", "Volume"))
+        sma = None if sma50 is None else np.asarray(sma50, dtype="float64")[-len(c):]
+        self.draw(o, h, l, c, np.nan_to_num(v), plot_df.index, f"{symbol} Analiz Grafigi",
+                  sma=sma, support=support, resistance=resistance)
+        return self.encode(fmt, quality)
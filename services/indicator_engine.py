@@ -0,0 +1,132 @@
+# services/indicator_engine.py
+from __future__ import annotations
+import threading
+import weakref
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from services.bar_series import BarSeries
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Tüm fonksiyonlar 0. eksen (zaman) boyunca çalışır: 1D (tek sembol) veya
+# 2D (zaman x sembol, tarayıcı paneli) dizileri kabul eder.
+
+def _ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """ta kütüphanesiyle aynı üstel ortalama (adjust=False). Özyineleme pandas'ın Cython çekirdeğinde çalışır."""
+    frame = pd.DataFrame(values) if values.ndim == 2 else pd.Series(values)
+    return frame.ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+
+def _rolling(values: np.ndarray, window: int, func) -> np.ndarray:
+    """Tam pencere dolana kadar NaN olan kayan pencere istatistiği."""
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = func(sliding_window_view(values, window, axis=0), axis=-1)
+    return out
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    """Bir bar geriye kaydırır; ilk satır NaN olur."""
+    out = np.empty_like(values, dtype="float64")
+    if len(values):
+        out[0] = np.nan
+        out[1:] = values[:-1]
+    return out
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    diff = close - _shift(close)
+    up = np.where(diff > 0, diff, 0.0)
+    down = -np.where(diff < 0, diff, 0.0)
+    ema_up = _ewm(up, 1 / window, window)
+    ema_down = _ewm(down, 1 / window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = ema_up / ema_down
+        return np.where(ema_down == 0, 100, 100 - (100 / (1 + rs)))
+
+def ema(close: np.ndarray, window: int) -> np.ndarray:
+    return _ewm(close, 2 / (window + 1), window)
+
+def sma(close: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(close, window, np.mean)
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    prev_close = _shift(close)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    # Wilder: ilk değer ilk 'window' TR'nin ortalaması, sonrası alpha=1/window özyineleme.
+    # Öncesi ta'daki gibi 0'dır; window'dan kısa seride tamamı 0.
+    out = np.zeros(close.shape)
+    if len(close) < window:
+        return out
+    seeded = true_range[window - 1:].copy()
+    seeded[0] = true_range[:window].mean(axis=0)
+    out[window - 1:] = _ewm(seeded, 1 / window, 0)
+    return out
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    falling = close < _shift(close)  # İlk barda NaN ile kıyas False -> hacim eklenir
+    return np.cumsum(np.where(falling, -volume, volume), axis=0)
+
+class IndicatorEngine:
+    """
+    Bir OHLCV serisi (BarSeries veya DataFrame) için tüm indikatör setini (RSI, MACD, BB,
+    ATR, SMA/EMA, OBV) tek geçişte NumPy dizileri üzerinde hesaplar ve sonucu çerçeve
+    kimliği + son bar zaman damgasıyla hafızada tutar. Aynı çerçeveyi kullanan analiz fonksiyonları ve
+    grafik servisi tek bir sonucu paylaşır.
+    """
+    _cache = {}  # id(frame) -> (weakref, anahtar, sonuç)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _frame_key(df):
+        if not len(df):
+            return 0, None
+        return len(df), df.last_time if isinstance(df, BarSeries) else df.index[-1]
+
+    @staticmethod
+    def compute(df) -> dict:
+        frame_id = id(df)
+        key = IndicatorEngine._frame_key(df)
+
+        with IndicatorEngine._lock:
+            entry = IndicatorEngine._cache.get(frame_id)
+            if entry is not None and entry[0]() is df and entry[1] == key:
+                return entry[2]
+
+        result = IndicatorEngine._compute(df)
+
+        def _evict(_ref, frame_id=frame_id):
+            with IndicatorEngine._lock:
+                current = IndicatorEngine._cache.get(frame_id)
+                if current is not None and current[0] is _ref:
+                    del IndicatorEngine._cache[frame_id]
+
+        with IndicatorEngine._lock:
+            IndicatorEngine._cache[frame_id] = (weakref.ref(df, _evict), key, result)
+        return result
+
+    @staticmethod
+    def _compute(df) -> dict:
+        # float64 seride kopya yok; float32 fiyatlar hesap için genişletilir
+        return IndicatorEngine.compute_arrays(
+            *(np.asarray(df[col], dtype="float64") for col in ("High", "Low", "Close", "Volume"))
+        )
+
+    @staticmethod
+    def compute_arrays(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> dict:
+        """Ham diziler üzerinde indikatör seti (1D veya zaman x sembol 2D panel). Hafızaya alınmaz."""
+        macd_line = ema(close, 12) - ema(close, 26)
+        bb_mavg = sma(close, 20)
+        bb_std = _rolling(close, 20, np.std)
+
+        return {
+            "rsi": rsi(close, 14),
+            "macd": macd_line,
+            "macd_signal": ema(macd_line, 9),
+            "bb_mavg": bb_mavg,
+            "bb_upper": bb_mavg + 2 * bb_std,
+            "bb_lower": bb_mavg - 2 * bb_std,
+            "atr": atr(high, low, close, 14),
+            "sma50": sma(close, 50),
+            "ema50": ema(close, 50),
+            "obv": obv(close, volume),
+        }
@@ -0,0 +1,396 @@
+# services/job_queue.py
+import os
+import time
+import json
+import heapq
+import sqlite3
+import threading
+import importlib
+import itertools
+from abc import ABC, abstractmethod
+
+# Küçük sayı önce alınır
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+class JobQueueBackend(ABC):
+    """
+    İş kuyruğu arayüzü. Bot süreci iş ekler ve sonucu sorar; worker süreçleri işi alır,
+    çalıştırır ve sonucu geri yazar. İş sözlüğü:
+    {"id", "kind", "payload", "priority", "status", "attempts", "max_attempts", "worker",
+     "error", "result", "blob", "created_at", "started_at", "finished_at"}
+    status: queued -> running -> done | failed (hata alan iş max_attempts'e kadar tekrar sıraya girer).
+    Alınan işin bir kira süresi vardır; worker ölürse kira dolunca iş başka worker'a geçer.
+    Başka bir kuyruk (ör. Redis) bu sınıftan türetilip JOB_QUEUE_BACKEND=modul:Sinif ile seçilebilir;
+    soyut metotlardan biri eksikse sınıf örneklenirken hata verir.
+    """
+    # Bu kadar süre heartbeat göndermeyen worker sağlıksız sayılır
+    WORKER_TIMEOUT = float(os.getenv("WORKER_TIMEOUT", "30"))
+    # Biten işlerin sonucu bu kadar süre saklanır
+    RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "600"))
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: dict, priority: int = PRIORITY_NORMAL, max_attempts: int = 3) -> str:
+        ...
+
+    @abstractmethod
+    def claim(self, worker_id: str, kinds=None, lease: float = 60.0):
+        """Sıradaki en öncelikli işi alır (running yapar) veya None."""
+
+    @abstractmethod
+    def complete(self, job_id: str, result: dict, blob: bytes = None):
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: str, error: str, retry_delay: float = 0.0):
+        """Deneme hakkı kaldıysa retry_delay sonra tekrar sıraya alır, yoksa failed yapar."""
+
+    @abstractmethod
+    def get(self, job_id: str):
+        ...
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, info: dict, lease: float = 60.0):
+        """Worker'ın canlılığını ve durumunu yazar; üzerindeki işlerin kirasını uzatır."""
+
+    @abstractmethod
+    def workers(self) -> list:
+        """[{"worker", "host", "pid", "current_job", "processed", "failed", "last_seen", "healthy"}]"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """{"queued", "running", "done", "failed", "retried", "by_priority": {öncelik: sıradaki}}"""
+
+    def close(self):
+        pass
+
+class MemoryQueue(JobQueueBackend):
+    """Tek süreç içi kuyruk (yerel deneme ve testler). Worker'lar aynı süreçte thread olarak çalışır."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._heap = []  # (öncelik, sıra, id)
+        self._seq = itertools.count()
+        self._workers = {}
+        self._retried = 0
+
+    def enqueue(self, kind, payload, priority=PRIORITY_NORMAL, max_attempts=3):
+        now = time.time()
+        with self._lock:
+            job_id = str(next(self._seq))
+            self._jobs[job_id] = {
+                "id": job_id, "kind": kind, "payload": payload, "priority": priority,
+                "status": "queued", "attempts": 0, "max_attempts": max_attempts, "worker": None,
+                "error": None, "result": None, "blob": None,
+                "created_at": now, "started_at": None, "finished_at": None,
+                "not_before": 0.0, "lease_until": None,
+            }
+            heapq.heappush(self._heap, (priority, int(job_id), job_id))
+            self._purge(now)
+        return job_id
+
+    def _purge(self, now):
+        """Lock altında çağrılır."""
+        for job_id in [i for i, j in self._jobs.items() if j["finished_at"] and now - j["finished_at"] > self.RESULT_TTL]:
+            del self._jobs[job_id]
+
+    def _expire_leases(self, now):
+        """Lock altında çağrılır: kirası dolan işler tekrar sıraya girer veya failed olur."""
+        for job in self._jobs.values():
+            if job["status"] == "running" and job["lease_until"] < now:
+                self._retry(job, "kira süresi doldu (worker yanıt vermiyor)", 0.0, now)
+
+    def _retry(self, job, error, retry_delay, now):
+        job["error"] = error
+        job["worker"] = None
+        if job["attempts"] < job["max_attempts"]:
+            job["status"] = "queued"
+            job["not_before"] = now + retry_delay
+            heapq.heappush(self._heap, (job["priority"], int(job["id"]), job["id"]))
+            self._retried += 1
+        else:
+            job["status"] = "failed"
+            job["finished_at"] = now
+
+    def claim(self, worker_id, kinds=None, lease=60.0):
+        now = time.time()
+        with self._lock:
+            self._expire_leases(now)
+            skipped = []
+            claimed = None
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                job = self._jobs.get(entry[2])
+                if job is None or job["status"] != "queued":
+                    continue  # Eski heap kaydı
+                if job["not_before"] > now or (kinds and job["kind"] not in kinds):
+                    skipped.append(entry)
+                    continue
+                claimed = job
+                break
+            for entry in skipped:
+                heapq.heappush(self._heap, entry)
+            if claimed is None:
+                return None
+            claimed.update(status="running", worker=worker_id, started_at=now, lease_until=now + lease)
+            claimed["attempts"] += 1
+            return dict(claimed)
+
+    def complete(self, job_id, result, blob=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] == "running":
+                job.update(status="done", result=result, blob=blob, error=None, finished_at=time.time())
+
+    def fail(self, job_id, error, retry_delay=0.0):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] == "running":
+                self._retry(job, error, retry_delay, time.time())
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def heartbeat(self, worker_id, info, lease=60.0):
+        now = time.time()
+        with self._lock:
+            self._workers[worker_id] = dict(info, worker=worker_id, last_seen=now)
+            for job in self._jobs.values():
+                if job["status"] == "running" and job["worker"] == worker_id:
+                    job["lease_until"] = now + lease
+
+    def workers(self):
+        now = time.time()
+        with self._lock:
+            return [
+                dict(w, healthy=now - w["last_seen"] < self.WORKER_TIMEOUT)
+                for w in sorted(self._workers.values(), key=lambda w: w["worker"])
+            ]
+
+    def stats(self):
+        with self._lock:
+            counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+            by_priority = {}
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+                if job["status"] == "queued":
+                    by_priority[job["priority"]] = by_priority.get(job["priority"], 0) + 1
+            counts["retried"] = self._retried
+            counts["by_priority"] = dict(sorted(by_priority.items()))
+            return counts
+
+class SQLiteQueue(JobQueueBackend):
+    """
+    SQLite dosyası üzerinde kuyruk: aynı makinedeki bot ve worker süreçleri paylaşır.
+    İş alma BEGIN IMMEDIATE ile tek yazıcıda yapılır; iki worker aynı işi alamaz.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Transaction'lar elle yönetilir (isolation_level=None)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                worker TEXT,
+                error TEXT,
+                result TEXT,
+                blob BLOB,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                not_before REAL NOT NULL DEFAULT 0,
+                lease_until REAL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, id);
+            CREATE TABLE IF NOT EXISTS workers (
+                worker TEXT PRIMARY KEY,
+                info TEXT NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS queue_counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """
+        )
+
+    _COLUMNS = ("id", "kind", "payload", "priority", "status", "attempts", "max_attempts", "worker",
+                "error", "result", "blob", "created_at", "started_at", "finished_at")
+
+    def _row_to_job(self, row):
+        job = dict(zip(self._COLUMNS, row))
+        job["id"] = str(job["id"])
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def _write(self, func):
+        """func(conn)'u tek yazma transaction'ında çalıştırır."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = func(self._conn)
+                self._conn.execute("COMMIT")
+                return value
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, kind, payload, priority=PRIORITY_NORMAL, max_attempts=3):
+        now = time.time()
+
+        def insert(conn):
+            conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - self.RESULT_TTL,))
+            cur = conn.execute(
+                "INSERT INTO jobs (kind, payload, priority, status, max_attempts, created_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (kind, json.dumps(payload), priority, max_attempts, now),
+            )
+            return str(cur.lastrowid)
+        return self._write(insert)
+
+    @staticmethod
+    def _retry(conn, job_id, error, retry_delay, now):
+        """Deneme hakkı varsa tekrar sıraya alır. Transaction içinde çağrılır."""
+        requeued = conn.execute(
+            "UPDATE jobs SET status='queued', worker=NULL, error=?, not_before=? "
+            "WHERE id=? AND status='running' AND attempts < max_attempts",
+            (error, now + retry_delay, job_id),
+        ).rowcount
+        if requeued:
+            conn.execute(
+                "INSERT INTO queue_counters VALUES ('retried', 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+            )
+        else:
+            conn.execute(
+                "UPDATE jobs SET status='failed', worker=NULL, error=?, finished_at=? WHERE id=? AND status='running'",
+                (error, now, job_id),
+            )
+
+    def claim(self, worker_id, kinds=None, lease=60.0):
+        now = time.time()
+
+        def take(conn):
+            for (expired_id,) in conn.execute(
+                "SELECT id FROM jobs WHERE status='running' AND lease_until < ?", (now,)
+            ).fetchall():
+                self._retry(conn, expired_id, "kira süresi doldu (worker yanıt vermiyor)", 0.0, now)
+
+            query = "SELECT id FROM jobs WHERE status='queued' AND not_before <= ?"
+            params = [now]
+            if kinds:
+                query += f" AND kind IN ({','.join('?' * len(kinds))})"
+                params.extend(kinds)
+            row = conn.execute(query + " ORDER BY priority, id LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status='running', worker=?, attempts=attempts+1, started_at=?, lease_until=? WHERE id=?",
+                (worker_id, now, now + lease, row[0]),
+            )
+            return conn.execute(f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id=?", (row[0],)).fetchone()
+
+        row = self._write(take)
+        return self._row_to_job(row) if row is not None else None
+
+    def complete(self, job_id, result, blob=None):
+        self._write(lambda conn: conn.execute(
+            "UPDATE jobs SET status='done', result=?, blob=?, error=NULL, finished_at=? WHERE id=? AND status='running'",
+            (json.dumps(result), blob, time.time(), job_id),
+        ))
+
+    def fail(self, job_id, error, retry_delay=0.0):
+        self._write(lambda conn: self._retry(conn, job_id, error, retry_delay, time.time()))
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def heartbeat(self, worker_id, info, lease=60.0):
+        now = time.time()
+
+        def beat(conn):
+            conn.execute("INSERT OR REPLACE INTO workers VALUES (?, ?, ?)", (worker_id, json.dumps(info), now))
+            conn.execute(
+                "UPDATE jobs SET lease_until=? WHERE status='running' AND worker=?", (now + lease, worker_id)
+            )
+        self._write(beat)
+
+    def workers(self):
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute("SELECT worker, info, last_seen FROM workers ORDER BY worker").fetchall()
+        return [
+            dict(json.loads(info), worker=worker, last_seen=last_seen, healthy=now - last_seen < self.WORKER_TIMEOUT)
+            for worker, info, last_seen in rows
+        ]
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            by_priority = dict(self._conn.execute(
+                "SELECT priority, COUNT(*) FROM jobs WHERE status='queued' GROUP BY priority ORDER BY priority"
+            ).fetchall())
+            retried = self._conn.execute("SELECT value FROM queue_counters WHERE name='retried'").fetchone()
+        stats = {status: counts.get(status, 0) for status in ("queued", "running", "done", "failed")}
+        stats["retried"] = retried[0] if retried else 0
+        stats["by_priority"] = by_priority
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class JobQueue:
+    """
+    Kuyruk seçimi (JOB_QUEUE_BACKEND):
+    - "memory": süreç içi (worker'lar bot sürecinde thread olarak çalışır)
+    - "sqlite": JOB_QUEUE_PATH dosyası; bot ve `python worker.py` süreçleri paylaşır
+    - "paket.modul:Sinif": JobQueueBackend'den türetilmiş başka bir kuyruk (ör. çok makine için Redis)
+    """
+    BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+    PATH = os.getenv("JOB_QUEUE_PATH", "data/jobs.sqlite")
+
+    _backend = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get() -> JobQueueBackend:
+        if JobQueue._backend is None:
+            with JobQueue._lock:
+                if JobQueue._backend is None:
+                    JobQueue._backend = JobQueue.create(JobQueue.BACKEND)
+        return JobQueue._backend
+
+    @staticmethod
+    def create(backend: str) -> JobQueueBackend:
+        if backend == "memory":
+            return MemoryQueue()
+        if backend == "sqlite":
+            return SQLiteQueue(JobQueue.PATH)
+        module_name, _, class_name = backend.partition(":")
+        return getattr(importlib.import_module(module_name), class_name)()
+
+    @staticmethod
+    def set(backend: JobQueueBackend):
+        """Testlerde / yerel denemede kuyruğu değiştirmek için."""
+        JobQueue._backend = backend
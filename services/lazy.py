@@ -0,0 +1,64 @@
+# services/lazy.py
+import sys
+import time
+import types
+import importlib
+import threading
+
+# Tembel modüllerin ilk yüklenme süreleri (sn): modül adı -> süre
+IMPORT_TIMES = {}
+_lock = threading.Lock()
+
+class LazyModule(types.ModuleType):
+    """
+    İlk öznitelik erişiminde gerçek modülü import eden vekil.
+    Öznitelikler kopyalanmaz, her erişim gerçek modüle yönlenir; böylece
+    mock.patch.object(yf, "Ticker", ...) gibi yamalar vekil üzerinden de görünür.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    if self.__name__ not in IMPORT_TIMES:
+                        IMPORT_TIMES[self.__name__] = time.perf_counter() - started
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "yüklü" if self.__dict__["_lazy_module"] is not None else "yüklenmedi"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(name: str):
+    """Modül zaten yüklüyse kendisini, değilse ilk kullanımda yüklenecek vekili döner."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+def is_loaded(module) -> bool:
+    return not isinstance(module, LazyModule) or module.__dict__["_lazy_module"] is not None
+
+def load(module):
+    """Vekili şimdi yükler (ısınma için); gerçek modülü döner."""
+    return module._load() if isinstance(module, LazyModule) else module
@@ -1,13 +1,75 @@
 # services/market_data.py
-import yfinance as yf
+from __future__ import annotations
+import os
+import threading
+import numpy as np
+from services.cache import TTLCache
+from services.bar_store import BarStore, OHLCV_COLUMNS
+from services.bar_series import BarSeries, as_bars
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+yf = lazy_import("yfinance")
 
 class MarketDataService:
+    # Interval'e göre cache ömrü (saniye). Kısa barlar hızlı eskir, haftalık veri saatlerce geçerlidir.
+    CACHE_TTLS = {
+        "1m": 20, "2m": 40, "5m": 60, "15m": 120, "30m": 240,
+        "60m": 300, "1h": 300, "90m": 450, "4h": 900,
+        "1d": 900, "5d": 3600, "1wk": 6 * 3600, "1mo": 12 * 3600, "3mo": 24 * 3600,
+    }
+    DEFAULT_CACHE_TTL = 300
+
+    _cache = TTLCache(
+        "ohlcv",
+        max_entries=int(os.getenv("OHLCV_CACHE_SIZE", "512")),
+        default_ttl=DEFAULT_CACHE_TTL,
+    )
+
+    # Yahoo'nun "veri yok" yanıtı verdiği semboller. Ağ hatası / limit buraya yazılmaz;
+    # sembolün olmadığına karar verirken ikisi ayırt edilir.
+    _no_data = TTLCache("no_data", max_entries=1024, default_ttl=600)
+
+    # Kalıcı bar deposu: sadece eksik kuyruk indirilir
+    BAR_STORE_PATH = os.getenv("BAR_STORE_PATH", "data/bars.sqlite")
+    _store = None
+    _store_lock = threading.Lock()
+
+    PERIOD_DAYS = {
+        "1mo": 31, "3mo": 92, "6mo": 183,
+        "1y": 366, "2y": 731, "5y": 1827, "10y": 3653,
+    }
+    # yfinance "d" period'larını takvim günü değil işlem seansı olarak sayar (5d = son 5 seans;
+    # pazartesi veya uzun tatil sonrası da). Depodan son N seansın barları yüklenir.
+    SESSION_PERIODS = {"1d": 1, "5d": 5}
+    # Yahoo'nun intraday barlar için geriye dönük izin verdiği süre (gün)
+    INTRADAY_LOOKBACK_DAYS = {
+        "1m": 7, "2m": 59, "5m": 59, "15m": 59, "30m": 59, "90m": 59, "60m": 729, "1h": 729,
+    }
+
+    # --- Yeniden örnekleme (Resampling) ---
+    INTERVAL_MINUTES = {
+        "1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60,
+        "4h": 240, "1d": 1440, "1wk": 10080, "1mo": 43200,
+    }
+    # yfinance'in doğrudan sunmadığı interval'ler -> üretilecekleri taban interval
+    SYNTHETIC_INTERVALS = {"4h": "1h"}
+    OHLCV_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    BIST_SESSION_OPEN = np.timedelta64(10, "h")
+    # calculate_mtf_trend EMA50 kullanır
+    MIN_MACRO_BARS = 50
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """OHLCV cache isabet/ıska sayaçları."""
+        return MarketDataService._cache.stats()
+
     @staticmethod
     def _normalize_symbol(symbol: str) -> str:
         """Sembolü normalize eder (.IS kontrolü)."""
         clean = symbol.upper().strip()
-        # Eğer kullanıcı BTC-USD veya başka global sembol verdi ise dokunma
-        if "." in clean or "-" in clean:
+        # Eğer kullanıcı BTC-USD, ^GSPC, USDTRY=X veya başka global sembol verdi ise dokunma
+        if "." in clean or "-" in clean or "^" in clean or "=" in clean:
             return clean
         # Türkiye piyasası için .IS ekle
         if len(clean) <= 5:
@@ -15,71 +77,265 @@ class MarketDataService:
         return clean
 
     @staticmethod
-    def get_stock_price(symbol: str):
+    def get_historical_data(symbol: str, period="1mo", interval="1d"):
         """
-        Anlık (son kapanış veya intraday) fiyat çeker.
-        Basit: history ile son kapanışı döndürür.
+        Geçmiş veri çek. period ve interval parametreleri esnek.
+        Örn: period="1y", interval="1d" veya period="30d", interval="60m"
+        Sonuç (sembol, period, interval) anahtarıyla BarSeries olarak cache'lenir; dönen seri
+        paylaşımlıdır, değiştirilmemelidir.
         """
-        try:
+        search_symbol = MarketDataService._normalize_symbol(symbol)
+        if interval in MarketDataService.SYNTHETIC_INTERVALS:
+            loader = lambda: MarketDataService._build_synthetic(search_symbol, period, interval)
+        else:
+            loader = lambda: as_bars(MarketDataService._fetch_history(search_symbol, period, interval))
+        return MarketDataService._cache.get_or_load(
+            (search_symbol, period, interval),
+            loader,
+            ttl=MarketDataService.CACHE_TTLS.get(interval, MarketDataService.DEFAULT_CACHE_TTL),
+        )
+
+    @staticmethod
+    def _build_synthetic(search_symbol: str, period: str, interval: str):
+        """yfinance'in sunmadığı interval'leri (ör. 4h) daha ince barlardan üretir."""
+        base_interval = MarketDataService.SYNTHETIC_INTERVALS[interval]
+        base = MarketDataService.get_historical_data(search_symbol, period=period, interval=base_interval)
+        if base is None:
+            return None
+        return MarketDataService.resample_ohlcv(base, interval, search_symbol)
+
+    @staticmethod
+    def get_macro_data(symbol: str, micro_df, micro_interval: str, macro_interval: str, macro_period: str):
+        """
+        Üst zaman dilimi verisini önce eldeki micro barlardan türetmeye çalışır.
+        Türetilen seri EMA50 için yetersizse (MIN_MACRO_BARS) indirmeye düşer.
+        """
+        if micro_df is not None and MarketDataService._can_resample(micro_interval, macro_interval):
             search_symbol = MarketDataService._normalize_symbol(symbol)
-            ticker = yf.Ticker(search_symbol)
+            macro_df = MarketDataService.resample_ohlcv(micro_df, macro_interval, search_symbol)
+            if macro_df is not None and len(macro_df) >= MarketDataService.MIN_MACRO_BARS:
+                return macro_df
+        return MarketDataService.get_historical_data(symbol, period=macro_period, interval=macro_interval)
 
-            # Önce fast_info deneyebiliriz (daha hızlı) ama garanti için history
-            data = ticker.history(period="1d", interval="1m")
-            if data.empty:
-                # fallback: 5 günlük kapanışlardan sonunu al
-                data = ticker.history(period="5d")
-                if data.empty:
-                    return None
-
-            # Son fiyat (en son close/last)
-            if "Close" in data.columns:
-                last_price = data["Close"].iloc[-1]
-            else:
+    @staticmethod
+    def _can_resample(base_interval: str, target_interval: str) -> bool:
+        base = MarketDataService.INTERVAL_MINUTES.get(base_interval)
+        target = MarketDataService.INTERVAL_MINUTES.get(target_interval)
+        if base is None or target is None or base >= target:
+            return False
+        # Gün içi hedefler taban barların tam katı olmalı (ör. 90m'den 1h üretilemez)
+        if target < 1440:
+            return target % base == 0
+        # Günlük ve üstü hedefler takvimle gruplanır; haftalar aylara tam bölünmez
+        return base <= 1440
+
+    @staticmethod
+    def resample_ohlcv(df, target_interval: str, symbol: str = ""):
+        """
+        OHLCV barlarını üst zaman dilimine toplar (BarSeries verilirse BarSeries, DataFrame verilirse DataFrame).
+        Open=ilk, High=max, Low=min, Close=son, Volume=toplam.
+        - Gün içi kovalar seans açılışına hizalanır (BIST için 10:00, diğerlerinde günün ilk barı);
+          böylece 4h kovaları 10:00-14:00 / 14:00-18:00 olur.
+        - 1d / 1wk / 1mo kovaları borsa saat diliminde takvim günü / Pazartesi / ay başıdır.
+        Son kova henüz kapanmamış olabilir (yfinance'in canlı barı gibi).
+        """
+        if df is None or df.empty:
+            return None
+        if isinstance(df, BarSeries):
+            return MarketDataService._resample_bars(df, target_interval, symbol)
+
+        buckets = MarketDataService.bucket_index(df.index, target_interval, symbol)
+        if buckets is None:
+            return None
+
+        aggregated = df[OHLCV_COLUMNS].groupby(buckets).agg(MarketDataService.OHLCV_AGG)
+        aggregated.index.name = df.index.name
+        return aggregated.dropna(subset=["Close"])
+
+    @staticmethod
+    def _resample_bars(bars: BarSeries, target_interval: str, symbol: str):
+        """resample_ohlcv'nin BarSeries karşılığı: barlar zaman sıralı, kovalar ardışık dilimlerdir."""
+        valid = ~np.isnan(bars.close)
+        if not valid.all():
+            bars = BarSeries(*(a[valid] for a in (bars.time, bars.open, bars.high, bars.low, bars.close, bars.volume)), bars.tz)
+            if bars.empty:
                 return None
 
-            # Currency bilgisi .info'dan gelmeye çalışılır; yoksa None
-            currency = None
-            try:
-                currency = ticker.info.get("currency")  # bazen hata çıkartır
-            except Exception:
-                currency = None
+        buckets = MarketDataService.bucket_index(bars.index, target_interval, symbol)
+        if buckets is None:
+            return None
+        bucket_ns = buckets.asi8
+        # Her kovanın ilk barının konumu
+        starts = np.flatnonzero(np.concatenate([[True], bucket_ns[1:] != bucket_ns[:-1]]))
+        ends = np.append(starts[1:], len(bars)) - 1
+        return BarSeries(
+            bucket_ns[starts],
+            bars.open[starts],
+            np.fmax.reduceat(bars.high, starts),
+            np.fmin.reduceat(bars.low, starts),
+            bars.close[ends],
+            np.add.reduceat(np.nan_to_num(bars.volume), starts),
+            bars.tz,
+        )
 
-            return {
-                "symbol": symbol.upper().strip(),
-                "price": round(float(last_price), 2),
-                "currency": currency or "Unknown"
-            }
+    @staticmethod
+    def bucket_index(index, target_interval: str, symbol: str = ""):
+        """Her barın düştüğü üst zaman dilimi kovasının başlangıcını döner (resample_ohlcv kuralları)."""
+        minutes = MarketDataService.INTERVAL_MINUTES.get(target_interval)
+        if minutes is None:
+            return None
 
-        except Exception as e:
-            # TODO: logging kullan
-            print(f"[MarketDataService.get_stock_price] Hata: {e}")
+        days = index.normalize()
+
+        if minutes < 1440:
+            freq = np.timedelta64(minutes, "m")
+            if symbol.endswith(".IS"):
+                anchor = days + MarketDataService.BIST_SESSION_OPEN
+            else:
+                # Seans açılışı = o günün ilk barı (kripto için 00:00, ABD için 09:30)
+                anchor = pd.DatetimeIndex(
+                    pd.Series(index, index=index).groupby(days).transform("min")
+                )
+            # Açılıştan önceki barlar (ör. açılış seansı) ilk kovaya düşer
+            offset = np.maximum((index - anchor).to_numpy(), np.timedelta64(0, "ns"))
+            return anchor + pd.to_timedelta((offset // freq) * freq)
+        if target_interval == "1d":
+            return days
+        if target_interval == "1wk":
+            return days - pd.to_timedelta(days.weekday, unit="D")
+        return days - pd.to_timedelta(days.day - 1, unit="D")
+
+    @staticmethod
+    def _get_store():
+        """Kalıcı bar deposu (BAR_STORE_PATH boş verilirse devre dışı)."""
+        if MarketDataService._store is None and MarketDataService.BAR_STORE_PATH:
+            with MarketDataService._store_lock:
+                if MarketDataService._store is None:
+                    MarketDataService._store = BarStore(MarketDataService.BAR_STORE_PATH)
+        return MarketDataService._store
+
+    @staticmethod
+    def _period_start(period: str):
+        """yfinance period'unun kapsadığı ilk zamanı (UTC epoch saniye) döner; bilinmiyorsa None."""
+        now = pd.Timestamp.now(tz="UTC")
+        if period == "max":
+            return 0
+        if period == "ytd":
+            return int(pd.Timestamp(year=now.year, month=1, day=1, tz="UTC").timestamp())
+        days = MarketDataService.PERIOD_DAYS.get(period)
+        if days is None:
             return None
+        return int((now - pd.Timedelta(days=days)).timestamp())
 
     @staticmethod
-    def get_historical_data(symbol: str, period="1mo", interval="1d"):
+    def _fetch_history(search_symbol: str, period: str, interval: str):
         """
-        Geçmiş veri çek. period ve interval parametreleri esnek.
-        Örn: period="1y", interval="1d" veya period="30d", interval="60m"
+        Depoda bu aralığı kapsayan veri varsa sadece son kayıttan sonraki barları indirir,
+        yoksa tüm period'u indirip depoya yazar.
         """
+        store = MarketDataService._get_store()
+        sessions = MarketDataService.SESSION_PERIODS.get(period)
+        start_ts = MarketDataService._period_start(period)
+        if store is None or (start_ts is None and sessions is None):
+            return MarketDataService._download(search_symbol, period=period, interval=interval)
+
         try:
-            search_symbol = MarketDataService._normalize_symbol(symbol)
-            ticker = yf.Ticker(search_symbol)
+            coverage = store.coverage(search_symbol, interval)
+            # Seans period'unda başlangıç depodaki seanslardan bulunur; kapsama aşağıda kontrol edilir
+            covered = coverage and (sessions is not None or coverage[0] <= start_ts)
+            if covered and MarketDataService._tail_reachable(interval, coverage[1]):
+                last_ts = coverage[1]
+                # Son bar da tekrar istenir: henüz kapanmamışsa güncel hali yazılır
+                tail = MarketDataService._download(
+                    search_symbol, interval=interval, start=pd.Timestamp(last_ts, unit="s", tz="UTC")
+                )
+                if tail is not None:
+                    if MarketDataService._has_corporate_action(tail, last_ts):
+                        # Temettü/bölünme geçmiş düzeltilmiş fiyatları değiştirir -> baştan indir
+                        store.clear(search_symbol, interval)
+                        return MarketDataService._download_and_store(store, search_symbol, period, interval, start_ts, sessions)
+                    store.upsert(search_symbol, interval, tail)
+                if sessions is None:
+                    return store.load(search_symbol, interval, start_ts)
+                # Kapsama kesintisizdir; son N seansın hepsi içindeyse yeniden indirmeye gerek yok
+                session_ts, found = store.session_start(search_symbol, interval, sessions, since=coverage[0])
+                if found >= sessions:
+                    return store.load(search_symbol, interval, session_ts)
 
-            data = ticker.history(period=period, interval=interval)
-            if data.empty:
-                return None
+            return MarketDataService._download_and_store(store, search_symbol, period, interval, start_ts, sessions)
 
-            # Basit validasyon: Close kolonu yoksa hata
-            if "Close" not in data.columns:
-                return None
+        except Exception as e:
+            print(f"[MarketDataService.get_historical_data] Depo Hatası: {e}")
+            return MarketDataService._download(search_symbol, period=period, interval=interval)
+
+    @staticmethod
+    def _download_and_store(store, search_symbol: str, period: str, interval: str, start_ts: int, sessions: int = None):
+        data = MarketDataService._download(search_symbol, period=period, interval=interval)
+        if data is None:
+            return None
+        if sessions is not None:
+            # Yahoo son N seansı verir; kapsama indirilen ilk bardan başlar
+            start_ts = int(data.index[0].timestamp())
+        store.upsert(search_symbol, interval, data, covered_from=start_ts)
+        return store.load(search_symbol, interval, start_ts)
 
-            return data
+    @staticmethod
+    def _tail_reachable(interval: str, last_ts: int) -> bool:
+        """Yahoo intraday veriyi sınırlı geçmişle verir; boşluk çok eskiyse eksik kuyruk indirilemez."""
+        limit_days = MarketDataService.INTRADAY_LOOKBACK_DAYS.get(interval)
+        if limit_days is None:
+            return True
+        age = pd.Timestamp.now(tz="UTC").timestamp() - last_ts
+        return age < limit_days * 86400
+
+    @staticmethod
+    def _has_corporate_action(data, last_ts: int) -> bool:
+        new_rows = data[data.index.asi8 // 1_000_000_000 > last_ts]
+        for col in ("Dividends", "Stock Splits"):
+            if col in new_rows.columns and (new_rows[col] != 0).any():
+                return True
+        return False
 
+    @staticmethod
+    def _download(search_symbol: str, **kwargs):
+        """
+        Barlar veya None. None iki anlama gelir: Yahoo boş yanıt verdi (period isteğinde
+        answered_no_data() True olur) ya da istek hata aldı (ağ, limit; kayıt tutulmaz).
+        """
+        try:
+            ticker = yf.Ticker(search_symbol)
+            data = ticker.history(**kwargs)
         except Exception as e:
             print(f"[MarketDataService.get_historical_data] Hata: {e}")
             return None
+
+        # Basit validasyon: Close kolonu yoksa veri yok sayılır
+        if data.empty or "Close" not in data.columns:
+            # Kuyruk (start=) isteğinin boş dönmesi yeni bar olmadığı anlamına gelir
+            if "period" in kwargs:
+                MarketDataService._no_data.set(search_symbol, True)
+            return None
+
+        MarketDataService._no_data.invalidate(search_symbol)
+        return data
+
+    @staticmethod
+    def answered_no_data(symbol: str) -> bool:
+        """Son period isteğinde Yahoo bu sembol için boş yanıt verdi mi (hata / zaman aşımı değil)."""
+        return MarketDataService._no_data.get(MarketDataService._normalize_symbol(symbol)) is not None
         
+    @staticmethod
+    def get_period_for_interval(interval: str, default: str = "1y") -> str:
+        """
+        Interval'e göre indirilecek geçmiş uzunluğu (Veri çekme optimizasyonu).
+        yfinance period formatları: 1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
+        """
+        period_mapping = {
+            "1m": "5d", "5m": "5d", "15m": "1mo", "30m": "1mo",
+            "1h": "6mo", "4h": "1y", "1d": "2y", "1wk": "5y"
+        }
+        return period_mapping.get(interval, default)
+
     @staticmethod
     def get_macro_interval(micro_interval: str) -> str:
         """
@@ -0,0 +1,125 @@
+# services/media_cache.py
+import os
+import asyncio
+from collections import OrderedDict
+from telegram.error import BadRequest
+
+class MediaCache:
+    """
+    Telegram'a yüklenen grafiklerin file_id'leri. Anahtar: ChartService.cache_key
+    (sembol, interval, son bar, son barın güncel hali, destek, direnç).
+    Aynı grafik başka bir sohbete tekrar yüklenmez, file_id ile gönderilir.
+    (sembol, interval) başına sadece son barın en güncel halinin kayıtları tutulur; açık bar
+    güncellenince veya yeni bar kapanınca eskiler silinir.
+    Aynı grafiğin eşzamanlı ilk gönderimlerinde sadece biri yükler, diğerleri onun file_id'sini bekler.
+    """
+    MAX_SERIES = int(os.getenv("MEDIA_CACHE_SIZE", "512"))
+
+    _series = OrderedDict()  # (sembol, interval) -> ((son bar, güncel hali), {(destek, direnç): (file_id, bytes)})
+    _uploading = {}          # anahtar -> asyncio.Future (file_id veya None)
+    _stats = {"reused": 0, "uploads": 0, "bytes_saved": 0, "invalidated": 0, "evictions": 0}
+
+    @staticmethod
+    def _split(key):
+        symbol, interval, bar, revision, support, resistance = key
+        return (symbol, interval), (bar, revision), (support, resistance)
+
+    @staticmethod
+    def get(key):
+        """Kayıtlı file_id veya None."""
+        series, bar, levels = MediaCache._split(key)
+        entry = MediaCache._series.get(series)
+        if entry is None or entry[0] != bar:
+            return None
+        cached = entry[1].get(levels)
+        if cached is None:
+            return None
+        MediaCache._series.move_to_end(series)
+        return cached[0]
+
+    @staticmethod
+    def put(key, file_id: str, size: int):
+        series, bar, levels = MediaCache._split(key)
+        entry = MediaCache._series.get(series)
+        if entry is not None and entry[0][0] > bar[0]:
+            return  # Daha yeni bar zaten kayıtlı; eski grafik saklanmaz
+        if entry is None or entry[0] != bar:
+            # Yeni bar kapandı veya açık bar güncellendi: önceki grafikler artık gönderilmez
+            entry = MediaCache._series[series] = (bar, {})
+        entry[1][levels] = (file_id, size)
+        MediaCache._series.move_to_end(series)
+        while len(MediaCache._series) > MediaCache.MAX_SERIES:
+            MediaCache._series.popitem(last=False)
+            MediaCache._stats["evictions"] += 1
+
+    @staticmethod
+    def invalidate(key):
+        """Telegram file_id'yi reddederse kayıt silinir (sonraki gönderim yeniden yükler)."""
+        series, bar, levels = MediaCache._split(key)
+        entry = MediaCache._series.get(series)
+        if entry is not None and entry[0] == bar and entry[1].pop(levels, None) is not None:
+            MediaCache._stats["invalidated"] += 1
+
+    @staticmethod
+    def _size(key) -> int:
+        series, bar, levels = MediaCache._split(key)
+        entry = MediaCache._series.get(series)
+        cached = entry[1].get(levels) if entry is not None and entry[0] == bar else None
+        return cached[1] if cached else 0
+
+    @staticmethod
+    async def send_photo(bot, chat_id: int, key, load_image, **kwargs):
+        """
+        Grafiği gönderir: file_id varsa onunla, yoksa load_image() ile alınan bytes'ı yükleyerek.
+        Başka bir sohbete aynı grafik yükleniyorsa o yüklemenin file_id'sini bekler.
+        Dönüş: gönderilen Message veya (grafik yoksa) None.
+        """
+        file_id = MediaCache.get(key)
+        if file_id is None:
+            pending = MediaCache._uploading.get(key)
+            if pending is not None:
+                file_id = await asyncio.shield(pending)
+
+        if file_id is not None:
+            try:
+                message = await bot.send_photo(chat_id=chat_id, photo=file_id, **kwargs)
+                MediaCache._stats["reused"] += 1
+                MediaCache._stats["bytes_saved"] += MediaCache._size(key)
+                return message
+            except BadRequest as e:
+                print(f"[MediaCache] file_id gönderilemedi, yeniden yüklenecek: {e}")
+                MediaCache.invalidate(key)
+
+        # Yükleyen ilk istek, görüntü hazırlanırken gelenler de onun file_id'sini bekler
+        uploading = MediaCache._uploading.get(key) is None
+        if uploading:
+            result = asyncio.get_running_loop().create_future()
+            MediaCache._uploading[key] = result
+        file_id = None
+        try:
+            image = await load_image()
+            if not image:
+                return None
+            message = await bot.send_photo(chat_id=chat_id, photo=image, **kwargs)
+            MediaCache._stats["uploads"] += 1
+            photos = getattr(message, "photo", None)
+            if photos:
+                # En büyük boyut yüklenen görüntünün kendisidir
+                file_id = photos[-1].file_id
+                MediaCache.put(key, file_id, len(image))
+            return message
+        finally:
+            if uploading:
+                MediaCache._uploading.pop(key, None)
+                result.set_result(file_id)
+
+    @staticmethod
+    def clear():
+        MediaCache._series.clear()
+
+    @staticmethod
+    def stats() -> dict:
+        stats = dict(MediaCache._stats)
+        stats["series"] = len(MediaCache._series)
+        stats["in_flight"] = len(MediaCache._uploading)
+        return stats
@@ -0,0 +1,200 @@
+# services/metrics.py
+import os
+import time
+import bisect
+import functools
+import threading
+import contextlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from telegram.request import HTTPXRequest
+
+class Histogram:
+    """
+    Aşama süreleri: Prometheus tarzı kümülatif kovalar (toplam sayım) +
+    yüzdelikler için son RESERVOIR ölçümü tutan kayan pencere.
+    """
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    RESERVOIR = 1024
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # son kova = +Inf
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+        self.recent = deque(maxlen=self.RESERVOIR)
+
+    def observe(self, seconds: float, error: bool = False):
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+        if error:
+            self.errors += 1
+
+    def percentiles(self, *qs):
+        """Son ölçümlerden yüzdelikler (sn). Ölçüm yoksa None."""
+        if not self.recent:
+            return [None for _ in qs]
+        ordered = sorted(self.recent)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(q * last)))] for q in qs]
+
+class Span:
+    """Bir aşamanın ölçümü. fail() çağrılırsa hata sayılır (servisler hata yerine None döner)."""
+    __slots__ = ("stage", "error")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.error = False
+
+    def fail(self):
+        self.error = True
+
+class Metrics:
+    """
+    Süreç içi gecikme/hata ölçümleri.
+    - span(stage): with bloğunun süresini kaydeder; istisna veya fail() hata sayılır
+    - timed(stage, awaitable): await sonucunu döner; None sonuç hata sayılır
+    - METRICS_PORT verilirse /metrics Prometheus metin formatında sunulur
+    """
+    PORT = int(os.getenv("METRICS_PORT", "0") or 0)
+    HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+    _stages = {}
+    _lock = threading.Lock()
+    _server = None
+
+    @staticmethod
+    def observe(stage: str, seconds: float, error: bool = False):
+        with Metrics._lock:
+            hist = Metrics._stages.get(stage)
+            if hist is None:
+                hist = Metrics._stages[stage] = Histogram()
+            hist.observe(seconds, error)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def span(stage: str):
+        span = Span(stage)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span.error = True
+            raise
+        finally:
+            Metrics.observe(stage, time.perf_counter() - started, span.error)
+
+    @staticmethod
+    async def timed(stage: str, awaitable):
+        with Metrics.span(stage) as span:
+            result = await awaitable
+            if result is None:
+                span.fail()
+            return result
+
+    @staticmethod
+    def instrument(stage: str):
+        """Async handler'ın toplam süresini ölçen dekoratör."""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with Metrics.span(stage):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def snapshot() -> dict:
+        """{aşama: {count, errors, avg_ms, p50_ms, p95_ms, p99_ms}}"""
+        with Metrics._lock:
+            stages = list(Metrics._stages.items())
+            result = {}
+            for stage, hist in sorted(stages):
+                p50, p95, p99 = hist.percentiles(0.50, 0.95, 0.99)
+                ms = lambda s: round(s * 1000, 1) if s is not None else None
+                result[stage] = {
+                    "count": hist.count,
+                    "errors": hist.errors,
+                    "avg_ms": ms(hist.total / hist.count) if hist.count else None,
+                    "p50_ms": ms(p50),
+                    "p95_ms": ms(p95),
+                    "p99_ms": ms(p99),
+                }
+        return result
+
+    @staticmethod
+    def render_prometheus() -> str:
+        lines = [
+            "# HELP bot_stage_duration_seconds Aşama süreleri",
+            "# TYPE bot_stage_duration_seconds histogram",
+        ]
+        errors = []
+        with Metrics._lock:
+            for stage, hist in sorted(Metrics._stages.items()):
+                cumulative = 0
+                for bound, count in zip(Histogram.BUCKETS + ("+Inf",), hist.counts):
+                    cumulative += count
+                    lines.append(f'bot_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'bot_stage_duration_seconds_sum{{stage="{stage}"}} {hist.total:.6f}')
+                lines.append(f'bot_stage_duration_seconds_count{{stage="{stage}"}} {hist.count}')
+                errors.append(f'bot_stage_errors_total{{stage="{stage}"}} {hist.errors}')
+        lines += ["# HELP bot_stage_errors_total Hatalı / sonuçsuz biten aşamalar",
+                  "# TYPE bot_stage_errors_total counter"] + errors
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def reset():
+        with Metrics._lock:
+            Metrics._stages.clear()
+
+    @staticmethod
+    def start_server(port: int = None, host: str = None):
+        """/metrics uç noktasını arka plan thread'inde başlatır (port 0 ise kapalı)."""
+        port = Metrics.PORT if port is None else port
+        if not port or Metrics._server is not None:
+            return None
+        try:
+            server = ThreadingHTTPServer((host or Metrics.HOST, port), _MetricsHandler)
+        except OSError as e:
+            print(f"[Metrics] Hata: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        Metrics._server = server
+        print(f"📈 Metrikler: http://{server.server_address[0]}:{server.server_address[1]}/metrics")
+        return server
+
+    @staticmethod
+    def stop_server():
+        if Metrics._server is not None:
+            Metrics._server.shutdown()
+            Metrics._server.server_close()
+            Metrics._server = None
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = Metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Her scrape'i konsola basma
+
+class InstrumentedRequest(HTTPXRequest):
+    """Her Telegram API çağrısını "telegram.<metod>" aşaması olarak ölçer."""
+
+    async def do_request(self, url, method, request_data=None, **kwargs):
+        stage = f"telegram.{url.rsplit('/', 1)[-1]}"
+        with Metrics.span(stage) as span:
+            code, payload = await super().do_request(url, method, request_data, **kwargs)
+            if code >= 400:
+                span.fail()
+            return code, payload
@@ -0,0 +1,183 @@
+# services/param_optimizer.py
+"""
+Puanlama eşikleri için çevrimdışı parametre taraması.
+Semboller process pool'a dağıtılır; her worker sembolün geçmişini (bar deposu / cache)
+bir kez yükler, BacktestService.features ile indikatörleri bir kez hesaplar ve tüm
+parametre kombinasyonlarını bu diziler üzerinde puanlayıp simüle eder.
+Sonuçlar sembollerin toplamına göre sıralanır ve AnalysisService'in başlangıçta okuduğu
+dosyaya (ANALYSIS_PARAMS_PATH, varsayılan data/tuned_params.json) yazılır.
+
+Kullanım:
+    python -m services.param_optimizer --universe BIST30 --interval 1d
+    python -m services.param_optimizer --symbols THYAO,GARAN --interval 1h --mode random --samples 300
+"""
+import os
+import json
+import time
+import random
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from services.analysis_service import DEFAULT_PARAMS, PARAMS_PATH
+from services.backtest_service import BacktestService
+from services.market_data import MarketDataService
+from services.universes import get_universe
+
+# Puanı ve işlemleri etkileyen parametreler (etiket eşikleri taranmaz)
+SEARCH_SPACE = {
+    "rsi_oversold": [25.0, 30.0, 35.0],
+    "rsi_overbought": [65.0, 70.0, 75.0],
+    "stop_atr": [1.5, 2.0, 2.5, 3.0],
+    "target_atr": [2.0, 3.0, 4.0],
+    "min_rr": [1.0, 1.5, 2.0],
+    "whale_ratio": [1.5, 2.0, 2.5],
+    "sr_proximity": [0.01, 0.02, 0.03],
+}
+
+def build_candidates(mode: str = "grid", samples: int = 200, seed: int = 0) -> list:
+    """Parametre setleri (DEFAULT_PARAMS üzerine yazılmış tam sözlükler)."""
+    keys = list(SEARCH_SPACE)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*(SEARCH_SPACE[k] for k in keys))]
+    if mode == "random" and samples < len(grid):
+        grid = random.Random(seed).sample(grid, samples)
+    return [{**DEFAULT_PARAMS, **combo} for combo in grid]
+
+def _evaluate_symbol(symbol: str, interval: str, period: str, candidates: list, min_score: int, horizon: int):
+    """
+    Worker'da çalışır. Dönüş: (sembol, [kombinasyon başına istatistik] veya None).
+    İstatistikler toplanabilir olsun diye oran değil sayaç olarak döner.
+    """
+    df = MarketDataService.get_historical_data(symbol, period=period, interval=interval)
+    if df is None or len(df) <= BacktestService.WARMUP_BARS + horizon:
+        return symbol, None
+
+    features = BacktestService.features(df, interval, MarketDataService._normalize_symbol(symbol))
+    rows = []
+    for params in candidates:
+        signals = BacktestService.score_features(features, params)
+        trades = BacktestService.simulate(df, signals, min_score=min_score, horizon=horizon)
+        r = trades["r"].to_numpy(dtype="float64")
+        equity = np.cumsum(r)
+        drawdown = float((np.maximum.accumulate(np.maximum(equity, 0)) - equity).max()) if len(r) else 0.0
+        rows.append({
+            "trades": len(r),
+            "targets": int((trades["outcome"] == "target").sum()),
+            "sum_r": float(r.sum()),
+            "max_drawdown_r": drawdown,
+        })
+    return symbol, rows
+
+def optimize(symbols, interval: str = "1d", period: str = None, mode: str = "grid", samples: int = 200,
+             workers: int = None, min_trades: int = 30, min_score: int = None, horizon: int = None,
+             seed: int = 0) -> dict:
+    """Tüm sembollerde kombinasyonları dener; beklenen getiriye (R) göre sıralı sonuç döner."""
+    period = period or BacktestService.PERIODS.get(interval, "2y")
+    min_score = BacktestService.MIN_SCORE if min_score is None else min_score
+    horizon = BacktestService.HORIZON if horizon is None else horizon
+    candidates = build_candidates(mode, samples, seed)
+    workers = workers or min(len(symbols), os.cpu_count() or 1)
+
+    totals = [{"trades": 0, "targets": 0, "sum_r": 0.0, "max_drawdown_r": 0.0} for _ in candidates]
+    used, skipped = [], []
+    started = time.perf_counter()
+
+    ctx = multiprocessing.get_context(os.getenv("CPU_START_METHOD", "spawn"))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(_evaluate_symbol, symbol, interval, period, candidates, min_score, horizon)
+            for symbol in symbols
+        ]
+        for future in as_completed(futures):
+            try:
+                symbol, rows = future.result()
+            except Exception as e:
+                print(f"[ParamOptimizer] Hata: {e}")
+                continue
+            if rows is None:
+                skipped.append(symbol)
+                continue
+            used.append(symbol)
+            for total, row in zip(totals, rows):
+                total["trades"] += row["trades"]
+                total["targets"] += row["targets"]
+                total["sum_r"] += row["sum_r"]
+                # Semboller bağımsız hesaplar: en kötü sembolün düşüşü raporlanır
+                total["max_drawdown_r"] = max(total["max_drawdown_r"], row["max_drawdown_r"])
+
+    ranking = []
+    for params, total in zip(candidates, totals):
+        if total["trades"] < min_trades:
+            continue
+        ranking.append({
+            "params": {k: params[k] for k in SEARCH_SPACE},
+            "trades": total["trades"],
+            "hit_rate": round(total["targets"] / total["trades"], 3),
+            "expectancy_r": round(total["sum_r"] / total["trades"], 4),
+            "total_r": round(total["sum_r"], 2),
+            "max_drawdown_r": round(total["max_drawdown_r"], 2),
+        })
+    ranking.sort(key=lambda row: (row["expectancy_r"], row["hit_rate"]), reverse=True)
+
+    return {
+        "params": {**DEFAULT_PARAMS, **ranking[0]["params"]} if ranking else dict(DEFAULT_PARAMS),
+        "meta": {
+            "interval": interval,
+            "period": period,
+            "mode": mode,
+            "candidates": len(candidates),
+            "symbols": sorted(used),
+            "skipped": sorted(skipped),
+            "min_score": min_score,
+            "horizon": horizon,
+            "min_trades": min_trades,
+            "elapsed_s": round(time.perf_counter() - started, 1),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "ranking": ranking,
+    }
+
+def save(result: dict, path: str = PARAMS_PATH, top: int = 20):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    output = dict(result, ranking=result["ranking"][:top])
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Puanlama eşikleri için parametre taraması")
+    parser.add_argument("--universe", default="BIST30", help="BIST30 / BIST100 / KRIPTO")
+    parser.add_argument("--symbols", help="Virgülle ayrılmış semboller (evrenin yerine)")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--period", default=None)
+    parser.add_argument("--mode", choices=("grid", "random"), default="grid")
+    parser.add_argument("--samples", type=int, default=200, help="random modunda denenecek set sayısı")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--min-trades", type=int, default=30)
+    parser.add_argument("--min-score", type=int, default=None)
+    parser.add_argument("--horizon", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=PARAMS_PATH)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else get_universe(args.universe)
+    if not symbols:
+        print("Sembol listesi boş.")
+        return
+
+    result = optimize(
+        symbols, args.interval, args.period, args.mode, args.samples, args.workers,
+        args.min_trades, args.min_score, args.horizon, args.seed,
+    )
+    save(result, args.out, args.top)
+
+    meta = result["meta"]
+    print(f"{len(meta['symbols'])} sembol, {meta['candidates']} set, {meta['elapsed_s']} sn -> {args.out}")
+    for row in result["ranking"][:5]:
+        print(f"E={row['expectancy_r']}R isabet={row['hit_rate']} işlem={row['trades']} {row['params']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# services/quote_service.py
+import os
+import asyncio
+import threading
+from services.cache import TTLCache
+from services.executor import ExecutionService
+from services.market_data import MarketDataService
+from services.symbol_directory import SymbolDirectory
+from services.lazy import lazy_import
+
+yf = lazy_import("yfinance")
+
+class QuoteService:
+    """
+    Anlık fiyat katmanı.
+    - Fiyatlar toplu çekilir: her CHUNK_SIZE sembol için tek bir günlük bar isteği (son barın
+      kapanışı = son fiyat). Tek sembol de aynı yoldan gider.
+    - Metadata'sı bilinmeyen sembollerin fast_info çağrıları toplu istekle eşzamanlı çalışır.
+    - Para birimi / borsa / saat dilimi değişmez: sembol başına bir kez fast_info'dan alınır,
+      bellekte ve bar deposunda süresiz saklanır (.info taraması yapılmaz).
+    - Sonuçlar QUOTE_TTL saniye cache'lenir; aynı sembol için eşzamanlı istekler tek isteği bekler.
+    - Bulunamayan semboller SymbolDirectory'nin negatif cache'ine yazılır, tekrar sorulmaz.
+    """
+    TTL = float(os.getenv("QUOTE_TTL", "15"))
+    CHUNK_SIZE = 200
+    # Hafta sonu / tatilde de son kapanışı bulmak için
+    PERIOD = "5d"
+
+    _cache = TTLCache(
+        "quote",
+        max_entries=int(os.getenv("QUOTE_CACHE_SIZE", "2048")),
+        default_ttl=TTL,
+    )
+    _meta = {}  # sembol -> {"currency", "exchange", "timezone"}
+    _meta_flights = TTLCache("quote_meta", max_entries=256, default_ttl=TTL)  # devam eden fast_info çağrıları
+    _meta_lock = threading.Lock()
+    # fast_info'nun "sembol yok" yanıtı verdiği semboller (ağ hatası buraya yazılmaz)
+    _not_found = TTLCache("quote_not_found", max_entries=1024, default_ttl=600)
+
+    @staticmethod
+    def get_meta(symbol: str):
+        """Sembolün değişmeyen bilgileri; bilinmiyorsa fast_info ile bir kez çekilir. Alınamazsa None."""
+        search_symbol = MarketDataService._normalize_symbol(symbol)
+        meta = QuoteService._cached_meta(search_symbol)
+        if meta is None:
+            # Aynı sembol için eşzamanlı istekler tek fast_info çağrısını bekler.
+            # Fiyat da aynı yanıttan gelir; bir sonraki /fiyat için cache'e yazılır.
+            price = QuoteService._meta_flights.get_or_load(search_symbol, lambda: QuoteService._fetch_fast(search_symbol))
+            if price is not None:
+                QuoteService._cache.set(search_symbol, price)
+            meta = QuoteService._meta.get(search_symbol)
+        return meta
+
+    @staticmethod
+    def _cached_meta(search_symbol: str):
+        """Bellekte, yoksa bar deposunda arar; ağa çıkmaz."""
+        meta = QuoteService._meta.get(search_symbol)
+        if meta is not None:
+            return meta
+        store = MarketDataService._get_store()
+        if store is None:
+            return None
+        try:
+            meta = store.load_meta(search_symbol)
+        except Exception as e:
+            print(f"[QuoteService] Depo Hatası: {e}")
+            return None
+        if meta is not None:
+            with QuoteService._meta_lock:
+                QuoteService._meta[search_symbol] = meta
+        return meta
+
+    @staticmethod
+    def _remember_meta(search_symbol: str, meta: dict):
+        with QuoteService._meta_lock:
+            QuoteService._meta[search_symbol] = meta
+        store = MarketDataService._get_store()
+        if store is not None:
+            try:
+                store.save_meta(search_symbol, meta)
+            except Exception as e:
+                print(f"[QuoteService] Depo Hatası: {e}")
+
+    @staticmethod
+    def _fetch_fast(search_symbol: str):
+        """
+        fast_info ile son fiyat + para birimi/borsa. Fiyat (float) veya None döner.
+        Yahoo sembolü tanımıyorsa (boş metadata / fiyat yok) bu _not_found'a yazılır; ağ hatası yazılmaz.
+        """
+        try:
+            info = yf.Ticker(search_symbol).fast_info
+            price = info.last_price
+            if price is None or price != price:  # NaN
+                QuoteService._not_found.set(search_symbol, True)
+                return None
+            if search_symbol not in QuoteService._meta:
+                QuoteService._remember_meta(search_symbol, {
+                    "currency": info.currency,
+                    "exchange": info.exchange,
+                    "timezone": info.timezone,
+                })
+        except (KeyError, yf.exceptions.YFTickerMissingError):
+            # Bilinmeyen sembolde metadata boş gelir (ör. 'currentTradingPeriod' yok)
+            QuoteService._not_found.set(search_symbol, True)
+            return None
+        except Exception as e:
+            print(f"[QuoteService] fast_info Hatası ({search_symbol}): {e}")
+            return None
+        QuoteService._not_found.invalidate(search_symbol)
+        return float(price)
+
+    @staticmethod
+    def confirmed_missing(symbol: str, history: bool = True) -> bool:
+        """
+        Yahoo sembolün olmadığını gerçekten yanıtladı mı: fast_info sembolü tanımadı ve (history=True
+        ise) geçmiş veri isteği de boş döndü. Ağ hatası, limit, zaman aşımı veya başarısız toplu
+        istek sembolü bilinmeyen yapmaz.
+        """
+        search_symbol = MarketDataService._normalize_symbol(symbol)
+        if QuoteService._not_found.get(search_symbol) is None:
+            return False
+        return not history or MarketDataService.answered_no_data(search_symbol)
+
+    @staticmethod
+    def _download_prices(search_symbols) -> dict:
+        """Semboller için son kapanışlar, CHUNK_SIZE'lık toplu isteklerle: {sembol: fiyat}."""
+        prices = {}
+        search_symbols = list(search_symbols)
+        for start in range(0, len(search_symbols), QuoteService.CHUNK_SIZE):
+            chunk = search_symbols[start:start + QuoteService.CHUNK_SIZE]
+            try:
+                data = yf.download(
+                    chunk, period=QuoteService.PERIOD, interval="1d",
+                    group_by="column", auto_adjust=True, threads=True, progress=False,
+                )
+                closes = data["Close"] if data is not None and not data.empty else None
+            except Exception as e:
+                print(f"[QuoteService] Toplu fiyat Hatası: {e}")
+                closes = None
+            if closes is None:
+                continue
+            for search_symbol in chunk:
+                if search_symbol in closes.columns:
+                    column = closes[search_symbol].dropna()
+                    if not column.empty:
+                        prices[search_symbol] = float(column.iloc[-1])
+        return prices
+
+    @staticmethod
+    def get_prices(symbols) -> dict:
+        """
+        Birden çok sembolün son fiyatı: {sembol (girildiği gibi): fiyat veya None}.
+        Cache'te olanlar ağa çıkmaz; kalanlar toplu istekle çekilir.
+        """
+        prices = {}
+        missing = {}  # normalize sembol -> girilen semboller
+        for symbol in symbols:
+            search_symbol = MarketDataService._normalize_symbol(symbol)
+            cached = QuoteService._cache.get(search_symbol)
+            if cached is not None:
+                prices[symbol] = cached
+            else:
+                missing.setdefault(search_symbol, []).append(symbol)
+
+        fetched = QuoteService._download_prices(missing) if missing else {}
+        for search_symbol, originals in missing.items():
+            price = fetched.get(search_symbol)
+            if price is not None:
+                QuoteService._cache.set(search_symbol, price)
+            for symbol in originals:
+                prices[symbol] = price
+        return prices
+
+    @staticmethod
+    def _quote(symbol: str, price) -> dict:
+        meta = QuoteService._cached_meta(MarketDataService._normalize_symbol(symbol)) or {}
+        return {
+            "symbol": symbol.upper().strip(),
+            "price": round(float(price), 2),
+            "currency": meta.get("currency") or "Unknown",
+            "exchange": meta.get("exchange"),
+        }
+
+    @staticmethod
+    def _record(symbol: str, price):
+        """
+        Sonucu sembol dizinine bildirir. Fiyat yoksa sembol sadece fast_info "yok" dediyse bilinmeyen
+        sayılır; toplu istek hatası veya ağ sorunu geçicidir.
+        """
+        if price is not None:
+            SymbolDirectory.learn(symbol)
+        elif QuoteService.confirmed_missing(symbol, history=False):
+            SymbolDirectory.mark_unknown(symbol)
+
+    @staticmethod
+    async def get_quotes(symbols) -> dict:
+        """
+        {sembol: {"symbol", "price", "currency", "exchange"} veya None}.
+        Fiyatlar tek toplu istekle gelir; para birimi bilinmeyenlerin fast_info çağrıları aynı anda
+        executor'da paralel çalışır (soğuk cache'te N ardışık istek olmaz).
+        """
+        symbols = list(symbols)
+        quotes = {s: None for s in symbols if SymbolDirectory.is_unknown(s)}
+        symbols = [s for s in symbols if s not in quotes]
+        if not symbols:
+            return quotes
+
+        cold = await ExecutionService.run_io("fetch", QuoteService._without_meta, symbols) or []
+        prices, *_ = await asyncio.gather(
+            ExecutionService.run_io("fetch", QuoteService.get_prices, symbols),
+            *(ExecutionService.run_io("fetch", QuoteService.get_meta, symbol) for symbol in cold),
+        )
+        quotes.update(await ExecutionService.run_io("fetch", QuoteService._finish_quotes, symbols, prices or {}) or {})
+        return quotes
+
+    @staticmethod
+    def _without_meta(symbols) -> list:
+        return [s for s in symbols if QuoteService._cached_meta(MarketDataService._normalize_symbol(s)) is None]
+
+    @staticmethod
+    def _finish_quotes(symbols, prices: dict) -> dict:
+        quotes = {}
+        for symbol in symbols:
+            price = prices.get(symbol)
+            if price is None:
+                # Toplu istekte olmayan fiyatı fast_info getirmiş olabilir
+                price = QuoteService._cache.get(MarketDataService._normalize_symbol(symbol))
+            QuoteService._record(symbol, price)
+            quotes[symbol] = QuoteService._quote(symbol, price) if price is not None else None
+        return quotes
+
+    @staticmethod
+    def get_quote(symbol: str):
+        """Tek sembolün fiyatı (get_quotes ile aynı yol; eşzamanlı aynı istekler birleşir)."""
+        if SymbolDirectory.is_unknown(symbol):
+            return None
+        search_symbol = MarketDataService._normalize_symbol(symbol)
+        if QuoteService._cached_meta(search_symbol) is None:
+            QuoteService.get_meta(symbol)
+        price = QuoteService._cache.get_or_load(
+            search_symbol,
+            lambda: QuoteService._download_prices([search_symbol]).get(search_symbol),
+        )
+        QuoteService._record(symbol, price)
+        return QuoteService._quote(symbol, price) if price is not None else None
+
+    @staticmethod
+    def from_bars(symbol: str, df):
+        """Elde olan barlardan fiyat (son kapanış); para birimi metadata cache'inden."""
+        if df is None or df.empty:
+            return None
+        return QuoteService._quote(symbol, df["Close"][-1])
+
+    @staticmethod
+    def stats() -> dict:
+        stats = QuoteService._cache.stats()
+        stats["known_symbols"] = len(QuoteService._meta)
+        return stats
@@ -0,0 +1,238 @@
+# services/report_service.py
+import os
+import asyncio
+from services.cache import TTLCache
+from services.market_data import MarketDataService
+from services.analysis_service import AnalysisService
+from services.chart_service import ChartService
+from services.ai_service import AIService
+from services.quote_service import QuoteService
+from services.symbol_directory import SymbolDirectory
+from services.job_queue import JobQueue, PRIORITY_NORMAL
+from services.executor import ExecutionService
+from services.metrics import Metrics
+
+class Report:
+    """
+    Bir (sembol, interval, son bar) için tek seferde üretilen /analiz sonucu.
+    Analiz hazırdır; grafik ve AI yorumu arka plan task'larında bir kez üretilir ve
+    raporu isteyen herkes aynı sonucu bekler / aynı yorum akışını izler.
+    """
+
+    def __init__(self, symbol: str, interval: str, macro_interval: str, price_info: dict, analysis: dict):
+        self.symbol = symbol
+        self.interval = interval
+        self.macro_interval = macro_interval
+        self.price_info = price_info
+        self.analysis = analysis
+        self.chart = None            # asyncio.Task -> görüntü bytes veya None
+        self.chart_key = None        # ChartService.cache_key (MediaCache de bunu kullanır)
+        self.comment = None          # AI yorumunun o ana kadar gelen kısmı
+        self.comment_done = False
+        self._changed = asyncio.Event()
+        self._ai_task = None
+        self._stock_df = None  # OHLCV cache'indeki çerçevenin kendisi; ek bellek tutmaz
+
+    def start(self, stock_df):
+        """Grafik ve AI yorumunu başlatır. Task'lar isteği açan handler'dan bağımsızdır."""
+        self._stock_df = stock_df
+        levels = self.analysis["levels"]
+        self.chart_key = ChartService.cache_key(stock_df, self.symbol, self.interval, levels["support"], levels["resistance"])
+        self._start_chart()
+        self._ai_task = asyncio.ensure_future(self._produce_comment())
+
+    def attach(self, chart_image, chart_key):
+        """Grafiği başka süreçte çizilmiş raporu başlatır (kuyruk modu); burada sadece AI yorumu üretilir."""
+        self.chart_key = chart_key
+        self.chart = asyncio.get_running_loop().create_future()
+        self.chart.set_result(chart_image)
+        self._ai_task = asyncio.ensure_future(self._produce_comment())
+
+    def _start_chart(self):
+        levels = self.analysis["levels"]
+        self.chart = asyncio.ensure_future(ChartService.render(
+            self._stock_df, self.symbol, self.interval,
+            support=levels["support"], resistance=levels["resistance"],
+        ))
+
+    async def _produce_comment(self):
+        try:
+            async for text in AIService.stream_market_comment(self.symbol, self.analysis):
+                self.comment = text
+                self._notify()
+        finally:
+            self.comment_done = True
+            self._notify()
+
+    def _notify(self):
+        event, self._changed = self._changed, asyncio.Event()
+        event.set()
+
+    async def chart_image(self):
+        # Başarısız render (kuyruk dolu, süre aşımı) raporla birlikte cache'lenmez; sonraki istek yeniden dener.
+        # Worker'dan gelen raporun barları bu süreçte yoktur, yeniden çizilmez.
+        if self._stock_df is not None and self.chart.done() and (self.chart.cancelled() or self.chart.result() is None):
+            self._start_chart()
+        # Bir bekleyenin iptali ortak task'ı iptal etmesin
+        return await asyncio.shield(self.chart)
+
+    async def comments(self):
+        """Yorumun her yeni halini yield eder; yorum bitmişse son hali tek seferde gelir."""
+        if self.comment_done and self.comment is None:
+            # Önceki deneme yorumsuz bitti (süre aşımı / hata); bu istek yeniden dener
+            self.comment_done = False
+            self._ai_task = asyncio.ensure_future(self._produce_comment())
+        seen = None
+        while True:
+            event = self._changed
+            if self.comment is not None and self.comment != seen:
+                seen = self.comment
+                yield seen
+                continue
+            if self.comment_done:
+                return
+            await event.wait()
+
+class ReportService:
+    """
+    /analiz isteklerini birleştirir. Aynı (sembol, interval, son bar) için ilk istek raporu
+    üretir; eşzamanlı istekler onu bekler, bar kapanana kadar gelenler cache'teki raporu kullanır.
+    N özdeş istek = bir veri çekme + bir analiz + bir grafik + bir Gemini isteği.
+    ANALYSIS_MODE=queue ise veri çekme, analiz ve grafik iş kuyruğu üzerinden worker süreçlerinde
+    yapılır (anahtar: sembol, interval); bu süreç sadece sonucu bekler ve AI yorumunu akıtır.
+    """
+    MODE = os.getenv("ANALYSIS_MODE", "local").lower()
+    # Kuyruk modunda worker sonucunun en uzun bekleneceği süre ve sorgu aralığı (sn)
+    JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "60"))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.2"))
+
+    _inflight = {}  # anahtar -> asyncio.Future (Report veya None)
+    _cache = TTLCache(
+        "report",
+        max_entries=int(os.getenv("REPORT_CACHE_SIZE", "256")),
+        default_ttl=MarketDataService.DEFAULT_CACHE_TTL,
+    )
+
+    @staticmethod
+    async def get(symbol: str, interval: str, priority: int = PRIORITY_NORMAL):
+        """Raporu döner; veri veya analiz alınamazsa None. priority sadece kuyruk modunda kullanılır."""
+        if SymbolDirectory.is_unknown(symbol):
+            return None  # Yakın zamanda Yahoo'da bulunamadı; tekrar sorulmaz
+        if ReportService.MODE == "queue":
+            key = (MarketDataService._normalize_symbol(symbol), interval)
+            return await ReportService._shared(key, interval, lambda: ReportService._build_remote(symbol, interval, priority))
+
+        macro_interval = MarketDataService.get_macro_interval(interval)
+        period = MarketDataService.get_period_for_interval(interval, "1y")
+
+        # Veri çekme zaten cache'li ve single-flight; anahtardaki son bar buradan gelir.
+        # Fiyat ayrıca çekilmez (son kapanış); para birimi sembol başına bir kez öğrenilir.
+        stock_df, meta = await asyncio.gather(
+            Metrics.timed("fetch.micro", ExecutionService.run_io("fetch", MarketDataService.get_historical_data, symbol, period=period, interval=interval)),
+            Metrics.timed("fetch.meta", ExecutionService.run_io("fetch", QuoteService.get_meta, symbol)),
+        )
+        price_info = QuoteService.from_bars(symbol, stock_df)
+        if price_info is None:
+            # Sadece Yahoo'nun "yok" yanıtı negatif cache'e yazılır; ağ hatası / zaman aşımı geçicidir
+            if meta is None and QuoteService.confirmed_missing(symbol):
+                SymbolDirectory.mark_unknown(symbol)
+            return None
+        SymbolDirectory.learn(symbol)
+
+        key = (MarketDataService._normalize_symbol(symbol), interval, stock_df.last_time)
+        return await ReportService._shared(
+            key, interval, lambda: ReportService._build(symbol, interval, macro_interval, stock_df, price_info)
+        )
+
+    @staticmethod
+    async def _shared(key, interval: str, build):
+        """Cache'teki raporu döner; yoksa build() ile bir kez üretir, eşzamanlı istekler onu bekler."""
+        report = ReportService._cache.get(key)
+        if report is not None:
+            return report
+
+        pending = ReportService._inflight.get(key)
+        if pending is not None:
+            ReportService._cache.coalesced += 1
+            return await asyncio.shield(pending)
+
+        result = asyncio.get_running_loop().create_future()
+        ReportService._inflight[key] = result
+        report = None
+        try:
+            report = await build()
+            if report is not None:
+                ttl = MarketDataService.CACHE_TTLS.get(interval, MarketDataService.DEFAULT_CACHE_TTL)
+                ReportService._cache.set(key, report, ttl=ttl)
+        finally:
+            ReportService._inflight.pop(key, None)
+            result.set_result(report)
+        return report
+
+    @staticmethod
+    async def _build(symbol: str, interval: str, macro_interval: str, stock_df, price_info: dict):
+        macro_period = MarketDataService.get_period_for_interval(macro_interval, "2y")
+
+        # Macro veri micro barlardan türetilir; EMA50 için yetersizse indirilir
+        macro_df = await Metrics.timed("fetch.macro", ExecutionService.run_io(
+            "fetch", MarketDataService.get_macro_data, symbol, stock_df, interval, macro_interval, macro_period
+        ))
+        analysis = await Metrics.timed("analysis", ExecutionService.run_cpu(
+            "analysis", AnalysisService.calculate_technical_signals, stock_df, macro_df=macro_df
+        ))
+        if not analysis:
+            return None
+
+        analysis["price"] = price_info["price"]
+        report = Report(symbol, interval, macro_interval, price_info, analysis)
+        report.start(stock_df)
+        return report
+
+    @staticmethod
+    async def _build_remote(symbol: str, interval: str, priority: int):
+        """İşi kuyruğa ekler ve worker sonucunu bekler (JOB_TIMEOUT). Sonuç yoksa None."""
+        queue = JobQueue.get()
+        job_id = await ExecutionService.run_io(
+            "fetch", queue.enqueue, "analysis", {"symbol": symbol, "interval": interval}, priority
+        )
+        if job_id is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + ReportService.JOB_TIMEOUT
+        with Metrics.span("job.wait") as span:
+            while True:
+                job = await ExecutionService.run_io("fetch", queue.get, job_id)
+                if job is not None and job["status"] in ("done", "failed"):
+                    break
+                if loop.time() >= deadline:
+                    print(f"[ReportService] İş #{job_id} {ReportService.JOB_TIMEOUT}s içinde bitmedi.")
+                    span.fail()
+                    return None
+                await asyncio.sleep(ReportService.JOB_POLL_INTERVAL)
+
+            if job["status"] == "failed":
+                print(f"[ReportService] İş #{job_id} başarısız: {job['error']}")
+                span.fail()
+                return None
+
+        result = job["result"]
+        if not result.get("found"):
+            if result.get("unknown"):
+                SymbolDirectory.mark_unknown(symbol)
+            return None
+        SymbolDirectory.learn(symbol)
+        analysis = result["analysis"]
+        levels = analysis["levels"]
+        report = Report(symbol, interval, result["macro_interval"], result["price_info"], analysis)
+        # JSON'dan liste olarak döner; anahtar ChartService.cache_key ile aynı biçimde kurulur
+        chart_key = (symbol, interval, result["bar"], tuple(result["revision"]), levels["support"], levels["resistance"])
+        report.attach(job["blob"], chart_key)
+        return report
+
+    @staticmethod
+    def stats() -> dict:
+        stats = ReportService._cache.stats()
+        stats["in_flight"] = len(ReportService._inflight)
+        stats["mode"] = ReportService.MODE
+        return stats
@@ -0,0 +1,270 @@
+# services/scanner_service.py
+from __future__ import annotations
+import os
+import time
+import numpy as np
+from services.cache import TTLCache
+from services.market_data import MarketDataService
+from services.analysis_service import AnalysisService
+from services.indicator_engine import IndicatorEngine, ema as ema_2d
+from services.universes import get_universe
+from services.lazy import lazy_import
+
+pd = lazy_import("pandas")
+yf = lazy_import("yfinance")
+
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+class ScannerService:
+    """
+    Bir sembol evrenini (BIST30/BIST100/KRIPTO) tek bir yf.download ile indirir ve
+    calculate_technical_signals'in puanlama kurallarını son bar için tüm semboller
+    üzerinde birlikte (zaman x sembol 2D dizilerle) hesaplar.
+    """
+    # Sonuç, mevcut bar kapanana kadar geçerlidir; ama canlı bar değiştiği için en fazla bu kadar tutulur
+    MAX_CACHE_TTL = float(os.getenv("SCAN_CACHE_MAX_TTL", "300"))
+    _cache = TTLCache("scan", max_entries=32, default_ttl=MAX_CACHE_TTL)
+
+    @staticmethod
+    def scan(universe: str, interval: str = "1d", top_n: int = 5):
+        """
+        Dönüş: {"universe", "interval", "count", "buy": [...], "sell": [...]} veya None.
+        Her aday: {"symbol", "price", "score", "label", "rsi", "details"}
+        """
+        symbols = get_universe(universe)
+        if not symbols:
+            return None
+
+        minutes = MarketDataService.INTERVAL_MINUTES.get(interval, 1440)
+        bar_seconds = minutes * 60
+        now = time.time()
+        bar_id = int(now // bar_seconds)
+        ttl = min(ScannerService.MAX_CACHE_TTL, (bar_id + 1) * bar_seconds - now)
+
+        results = ScannerService._cache.get_or_load(
+            (universe.upper(), interval, bar_id),
+            lambda: ScannerService._scan_uncached(symbols, interval),
+            ttl=max(ttl, 1.0),
+        )
+        if results is None:
+            return None
+
+        ranked = sorted(results, key=lambda r: r["score"], reverse=True)
+        return {
+            "universe": universe.upper(),
+            "interval": interval,
+            "count": len(results),
+            "buy": [r for r in ranked if r["score"] > 0][:top_n],
+            "sell": [r for r in reversed(ranked) if r["score"] < 0][:top_n],
+        }
+
+    @staticmethod
+    def _scan_uncached(symbols, interval: str):
+        panel = ScannerService._download_panel(symbols, interval)
+        if panel is None:
+            return None
+        return ScannerService.score_panel(panel, interval)
+
+    @staticmethod
+    def _download_panel(symbols, interval: str):
+        """
+        Tüm sembolleri tek istekle indirir. Dönüş: {"symbols": [...], "index": DatetimeIndex,
+        "Open"/"High"/"Low"/"Close"/"Volume": (zaman x sembol) dizileri}
+        """
+        tickers = [MarketDataService._normalize_symbol(s) for s in symbols]
+        base_interval = MarketDataService.SYNTHETIC_INTERVALS.get(interval, interval)
+        period = MarketDataService.get_period_for_interval(interval)
+
+        try:
+            data = yf.download(
+                tickers, period=period, interval=base_interval,
+                group_by="column", auto_adjust=True, threads=True, progress=False,
+            )
+        except Exception as e:
+            print(f"[ScannerService] İndirme Hatası: {e}")
+            return None
+        if data is None or data.empty:
+            return None
+
+        closes = data["Close"]
+        valid = [t for t in tickers if t in closes.columns and closes[t].notna().any()]
+        if not valid:
+            return None
+
+        frames = {field: data[field][valid] for field in FIELDS}
+
+        # yfinance'in sunmadığı interval (4h) -> tüm panel aynı kovalarla toplanır
+        if base_interval != interval:
+            buckets = MarketDataService.bucket_index(frames["Close"].index, interval, valid[0])
+            frames = {
+                field: frame.groupby(buckets).agg(MarketDataService.OHLCV_AGG[field])
+                for field, frame in frames.items()
+            }
+
+        # Tatil / işlem durdurma boşlukları: fiyat ileri taşınır, hacim 0 sayılır
+        close = frames["Close"].ffill()
+        panel = {
+            "symbols": [t.replace(".IS", "") for t in valid],
+            "tickers": valid,
+            "index": close.index,
+            "Close": close.to_numpy(dtype="float64"),
+            "Volume": frames["Volume"].fillna(0).to_numpy(dtype="float64"),
+        }
+        for field in ("Open", "High", "Low"):
+            panel[field] = frames[field].fillna(close).to_numpy(dtype="float64")
+        return panel
+
+    @staticmethod
+    def score_panel(panel: dict, interval: str) -> list:
+        """
+        calculate_technical_signals puanlamasının son bar için vektörel karşılığı.
+        Tüm kurallar sembol ekseninde tek seferde uygulanır.
+        """
+        o, h, l, c, v = (panel[f] for f in FIELDS)
+        n_bars, n_symbols = c.shape
+        if n_bars < 20:
+            return []
+
+        p = AnalysisService.PARAMS
+        ind = IndicatorEngine.compute_arrays(h, l, c, v)
+        price = c[-1]
+        rsi_last = ind["rsi"][-1]
+        atr_last = ind["atr"][-1]
+
+        score = np.zeros(n_symbols, dtype=int)
+        details = [[] for _ in range(n_symbols)]
+
+        def add(mask, points, text):
+            score[mask] += points
+            if text:
+                for i in np.flatnonzero(mask):
+                    details[i].append(text if isinstance(text, str) else text(i))
+
+        # İndikatör Puanları
+        oversold = rsi_last < p["rsi_oversold"]
+        add(oversold, 2, "RSI: Aşırı Satım (Dip)")
+        add(~oversold & (rsi_last > p["rsi_overbought"]), -2, "RSI: Aşırı Alım (Tepe)")
+
+        macd_up = ind["macd"][-1] > ind["macd_signal"][-1]
+        add(macd_up, 1, None)
+        add(~macd_up, -1, None)
+
+        add(price < ind["bb_lower"][-1], 2, "BB: Alt Bant Delindi")
+
+        # Destek / Direnç (son 50 mum, güncel mum hariç)
+        if n_bars >= 50:
+            supp = l[-51:-1].min(axis=0)
+            res = h[-51:-1].max(axis=0)
+            near_supp = np.abs(price - supp) / price < p["sr_proximity"]
+            add(near_supp, 2, "YAPI: Desteğe Yakın 🛡️")
+            add(~near_supp & (np.abs(price - res) / price < p["sr_proximity"]), -2, "YAPI: Dirence Yakın 🚧")
+
+        # RSI Uyumsuzluğu
+        bullish_div, bearish_div = ScannerService._divergence(c, ind["rsi"])
+        add(bullish_div, 3, "🔥 PU (Yükseliş Sinyali) 🐂")
+        add(bearish_div, -3, "🔥 NU (Düşüş Sinyali) 🐻")
+
+        # Balina Hacmi
+        avg_vol = v[-21:-1].mean(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(avg_vol == 0, 0.0, v[-1] / avg_vol)
+        whale = ratio >= p["whale_ratio"]
+        whale_text = lambda i: "🐋 HACİM: " + ("ULTRA YÜKSEK (Balina 🐋)" if ratio[i] >= p["whale_ultra_ratio"] else "YÜKSEK (Dikkat) 🔥")
+        rising = price > o[-1]
+        add(whale & rising, 2, whale_text)
+        add(whale & ~rising, -2, whale_text)
+
+        # Mum Formasyonu (Pinbar)
+        body = np.abs(price - o[-1])
+        upper_wick = h[-1] - np.maximum(o[-1], price)
+        lower_wick = np.minimum(o[-1], price) - l[-1]
+        min_body = np.maximum(body, 0.0001)
+        hammer = (lower_wick > 2 * min_body) & (lower_wick > 1.5 * upper_wick)
+        shooting = ~hammer & (upper_wick > 2 * min_body) & (upper_wick > 1.5 * lower_wick)
+        add(hammer, 3, "🕯️ ÇEKİÇ / DİP OLUŞUMU (Bullish Pinbar) 🔨")
+        # calculate_technical_signals ile birebir: etiket "ÇEKİÇ" içerdiği için ters çekiç de +3 alır
+        add(shooting, 3, "🕯️ TERS ÇEKİÇ / SATIŞ BASKISI (Bearish Pinbar) 📌")
+
+        # MTF Bonus (üst zaman dilimi bu panelden türetilir)
+        macro_up = ScannerService._macro_trend_up(panel, interval)
+        if macro_up is not None:
+            score[macro_up & (score > 0)] += 1
+            score[~macro_up & (score < 0)] -= 1
+
+        # R:R Filtresi
+        stop_loss = np.round(price - p["stop_atr"] * atr_last, 4)
+        take_profit = np.round(price + p["target_atr"] * atr_last, 4)
+        risk = price - stop_loss
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rr_ratio = np.where(risk > 0, np.round((take_profit - price) / risk, 2), 0.0)
+        add((rr_ratio < p["min_rr"]) & (score > 0), -2, "RİSK: R/R Oranı Düşük (Verimsiz)")
+
+        results = []
+        for i, symbol in enumerate(panel["symbols"]):
+            if np.isnan(price[i]):
+                continue
+            results.append({
+                "symbol": symbol,
+                "price": round(float(price[i]), 2),
+                "score": int(score[i]),
+                "label": AnalysisService.score_label(int(score[i])),
+                "rsi": round(float(rsi_last[i]), 2),
+                "details": details[i],
+            })
+        return results
+
+    @staticmethod
+    def _last_two(mask: np.ndarray):
+        """Her sütundaki son iki True satırın indeksleri (yoksa -1)."""
+        rows = np.arange(len(mask))[:, None]
+        positions = np.where(mask, rows, -1)
+        last = positions.max(axis=0)
+        positions = np.where(positions == last, -1, positions)
+        prev = positions.max(axis=0)
+        return last, prev
+
+    @staticmethod
+    def _divergence(close: np.ndarray, rsi: np.ndarray):
+        """detect_rsi_divergence kurallarının sütun bazlı (sembol bazlı) karşılığı."""
+        cols = np.arange(close.shape[1])
+        price_peaks, price_troughs = AnalysisService._pivot_masks(close, 2)
+        rsi_peaks, rsi_troughs = AnalysisService._pivot_masks(rsi, 2)
+
+        p_tr, p_tr_prev = ScannerService._last_two(price_troughs)
+        r_tr, r_tr_prev = ScannerService._last_two(rsi_troughs)
+        # En az 2 dip yoksa fonksiyon hiç sinyal vermez
+        has_troughs = (p_tr_prev >= 0) & (r_tr_prev >= 0)
+
+        bullish = (
+            has_troughs
+            & (np.abs(p_tr - r_tr) <= 3)
+            & (close[p_tr, cols] < close[p_tr_prev, cols])
+            & (rsi[r_tr, cols] > rsi[r_tr_prev, cols])
+        )
+
+        p_pk, p_pk_prev = ScannerService._last_two(price_peaks)
+        r_pk, r_pk_prev = ScannerService._last_two(rsi_peaks)
+        bearish = (
+            has_troughs & ~bullish
+            & (p_pk_prev >= 0) & (r_pk_prev >= 0)
+            & (np.abs(p_pk - r_pk) <= 3)
+            & (close[p_pk, cols] > close[p_pk_prev, cols])
+            & (rsi[r_pk, cols] < rsi[r_pk_prev, cols])
+        )
+        return bullish, bearish
+
+    @staticmethod
+    def _macro_trend_up(panel: dict, interval: str):
+        """
+        calculate_mtf_trend'in yön kararı: üst zaman diliminde Close > EMA50.
+        Üst zaman dilimi panelden türetilemiyorsa None (bonus uygulanmaz).
+        """
+        macro_interval = MarketDataService.get_macro_interval(interval)
+        if not MarketDataService._can_resample(interval, macro_interval):
+            return None
+        buckets = MarketDataService.bucket_index(panel["index"], macro_interval, panel["tickers"][0])
+        macro_close = pd.DataFrame(panel["Close"]).groupby(np.asarray(buckets)).last().to_numpy()
+        if len(macro_close) < MarketDataService.MIN_MACRO_BARS:
+            return None
+        ema50 = ema_2d(macro_close, 50)
+        return macro_close[-1] > ema50[-1]
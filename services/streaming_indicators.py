@@ -0,0 +1,221 @@
+# services/streaming_indicators.py
+from abc import ABC, abstractmethod
+
+NAN = float("nan")
+
+def _ewm_step(value, count, x, alpha):
+    """adjust=False üstel ortalamanın tek adımı. İlk gözlem ortalamanın kendisidir."""
+    if x != x:  # NaN: gözlem yok, ortalama değişmez
+        return value, count
+    if count == 0:
+        return x, 1
+    return alpha * x + (1 - alpha) * value, count + 1
+
+class _StreamingIndicator(ABC):
+    """
+    O(1) güncellenen indikatör tabanı.
+    update(..., new_bar=True)  -> yeni bar ekler
+    update(..., new_bar=False) -> son barı revize eder (canlı, henüz kapanmamış bar)
+    Revizyon için son bardan önceki durum saklanır.
+    """
+    _fields = ()
+
+    def __init__(self):
+        self._prev = None
+
+    def _get_state(self):
+        return tuple(getattr(self, f) for f in self._fields)
+
+    def _set_state(self, state):
+        for f, v in zip(self._fields, state):
+            setattr(self, f, v)
+
+    def update(self, *args, new_bar: bool = True):
+        if new_bar or self._prev is None:
+            self._prev = self._get_state()
+        else:
+            self._set_state(self._prev)
+        return self._apply(*args)
+
+    @abstractmethod
+    def _apply(self, *args):
+        """Yeni gözlemi duruma işler ve güncel değeri döner."""
+
+class EMAState(_StreamingIndicator):
+    """ta EMAIndicator ile aynı: span=window, adjust=False, window bar dolana kadar NaN."""
+    _fields = ("value", "count")
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+        self.alpha = 2 / (window + 1)
+        self.value = NAN
+        self.count = 0
+
+    @property
+    def current(self):
+        return self.value if self.count >= self.window else NAN
+
+    def _apply(self, close):
+        self.value, self.count = _ewm_step(self.value, self.count, close, self.alpha)
+        return self.current
+
+class RSIState(_StreamingIndicator):
+    """ta RSIIndicator ile aynı: yukarı/aşağı hareketlerin Wilder ortalaması (alpha=1/window)."""
+    _fields = ("prev_close", "avg_up", "avg_down", "count")
+
+    def __init__(self, window: int = 14):
+        super().__init__()
+        self.window = window
+        self.alpha = 1 / window
+        self.prev_close = None
+        self.avg_up = NAN
+        self.avg_down = NAN
+        self.count = 0
+
+    @property
+    def current(self):
+        if self.count < self.window:
+            return NAN
+        if self.avg_down == 0:
+            return 100.0
+        return 100 - (100 / (1 + self.avg_up / self.avg_down))
+
+    def _apply(self, close):
+        # İlk barda fark yoktur; ta bunu 0 hareket olarak sayar
+        diff = 0.0 if self.prev_close is None else close - self.prev_close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        self.avg_up, _ = _ewm_step(self.avg_up, self.count, up, self.alpha)
+        self.avg_down, self.count = _ewm_step(self.avg_down, self.count, down, self.alpha)
+        self.prev_close = close
+        return self.current
+
+class MACDState(_StreamingIndicator):
+    """ta MACD ile aynı: EMA(12) - EMA(26), sinyal = MACD'nin EMA(9)'u."""
+    _fields = ("fast", "fast_n", "slow", "slow_n", "signal", "signal_n")
+
+    def __init__(self, window_fast: int = 12, window_slow: int = 26, window_sign: int = 9):
+        super().__init__()
+        self.window_fast = window_fast
+        self.window_slow = window_slow
+        self.window_sign = window_sign
+        self.fast, self.fast_n = NAN, 0
+        self.slow, self.slow_n = NAN, 0
+        self.signal, self.signal_n = NAN, 0
+
+    @property
+    def macd(self):
+        if self.fast_n < self.window_fast or self.slow_n < self.window_slow:
+            return NAN
+        return self.fast - self.slow
+
+    @property
+    def current(self):
+        signal = self.signal if self.signal_n >= self.window_sign else NAN
+        return self.macd, signal
+
+    def _apply(self, close):
+        self.fast, self.fast_n = _ewm_step(self.fast, self.fast_n, close, 2 / (self.window_fast + 1))
+        self.slow, self.slow_n = _ewm_step(self.slow, self.slow_n, close, 2 / (self.window_slow + 1))
+        # MACD NaN iken sinyal ortalaması başlamaz (pandas ewm baştaki NaN'ları atlar)
+        self.signal, self.signal_n = _ewm_step(self.signal, self.signal_n, self.macd, 2 / (self.window_sign + 1))
+        return self.current
+
+class ATRState(_StreamingIndicator):
+    """ta AverageTrueRange ile aynı: ilk window TR'nin ortalaması ile başlar, sonra Wilder. Öncesi 0."""
+    _fields = ("prev_close", "count", "tr_sum", "value")
+
+    def __init__(self, window: int = 14):
+        super().__init__()
+        self.window = window
+        self.prev_close = None
+        self.count = 0
+        self.tr_sum = 0.0
+        self.value = 0.0
+
+    @property
+    def current(self):
+        return self.value
+
+    def _apply(self, high, low, close):
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.window:
+            self.tr_sum += true_range
+        elif self.count == self.window:
+            self.value = (self.tr_sum + true_range) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + true_range) / self.window
+        return self.value
+
+class OBVState(_StreamingIndicator):
+    """ta OnBalanceVolumeIndicator ile aynı: düşüş barında hacim çıkarılır, diğerlerinde eklenir."""
+    _fields = ("prev_close", "value")
+
+    def __init__(self):
+        super().__init__()
+        self.prev_close = None
+        self.value = 0.0
+
+    @property
+    def current(self):
+        return self.value
+
+    def _apply(self, close, volume):
+        if self.prev_close is not None and close < self.prev_close:
+            self.value -= volume
+        else:
+            self.value += volume
+        self.prev_close = close
+        return self.value
+
+class StreamingIndicatorSet:
+    """
+    Bir sembol/interval için canlı indikatör durumu.
+    Geçmişle bir kez beslenir (from_frame), sonra her tick'te update_bar() O(1) çalışır.
+    Aynı zaman damgalı bar tekrar gelirse son bar revize edilir.
+    """
+
+    def __init__(self):
+        self.rsi = RSIState(14)
+        self.macd = MACDState(12, 26, 9)
+        self.atr = ATRState(14)
+        self.obv = OBVState()
+        self.ema50 = EMAState(50)
+        self.last_ts = None
+
+    @staticmethod
+    def from_frame(df):
+        state = StreamingIndicatorSet()
+        for ts, o, h, l, c, v in zip(
+            df.index, *(df[col] for col in ("Open", "High", "Low", "Close", "Volume")),
+        ):
+            state.update_bar(ts, o, h, l, c, v)
+        return state
+
+    def update_bar(self, ts, open_p, high, low, close, volume):
+        new_bar = self.last_ts is None or ts != self.last_ts
+        self.rsi.update(close, new_bar=new_bar)
+        self.macd.update(close, new_bar=new_bar)
+        self.atr.update(high, low, close, new_bar=new_bar)
+        self.obv.update(close, volume, new_bar=new_bar)
+        self.ema50.update(close, new_bar=new_bar)
+        self.last_ts = ts
+        return self.snapshot()
+
+    def snapshot(self) -> dict:
+        macd, signal = self.macd.current
+        return {
+            "ts": self.last_ts,
+            "rsi": self.rsi.current,
+            "macd": macd,
+            "macd_signal": signal,
+            "atr": self.atr.current,
+            "obv": self.obv.current,
+            "ema50": self.ema50.current,
+        }
@@ -0,0 +1,234 @@
+# services/symbol_directory.py
+import os
+import csv
+import threading
+from services.cache import TTLCache
+from services.market_data import MarketDataService
+from services.universes import BIST100, CRYPTO
+
+# Endeksler ve sık sorulan pariteler (Yahoo sembolü -> ad)
+INDICES = {
+    "XU100.IS": "BIST 100 Endeksi",
+    "XU030.IS": "BIST 30 Endeksi",
+    "XBANK.IS": "BIST Banka Endeksi",
+    "^GSPC": "S&P 500",
+    "^IXIC": "Nasdaq Composite",
+    "^DJI": "Dow Jones",
+    "^GDAXI": "DAX",
+    "^FTSE": "FTSE 100",
+    "^N225": "Nikkei 225",
+    "USDTRY=X": "Dolar / TL",
+    "EURTRY=X": "Euro / TL",
+    "GC=F": "Altın (ons)",
+}
+
+# Aramada Türkçe karakterler ASCII karşılıklarıyla eşleşir ("türk" -> "TURK")
+_FOLD = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+
+def _fold(text: str) -> str:
+    return text.translate(_FOLD).upper()
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """a ile b arasında en fazla bir ekleme/silme/değiştirme veya yan yana harf takası var mı."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        # THYOA -> THYAO
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    if la > lb:
+        a, b = b, a
+    # b, a'ya bir harf eklenmiş hali mi
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+class _Node:
+    __slots__ = ("children", "symbols")
+
+    def __init__(self):
+        self.children = {}
+        self.symbols = []  # bu önekle biten anahtarların sembolleri (kod veya ad kelimesi)
+
+class SymbolDirectory:
+    """
+    Yerel sembol dizini: BIST hisseleri, kripto pariteleri ve endeksler (+ SYMBOL_DIRECTORY_PATH
+    CSV'si ve daha önce verisi başarıyla alınmış semboller).
+    - resolve(): sembolü ağa çıkmadan doğrular; Yahoo'da olmadığı bilinen sembolün tek harflik
+      yazım hatasını düzeltir
+    - search(): kod ve ad kelimeleri üzerinde önek araması (inline autocomplete)
+    - Yahoo'da bulunamayan semboller negatif cache'e girer; tekrar sorulunca ağa çıkılmaz
+    """
+    PATH = os.getenv("SYMBOL_DIRECTORY_PATH", "data/symbols.csv")
+    NEGATIVE_TTL = float(os.getenv("SYMBOL_NEGATIVE_TTL", str(6 * 3600)))
+
+    _entries = None  # Yahoo sembolü -> {"symbol", "code", "name", "kind"}
+    _codes = {}      # gösterilen kod (THYAO, BTC-USD) -> Yahoo sembolü
+    _trie = None
+    _lock = threading.Lock()
+    _unknown = TTLCache(
+        "unknown_symbol",
+        max_entries=int(os.getenv("SYMBOL_NEGATIVE_SIZE", "4096")),
+        default_ttl=NEGATIVE_TTL,
+    )
+
+    @staticmethod
+    def _code(search_symbol: str) -> str:
+        return search_symbol[:-3] if search_symbol.endswith(".IS") else search_symbol
+
+    @staticmethod
+    def _ensure_loaded():
+        if SymbolDirectory._entries is None:
+            with SymbolDirectory._lock:
+                if SymbolDirectory._entries is None:
+                    SymbolDirectory._load()
+
+    @staticmethod
+    def _load():
+        """Lock altında çağrılır."""
+        SymbolDirectory._entries = {}
+        SymbolDirectory._codes = {}
+        SymbolDirectory._trie = _Node()
+        for code in BIST100:
+            SymbolDirectory._add(f"{code}.IS", "", "BIST")
+        for symbol in CRYPTO:
+            SymbolDirectory._add(symbol, "", "Kripto")
+        for symbol, name in INDICES.items():
+            SymbolDirectory._add(symbol, name, "Endeks")
+
+        if SymbolDirectory.PATH and os.path.exists(SymbolDirectory.PATH):
+            try:
+                with open(SymbolDirectory.PATH, encoding="utf-8", newline="") as f:
+                    for row in csv.DictReader(f):
+                        if row.get("symbol"):
+                            SymbolDirectory._add(row["symbol"].strip().upper(), (row.get("name") or "").strip(), (row.get("kind") or "").strip())
+            except (OSError, csv.Error) as e:
+                print(f"[SymbolDirectory] {SymbolDirectory.PATH} okunamadı: {e}")
+
+        store = MarketDataService._get_store()
+        if store is not None:
+            try:
+                for symbol in store.known_symbols():
+                    SymbolDirectory._add(symbol, "", "")
+            except Exception as e:
+                print(f"[SymbolDirectory] Depo Hatası: {e}")
+
+    @staticmethod
+    def _add(search_symbol: str, name: str, kind: str):
+        """Lock altında çağrılır. Var olan kaydın boş alanlarını doldurur."""
+        entry = SymbolDirectory._entries.get(search_symbol)
+        if entry is not None:
+            entry["name"] = entry["name"] or name
+            entry["kind"] = entry["kind"] or kind
+            return
+        code = SymbolDirectory._code(search_symbol)
+        entry = {"symbol": search_symbol, "code": code, "name": name, "kind": kind}
+        SymbolDirectory._entries[search_symbol] = entry
+        SymbolDirectory._codes[code] = search_symbol
+
+        keys = {_fold(code).lstrip("^")}
+        keys.update(word for word in _fold(name).split() if len(word) > 1)
+        for key in keys:
+            node = SymbolDirectory._trie
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+            node.symbols.append(search_symbol)
+
+    @staticmethod
+    def lookup(symbol: str):
+        """Dizindeki kayıt ({"symbol", "code", "name", "kind"}) veya None. Ağa çıkmaz."""
+        SymbolDirectory._ensure_loaded()
+        clean = symbol.upper().strip()
+        search_symbol = SymbolDirectory._codes.get(clean) or MarketDataService._normalize_symbol(clean)
+        return SymbolDirectory._entries.get(search_symbol)
+
+    @staticmethod
+    def search(prefix: str, limit: int = 10) -> list:
+        """Kodu veya adındaki bir kelimesi bu önekle başlayan kayıtlar; önce kod eşleşmeleri, kısa kodlar."""
+        SymbolDirectory._ensure_loaded()
+        key = _fold(prefix.strip()).lstrip("^")
+        if not key:
+            return []
+        node = SymbolDirectory._trie
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        found = []
+        seen = set()
+        stack = [node]
+        # Ad kelimeleri de indekslendiği için alt ağaç küçüktür; yine de üst sınır konur
+        while stack and len(found) < limit * 5:
+            current = stack.pop()
+            for symbol in current.symbols:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    found.append(SymbolDirectory._entries[symbol])
+            stack.extend(current.children[c] for c in sorted(current.children, reverse=True))
+
+        found.sort(key=lambda e: (not _fold(e["code"]).lstrip("^").startswith(key), len(e["code"]), e["code"]))
+        return found[:limit]
+
+    @staticmethod
+    def suggestions(symbol: str, limit: int = 5) -> list:
+        """Bir harf farkla eşleşen diğer kodlar (yazım hatası adayları)."""
+        SymbolDirectory._ensure_loaded()
+        clean = symbol.upper().strip()
+        return [code for code in SymbolDirectory._codes if code != clean and _within_one_edit(clean, code)][:limit]
+
+    @staticmethod
+    def resolve(symbol: str) -> dict:
+        """
+        Sembolü ağa çıkmadan değerlendirir:
+        {"symbol": kullanılacak kod veya None, "corrected": bool, "suggestions": [...]}
+        - dizinde varsa olduğu gibi kullanılır
+        - dizinde yoksa yine olduğu gibi denenir (dizin küçüktür; KRDMA, ALBRK gibi geçerli
+          semboller başka bir koda bir harf uzaktır). Adaylar sadece "bunu mu demek istediniz" içindir
+        - sembolün Yahoo'da olmadığı biliniyorsa (negatif cache) tek aday varsa ona düzeltilir,
+          yoksa symbol None (kullanıcıya adaylar gösterilir)
+        """
+        clean = symbol.upper().strip()
+        if SymbolDirectory.lookup(clean) is not None:
+            return {"symbol": clean, "corrected": False, "suggestions": []}
+
+        candidates = SymbolDirectory.suggestions(clean)
+        if not SymbolDirectory.is_unknown(clean):
+            return {"symbol": clean, "corrected": False, "suggestions": candidates}
+        if len(candidates) == 1:
+            return {"symbol": candidates[0], "corrected": True, "suggestions": candidates}
+        return {"symbol": None, "corrected": False, "suggestions": candidates}
+
+    @staticmethod
+    def is_unknown(symbol: str) -> bool:
+        return SymbolDirectory._unknown.get(MarketDataService._normalize_symbol(symbol)) is not None
+
+    @staticmethod
+    def mark_unknown(symbol: str):
+        """Yahoo'da bulunamayan sembol NEGATIVE_TTL boyunca tekrar sorulmaz (dizindekiler hariç)."""
+        if SymbolDirectory.lookup(symbol) is None:
+            SymbolDirectory._unknown.set(MarketDataService._normalize_symbol(symbol), True)
+
+    @staticmethod
+    def learn(symbol: str):
+        """Verisi başarıyla alınan sembolü dizine ekler (autocomplete ve doğrulama için)."""
+        SymbolDirectory._ensure_loaded()
+        search_symbol = MarketDataService._normalize_symbol(symbol)
+        if search_symbol not in SymbolDirectory._entries:
+            with SymbolDirectory._lock:
+                SymbolDirectory._add(search_symbol, "", "")
+        SymbolDirectory._unknown.invalidate(search_symbol)
+
+    @staticmethod
+    def stats() -> dict:
+        SymbolDirectory._ensure_loaded()
+        return {
+            "symbols": len(SymbolDirectory._entries),
+            "unknown": SymbolDirectory._unknown.stats(),
+        }
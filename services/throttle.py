@@ -0,0 +1,141 @@
+# services/throttle.py
+import os
+import time
+import asyncio
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import BaseUpdateProcessor
+from services.metrics import Metrics
+
+class _Slot:
+    """Bir kullanıcı/sohbet için çalışan ve bekleyen güncelleme sayacı."""
+    __slots__ = ("running", "waiting", "released")
+
+    def __init__(self):
+        self.running = 0
+        self.waiting = 0
+        self.released = asyncio.Event()
+
+class ThrottledUpdateProcessor(BaseUpdateProcessor):
+    """
+    Güncellemeleri eşzamanlı işler (concurrent_updates). Toplam eşzamanlılık
+    max_concurrent_updates ile sınırlıdır; aşan güncellemeler PTB'nin semaforunda sırada bekler.
+    Ayrıca her kullanıcı ve her sohbet için:
+    - en fazla *_MAX_INFLIGHT güncelleme aynı anda çalışır,
+    - en fazla MAX_QUEUED güncelleme sırada bekler,
+    - fazlası reddedilir ve kullanıcıya kısa bir uyarı gönderilir.
+    Böylece bir sohbetin yavaş /analiz'leri diğer kullanıcıları bekletmez.
+    """
+    MAX_CONCURRENT = int(os.getenv("MAX_CONCURRENT_UPDATES", "64"))
+    USER_MAX_INFLIGHT = int(os.getenv("USER_MAX_INFLIGHT", "2"))
+    CHAT_MAX_INFLIGHT = int(os.getenv("CHAT_MAX_INFLIGHT", "4"))
+    MAX_QUEUED = int(os.getenv("USER_MAX_QUEUED", "1"))
+    # Sırada bu süreden fazla bekleyen güncelleme de reddedilir (sn)
+    QUEUE_TIMEOUT = float(os.getenv("USER_QUEUE_TIMEOUT", "30"))
+    REJECT_TEXT = "⏳ Önceki isteklerin hâlâ işleniyor, lütfen biraz bekleyip tekrar dene."
+
+    def __init__(self, max_concurrent_updates: int = None):
+        super().__init__(max_concurrent_updates or self.MAX_CONCURRENT)
+        self._slots = {}  # ("user"|"chat", id) -> _Slot
+        self._stats = {"processed": 0, "queued": 0, "rejected": 0}
+
+    def _limits(self, update) -> list:
+        """Güncellemenin tabi olduğu (anahtar, sınır) çiftleri. Kullanıcısız güncellemeler sınırsız."""
+        if not isinstance(update, Update):
+            return []
+        limits = []
+        if update.effective_user is not None:
+            limits.append((("user", update.effective_user.id), self.USER_MAX_INFLIGHT))
+        if update.effective_chat is not None:
+            limits.append((("chat", update.effective_chat.id), self.CHAT_MAX_INFLIGHT))
+        return limits
+
+    def _slot(self, key) -> _Slot:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = _Slot()
+        return slot
+
+    def _has_room(self, limits) -> bool:
+        return all(self._slot(key).running < limit for key, limit in limits)
+
+    async def _admit(self, limits) -> bool:
+        """Tüm sınırlarda yer açılana kadar bekler. Sıra doluysa / süre aşılırsa False."""
+        if self._has_room(limits):
+            return True
+        slots = [self._slot(key) for key, _ in limits]
+        if any(slot.waiting >= self.MAX_QUEUED for slot in slots):
+            return False
+
+        self._stats["queued"] += 1
+        for slot in slots:
+            slot.waiting += 1
+        deadline = time.monotonic() + self.QUEUE_TIMEOUT
+        try:
+            while not self._has_room(limits):
+                # Dolu slotlardan biri boşalınca tekrar denenir
+                full = [slot for slot, (_, limit) in zip(slots, limits) if slot.running >= limit]
+                event = full[0].released
+                event.clear()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return False
+            return True
+        finally:
+            for slot in slots:
+                slot.waiting -= 1
+
+    def _release(self, limits):
+        for key, _ in limits:
+            slot = self._slots[key]
+            slot.running -= 1
+            slot.released.set()
+            if slot.running == 0 and slot.waiting == 0:
+                del self._slots[key]
+
+    async def _reject(self, update):
+        self._stats["rejected"] += 1
+        message = update.effective_message if isinstance(update, Update) else None
+        if message is None:
+            return
+        try:
+            await message.reply_text(self.REJECT_TEXT)
+        except TelegramError as e:
+            print(f"[ThrottledUpdateProcessor] Uyarı gönderilemedi: {e}")
+
+    async def do_process_update(self, update, coroutine):
+        limits = self._limits(update)
+        started = time.perf_counter()
+        admitted = await self._admit(limits)
+        Metrics.observe("update.queue_wait", time.perf_counter() - started, error=not admitted)
+        if not admitted:
+            # İşlenmeyecek handler coroutine'i "never awaited" uyarısı vermesin
+            if asyncio.iscoroutine(coroutine):
+                coroutine.close()
+            await self._reject(update)
+            return
+
+        for key, _ in limits:
+            self._slot(key).running += 1
+        try:
+            await coroutine
+        finally:
+            self._release(limits)
+            self._stats["processed"] += 1
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        self._slots.clear()
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["in_flight"] = self.current_concurrent_updates
+        stats["max_concurrent"] = self.max_concurrent_updates
+        stats["tracked_keys"] = len(self._slots)
+        return stats
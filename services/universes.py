@@ -0,0 +1,41 @@
+# services/universes.py
+import os
+
+# Endeks bileşenleri dönemsel olarak değişir; güncel liste .env ile verilebilir:
+# SCAN_UNIVERSE_BIST30="THYAO,GARAN,..."  (sembol kodları, .IS eklenmeden)
+
+BIST30 = [
+    "AKBNK", "ALARK", "ASELS", "ASTOR", "BIMAS", "CCOLA", "DOAS", "EKGYO", "ENKAI", "EREGL",
+    "FROTO", "GARAN", "GUBRF", "HEKTS", "ISCTR", "KCHOL", "KONTR", "KOZAL", "KRDMD", "MGROS",
+    "OYAKC", "PETKM", "PGSUS", "SAHOL", "SASA", "SISE", "TCELL", "THYAO", "TOASO", "TUPRS",
+    "YKBNK",
+]
+
+BIST100 = BIST30 + [
+    "AEFES", "AGHOL", "AKSA", "AKSEN", "ALFAS", "ALTNY", "ANSGR", "ARCLK", "BERA", "BRSAN",
+    "BRYAT", "BTCIM", "CANTE", "CIMSA", "CLEBI", "CWENE", "DOHOL", "ECILC", "EGEEN", "ENJSA",
+    "EUPWR", "FENER", "GESAN", "GLYHO", "GRSEL", "HALKB", "ISGYO", "ISMEN", "KCAER", "KMPUR",
+    "KONYA", "KORDS", "KOZAA", "LMKDK", "MAVI", "MIATK", "ODAS", "OTKAR", "PASEU", "PENTA",
+    "QUAGR", "REEDR", "SDTTR", "SKBNK", "SMRTG", "SOKM", "TABGD", "TAVHL", "TKFEN", "TMSN",
+    "TSKB", "TTKOM", "TTRAK", "TURSG", "ULKER", "VAKBN", "VESBE", "VESTL", "YEOTK", "ZOREN",
+]
+
+CRYPTO = [
+    "BTC-USD", "ETH-USD", "BNB-USD", "SOL-USD", "XRP-USD", "ADA-USD", "DOGE-USD", "AVAX-USD",
+    "TRX-USD", "DOT-USD", "LINK-USD", "LTC-USD", "BCH-USD", "XLM-USD", "ATOM-USD", "UNI-USD",
+    "ETC-USD", "FIL-USD", "NEAR-USD", "APT-USD",
+]
+
+UNIVERSES = {
+    "BIST30": BIST30,
+    "BIST100": BIST100,
+    "KRIPTO": CRYPTO,
+}
+
+def get_universe(name: str):
+    """Evren adına göre sembol listesini döner (.env ile ezilebilir). Bilinmiyorsa None."""
+    key = name.upper().strip()
+    override = os.getenv(f"SCAN_UNIVERSE_{key}")
+    if override:
+        return [s.strip().upper() for s in override.split(",") if s.strip()]
+    return UNIVERSES.get(key)
@@ -0,0 +1,109 @@
+# services/warmup.py
+import os
+import time
+import asyncio
+from services import lazy
+from services.executor import ExecutionService
+from services.chart_service import ChartService
+from services.market_data import MarketDataService
+from services.report_service import ReportService
+from services.job_queue import JobQueue, PRIORITY_LOW
+from services.metrics import Metrics
+
+# Isınmada yüklenen ağır modüller (servisler bunları tembel import eder)
+HEAVY_MODULES = ("pandas", "yfinance", "ta.trend", "google.generativeai")
+
+def _preload_worker():
+    """CPU worker'ında analiz modüllerini ve pandas/ta'yı yükler (spawn süreçleri boş başlar)."""
+    from services.analysis_service import pd, ta_trend
+    lazy.load(pd)
+    lazy.load(ta_trend)
+    return True
+
+class WarmupService:
+    """
+    İsteğe bağlı ısınma (WARMUP=1). Polling başladıktan sonra arka planda:
+    ağır modülleri yükler, grafik worker'larını (font + stil) ve CPU havuzunu başlatır,
+    WARMUP_SYMBOLS için OHLCV cache'ini doldurur. İlk kullanıcı soğuk başlangıç ödemez.
+    Kuyruk modunda semboller düşük öncelikli iş olarak worker'lara gönderilir (kullanıcı işlerini bekletmez).
+    """
+    ENABLED = os.getenv("WARMUP", "0") == "1"
+    # Bot ayağa kalkıp ilk güncellemeleri alsın diye ısınma biraz gecikir
+    DELAY = float(os.getenv("WARMUP_DELAY", "1"))
+    SYMBOLS = [s.strip() for s in os.getenv("WARMUP_SYMBOLS", "").split(",") if s.strip()]
+    INTERVAL = os.getenv("WARMUP_INTERVAL", "1d")
+
+    _task = None
+
+    @staticmethod
+    def _load_modules() -> dict:
+        """Henüz yüklenmemiş modülleri yükler; {modül: süre (sn)} döner."""
+        timings = {}
+        for name in HEAVY_MODULES:
+            started = time.perf_counter()
+            lazy.load(lazy.lazy_import(name))
+            timings[name] = time.perf_counter() - started
+        return timings
+
+    @staticmethod
+    def _prime_symbol(symbol: str) -> bool:
+        interval = WarmupService.INTERVAL
+        df = MarketDataService.get_historical_data(
+            symbol, period=MarketDataService.get_period_for_interval(interval, "1y"), interval=interval
+        )
+        if df is None:
+            return False
+        macro_interval = MarketDataService.get_macro_interval(interval)
+        MarketDataService.get_macro_data(
+            symbol, df, interval, macro_interval,
+            MarketDataService.get_period_for_interval(macro_interval, "2y"),
+        )
+        return True
+
+    @staticmethod
+    async def run():
+        """Isınma adımları; her biri "warmup.<adım>" aşaması olarak ölçülür. Hatalar botu durdurmaz."""
+        await asyncio.sleep(WarmupService.DELAY)
+        started = time.perf_counter()
+
+        # Worker süreçleri paralel açılsın diye önce havuzlar
+        ChartService.warm_up()
+        with Metrics.span("warmup.cpu_pool") as span:
+            if not await ExecutionService.run_cpu("analysis", _preload_worker):
+                span.fail()
+
+        with Metrics.span("warmup.modules"):
+            await ExecutionService.run_io("fetch", WarmupService._load_modules)
+
+        if ReportService.MODE == "queue":
+            queue = JobQueue.get()
+            for symbol in WarmupService.SYMBOLS:
+                payload = {"symbol": symbol, "interval": WarmupService.INTERVAL}
+                await ExecutionService.run_io("fetch", queue.enqueue, "analysis", payload, PRIORITY_LOW, 1)
+            print(f"🔥 Isınma tamamlandı ({(time.perf_counter() - started) * 1000:.0f} ms, semboller kuyrukta).")
+            return
+
+        for symbol in WarmupService.SYMBOLS:
+            ok = await Metrics.timed("warmup.prime", ExecutionService.run_io("fetch", WarmupService._prime_symbol, symbol))
+            if not ok:
+                print(f"[WarmupService] {symbol} ısıtılamadı.")
+
+        print(f"🔥 Isınma tamamlandı ({(time.perf_counter() - started) * 1000:.0f} ms).")
+
+    @staticmethod
+    def start():
+        """Çalışan event loop'ta ısınmayı arka plan task'ı olarak başlatır (kapalıysa None)."""
+        if not WarmupService.ENABLED or WarmupService._task is not None:
+            return None
+        WarmupService._task = asyncio.get_running_loop().create_task(WarmupService.run())
+        return WarmupService._task
+
+    @staticmethod
+    async def stop():
+        task, WarmupService._task = WarmupService._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,95 @@
+# tests/test_alerts.py
+import asyncio
+import pytest
+from telegram.error import Forbidden, NetworkError, RetryAfter
+from handlers.commands import _send_alerts
+from services.alert_service import AlertService
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(AlertService, "STORE_PATH", str(tmp_path / "alerts.sqlite"))
+    monkeypatch.setattr(AlertService, "SEND_RATE", 1000.0)
+    monkeypatch.setattr(AlertService, "_book", None)
+    monkeypatch.setattr(AlertService, "_store", None)
+    monkeypatch.setattr(AlertService, "_sending", {})
+
+class _Bot:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.delivered = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if outcome is not None:
+            raise outcome
+        self.delivered.append(chat_id)
+
+def _stored_ids():
+    return sorted(a["id"] for a in AlertService._store.load_all())
+
+def _trigger(chat_id: int):
+    alert = AlertService.add_alert(chat_id, chat_id, "THYAO", 300, 290)
+    assert [a["id"] for a in AlertService.collect_triggered({"THYAO": 301})] == [alert["id"]]
+    return alert
+
+def test_delivered_alert_is_deleted():
+    alert = _trigger(1)
+    bot = _Bot()
+    asyncio.run(_send_alerts(bot, [alert]))
+    assert bot.delivered == [1]
+    assert _stored_ids() == []
+    assert AlertService.list_alerts(1) == []
+
+@pytest.mark.parametrize("errors", [
+    [NetworkError("bağlantı koptu")],
+    [RetryAfter(0), RetryAfter(0)],
+])
+def test_failed_alert_is_retried_next_cycle(errors):
+    alert = _trigger(1)
+    asyncio.run(_send_alerts(_Bot(*errors), [alert]))
+    assert _stored_ids() == [alert["id"]]
+    assert [a["id"] for a in AlertService.list_alerts(1)] == [alert["id"]]
+
+    retry = AlertService.collect_triggered({"THYAO": 302})
+    bot = _Bot()
+    asyncio.run(_send_alerts(bot, retry))
+    assert bot.delivered == [1]
+    assert _stored_ids() == []
+
+def test_blocked_chat_is_dropped():
+    alert = _trigger(1)
+    asyncio.run(_send_alerts(_Bot(Forbidden("bot engellendi")), [alert]))
+    assert _stored_ids() == []
+    assert AlertService.list_alerts(1) == []
+
+def test_cancelled_fan_out_keeps_unsent_alerts():
+    alerts = [AlertService.add_alert(chat, chat, "THYAO", 300, 290) for chat in (1, 2, 3)]
+    triggered = AlertService.collect_triggered({"THYAO": 301})
+    assert len(triggered) == 3
+
+    class _SlowBot(_Bot):
+        async def send_message(self, chat_id, text, **kwargs):
+            if self.delivered:
+                await asyncio.sleep(10)  # bot kapanırken takılan gönderim
+            self.delivered.append(chat_id)
+
+    bot = _SlowBot()
+
+    async def scenario():
+        task = asyncio.create_task(_send_alerts(bot, triggered))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    delivered = triggered[0]["id"]
+    assert _stored_ids() == sorted(a["id"] for a in alerts if a["id"] != delivered)
+    assert len(AlertService.symbols()) == 1
+
+def test_alert_removed_while_sending_is_not_restored():
+    alert = _trigger(1)
+    assert AlertService.remove_alert(1, alert["id"]) is not None
+    asyncio.run(_send_alerts(_Bot(NetworkError("bağlantı koptu")), [alert]))
+    assert _stored_ids() == []
+    assert AlertService.list_alerts(1) == []
@@ -0,0 +1,66 @@
+# tests/test_chart_service.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from services import chart_service
+from services.bar_series import BarSeries
+from services.chart_service import ChartService
+
+@pytest.fixture
+def slow_pool(monkeypatch):
+    """Tek worker'lı havuz; render release set edilene kadar bitmez."""
+    release = threading.Event()
+
+    def render(tail, symbol, support, resistance):
+        release.wait(5)
+        return b"img", 1.0
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(chart_service, "_render_worker", render)
+    monkeypatch.setattr(ChartService, "_pool", pool)
+    monkeypatch.setattr(ChartService, "TIMEOUT", 0.05)
+    monkeypatch.setattr(ChartService, "QUEUE_DEPTH", 2)
+    monkeypatch.setattr(ChartService, "_orphaned", 0)
+    ChartService._cache.clear()
+    yield release
+    release.set()
+    pool.shutdown(wait=True)
+    ChartService._cache.clear()
+
+def _bars(n: int = 120) -> BarSeries:
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, n))
+    df = pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": np.ones(n)},
+        index=pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC"),
+    )
+    return BarSeries.from_frame(df)
+
+def test_timed_out_render_keeps_its_slot_until_done(slow_pool):
+    async def scenario():
+        df = _bars()
+        # 1. worker'da çalışır, 2. havuz kuyruğunda bekler; ikisi de süre aşar
+        first, second = await asyncio.gather(
+            ChartService.render(df, "A", "1d"), ChartService.render(df, "B", "1d"),
+        )
+        assert first is None and second is None
+        # Kuyruktaki iş iptal edildi, çalışan iş slotunu tutuyor
+        assert ChartService.stats()["orphaned"] == 1
+        assert ChartService.stats()["in_flight"] == 0
+
+        rejected = ChartService._stats["rejected"]
+        ChartService.QUEUE_DEPTH = 1
+        assert await ChartService.render(df, "C", "1d") is None
+        assert ChartService._stats["rejected"] == rejected + 1
+
+        slow_pool.set()
+        for _ in range(100):
+            if ChartService._orphaned == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert ChartService._orphaned == 0
+        assert await ChartService.render(df, "C", "1d") == b"img"
+
+    asyncio.run(scenario())
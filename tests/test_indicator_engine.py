@@ -0,0 +1,52 @@
+# tests/test_indicator_engine.py
+import numpy as np
+import pandas as pd
+from ta.trend import EMAIndicator
+from ta.momentum import RSIIndicator
+from services.bar_series import BarSeries
+from services.indicator_engine import IndicatorEngine, atr
+from services.analysis_service import AnalysisService
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.3, n),
+            "High": close + rng.uniform(0.1, 1, n),
+            "Low": close - rng.uniform(0.1, 1, n),
+            "Close": close,
+            "Volume": rng.uniform(1e3, 1e4, n),
+        },
+        index=pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC"),
+    )
+
+def test_atr_shorter_than_window_is_zero():
+    df = _frame(10)
+    out = atr(df["High"].to_numpy(), df["Low"].to_numpy(), df["Close"].to_numpy(), 14)
+    assert out.shape == (10,)
+    assert not out.any()
+
+def test_atr_empty_series():
+    empty = np.array([], dtype="float64")
+    assert atr(empty, empty, empty, 14).shape == (0,)
+
+def test_compute_short_frame():
+    result = IndicatorEngine.compute(BarSeries.from_frame(_frame(10)))
+    assert not result["atr"].any()
+    assert np.isnan(result["rsi"]).all()
+
+def test_mtf_trend_short_macro_frame_matches_ta():
+    # Kısa üst zaman dilimi "Hata" değil, ta ile aynı trend etiketini vermeli
+    df = _frame(10, seed=3)
+    close = df["Close"].iloc[-1]
+    ema50 = EMAIndicator(close=df["Close"], window=50).ema_indicator().iloc[-1]
+    rsi = RSIIndicator(close=df["Close"], window=14).rsi().iloc[-1]
+    if close > ema50:
+        expected = "YÜKSELİŞ (Güçlü) 🟢" if rsi > 50 else "YÜKSELİŞ (Zayıf) 🟢"
+    else:
+        expected = "DÜŞÜŞ (Güçlü) 🔴" if rsi < 50 else "DÜŞÜŞ (Zayıf) 🔴"
+
+    label, _ = AnalysisService.calculate_mtf_trend(BarSeries.from_frame(df))
+    assert label == expected
+    assert label != "Hata"
@@ -0,0 +1,50 @@
+# tests/test_job_queue.py
+import time
+import pytest
+from services.job_queue import JobQueueBackend, MemoryQueue, SQLiteQueue, PRIORITY_HIGH, PRIORITY_LOW
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request, tmp_path):
+    q = MemoryQueue() if request.param == "memory" else SQLiteQueue(str(tmp_path / "jobs.sqlite"))
+    yield q
+    q.close()
+
+def test_incomplete_backend_fails_on_creation():
+    class Partial(JobQueueBackend):
+        def enqueue(self, kind, payload, priority=5, max_attempts=3):
+            return "1"
+
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_claims_by_priority(queue):
+    low = queue.enqueue("x", {}, PRIORITY_LOW)
+    normal = queue.enqueue("x", {})
+    high = queue.enqueue("x", {}, PRIORITY_HIGH)
+    assert [queue.claim("w")["id"] for _ in range(3)] == [high, normal, low]
+    assert queue.claim("w") is None
+
+def test_retry_then_fail(queue):
+    job_id = queue.enqueue("x", {}, max_attempts=2)
+    queue.claim("w")
+    queue.fail(job_id, "boom", retry_delay=0.1)
+    assert queue.claim("w") is None  # gecikme dolmadan alınmaz
+    time.sleep(0.15)
+    assert queue.claim("w")["attempts"] == 2
+    queue.fail(job_id, "boom")
+    job = queue.get(job_id)
+    assert (job["status"], job["error"]) == ("failed", "boom")
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = queue.enqueue("x", {})
+    queue.claim("dead", lease=0.05)
+    time.sleep(0.1)
+    assert queue.claim("alive")["id"] == job_id
+
+def test_complete_keeps_result_and_blob(queue):
+    job_id = queue.enqueue("x", {"symbol": "THYAO"})
+    assert queue.claim("w")["payload"] == {"symbol": "THYAO"}
+    queue.complete(job_id, {"found": True}, b"png")
+    job = queue.get(job_id)
+    assert (job["status"], job["result"], job["blob"]) == ("done", {"found": True}, b"png")
+    assert queue.stats()["done"] == 1
@@ -0,0 +1,84 @@
+# tests/test_market_data.py
+import numpy as np
+import pandas as pd
+import pytest
+from services.bar_store import BarStore
+from services.market_data import MarketDataService
+
+TZ = "America/New_York"
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    bar_store = BarStore(str(tmp_path / "bars.sqlite"))
+    monkeypatch.setattr(MarketDataService, "_get_store", staticmethod(lambda: bar_store))
+    MarketDataService._cache.clear()
+    MarketDataService._no_data.clear()
+    yield bar_store
+    MarketDataService._cache.clear()
+    MarketDataService._no_data.clear()
+
+def _sessions(days):
+    """Her seans için 10:00-15:00 arası saatlik barlar (borsa saat diliminde)."""
+    index = pd.DatetimeIndex([
+        day + pd.Timedelta(hours=hour) for day in days for hour in range(10, 16)
+    ])
+    close = np.linspace(100.0, 110.0, len(index))
+    return pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0},
+        index=index,
+    )
+
+class _FakeYahoo:
+    """period isteğinde son N seansı, start isteğinde start'tan sonraki barları döner."""
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = []
+
+    def __call__(self, search_symbol, **kwargs):
+        self.calls.append(kwargs)
+        if "period" in kwargs:
+            sessions = MarketDataService.SESSION_PERIODS[kwargs["period"]]
+            days = self.frame.index.normalize().unique()[-sessions:]
+            return self.frame[self.frame.index.normalize().isin(days)]
+        return self.frame[self.frame.index >= kwargs["start"]]
+
+def _days(series):
+    return sorted(set(pd.DatetimeIndex(series.index).normalize()))
+
+def test_5d_period_counts_sessions_across_holiday(monkeypatch, store):
+    today = pd.Timestamp.now(tz=TZ).normalize()
+    # Uzun tatil: son 5 seans 10 takvim gününe yayılıyor
+    days = [today - pd.Timedelta(days=d) for d in (12, 11, 10, 4, 3, 2)]
+    yahoo = _FakeYahoo(_sessions(days))
+    monkeypatch.setattr(MarketDataService, "_download", staticmethod(yahoo))
+
+    first = MarketDataService.get_historical_data("AAPL", period="5d", interval="1h")
+    assert _days(first) == days[-5:]
+    assert [("period" in call) for call in yahoo.calls] == [True]
+
+    # İkinci istek depodan gelir; sadece kuyruk indirilir
+    MarketDataService._cache.clear()
+    second = MarketDataService.get_historical_data("AAPL", period="5d", interval="1h")
+    assert _days(second) == days[-5:]
+    assert len(second) == len(first)
+    assert [("period" in call) for call in yahoo.calls] == [True, False]
+
+    # Yeni seans gelince en eski seans pencereden düşer
+    days.append(today - pd.Timedelta(days=1))
+    yahoo.frame = _sessions(days)
+    MarketDataService._cache.clear()
+    third = MarketDataService.get_historical_data("AAPL", period="5d", interval="1h")
+    assert _days(third) == days[-5:]
+    assert [("period" in call) for call in yahoo.calls] == [True, False, False]
+
+def test_1d_period_loads_last_session_from_longer_coverage(monkeypatch, store):
+    today = pd.Timestamp.now(tz=TZ).normalize()
+    days = [today - pd.Timedelta(days=d) for d in (8, 7, 6, 5, 4)]
+    yahoo = _FakeYahoo(_sessions(days))
+    monkeypatch.setattr(MarketDataService, "_download", staticmethod(yahoo))
+
+    MarketDataService.get_historical_data("AAPL", period="5d", interval="1h")
+    MarketDataService._cache.clear()
+    last = MarketDataService.get_historical_data("AAPL", period="1d", interval="1h")
+    assert _days(last) == days[-1:]
+    assert [("period" in call) for call in yahoo.calls] == [True, False]
@@ -0,0 +1,66 @@
+# tests/test_media_cache.py
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from services.bar_series import BarSeries
+from services.chart_service import ChartService
+from services.media_cache import MediaCache
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    MediaCache.clear()
+    yield
+    MediaCache.clear()
+
+def _bars(last_close: float, last_volume: float = 1000.0) -> BarSeries:
+    n = 60
+    close = np.linspace(100, 110, n)
+    close[-1] = last_close
+    volume = np.full(n, 500.0)
+    volume[-1] = last_volume
+    df = pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": volume},
+        index=pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC"),
+    )
+    return BarSeries.from_frame(df)
+
+class _Photo:
+    def __init__(self, file_id):
+        self.file_id = file_id
+
+class _Message:
+    def __init__(self, file_id):
+        self.photo = [_Photo(file_id)]
+
+class _Bot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        self.sent.append(photo)
+        return _Message(f"file-{len(self.sent)}")
+
+def test_open_bar_update_changes_chart_key():
+    morning, afternoon = _bars(110.0), _bars(112.5, 4000.0)
+    assert morning.last_time == afternoon.last_time
+    assert ChartService.cache_key(morning, "THYAO", "1d", 100, 120) != ChartService.cache_key(afternoon, "THYAO", "1d", 100, 120)
+    assert ChartService.cache_key(morning, "THYAO", "1d", 100, 120) == ChartService.cache_key(_bars(110.0), "THYAO", "1d", 100, 120)
+
+def test_revised_open_bar_is_uploaded_again():
+    bot = _Bot()
+
+    async def send(df, image):
+        async def load():
+            return image
+        key = ChartService.cache_key(df, "THYAO", "1d", 100, 120)
+        await MediaCache.send_photo(bot, 1, key, load)
+
+    async def scenario():
+        await send(_bars(110.0), b"10:05")
+        await send(_bars(110.0), b"10:06")      # aynı bar, aynı hal -> file_id
+        await send(_bars(112.5, 4000.0), b"17:00")  # açık bar güncellendi -> yeniden yükleme
+        await send(_bars(110.0), b"eski")       # eski hal artık tutulmaz
+
+    asyncio.run(scenario())
+    assert bot.sent == [b"10:05", "file-1", b"17:00", b"eski"]
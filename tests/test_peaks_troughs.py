@@ -0,0 +1,74 @@
+# tests/test_peaks_troughs.py
+import numpy as np
+import pandas as pd
+import pytest
+from services.analysis_service import AnalysisService
+
+def _reference(series, window=3):
+    """Vektörleştirmeden önceki döngü (karşılaştırma için aynen korunur)."""
+    peaks = []
+    troughs = []
+    for i in range(window, len(series) - window):
+        current = series.iloc[i]
+        is_peak = all(current > series.iloc[i-w] for w in range(1, window+1)) and \
+                  all(current > series.iloc[i+w] for w in range(1, window+1))
+        if is_peak:
+            peaks.append((series.index[i], current, i))
+        is_trough = all(current < series.iloc[i-w] for w in range(1, window+1)) and \
+                    all(current < series.iloc[i+w] for w in range(1, window+1))
+        if is_trough:
+            troughs.append((series.index[i], current, i))
+    return peaks, troughs
+
+def _series(values) -> pd.Series:
+    values = np.asarray(values, dtype="float64")
+    return pd.Series(values, index=pd.date_range("2024-01-01", periods=len(values), freq="h", tz="UTC"))
+
+def _random_walk(seed: int, n: int = 300) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(0, 1, n))
+
+def _with_nans(seed: int) -> np.ndarray:
+    values = _random_walk(seed)
+    rng = np.random.default_rng(seed + 100)
+    values[rng.choice(len(values), 30, replace=False)] = np.nan
+    values[:5] = np.nan  # RSI başındaki gibi
+    return values
+
+def _plateaus(seed: int) -> np.ndarray:
+    # Yuvarlanmış fiyatlar: eşit komşular ve düz tepe/dip bölgeleri
+    values = np.round(_random_walk(seed) / 2) * 2
+    values[50:60] = values[50]
+    values[120:123] = values[119] + 5
+    return values
+
+CASES = {
+    **{f"walk-{s}": _random_walk(s) for s in range(5)},
+    **{f"nan-{s}": _with_nans(s) for s in range(3)},
+    **{f"plateau-{s}": _plateaus(s) for s in range(3)},
+    "flat": np.full(40, 7.0),
+    "zigzag": np.tile([1.0, 3.0, 2.0, 5.0, 0.5], 20),
+    "empty": np.array([]),
+    **{f"short-{n}": _random_walk(n, n) for n in range(1, 8)},
+}
+
+@pytest.mark.parametrize("window", [1, 2, 3])
+@pytest.mark.parametrize("name", list(CASES))
+def test_matches_reference_loop(name, window):
+    series = _series(CASES[name])
+    assert AnalysisService._get_peaks_troughs(series, window=window) == _reference(series, window=window)
+
+@pytest.mark.parametrize("window", [1, 2, 3])
+def test_plain_array_uses_positions(window):
+    values = _random_walk(7)
+    expected = _reference(pd.Series(values), window=window)
+    assert AnalysisService._get_peaks_troughs(values, window=window) == expected
+
+@pytest.mark.parametrize("window", [1, 2, 3])
+def test_panel_columns_match_single_series(window):
+    panel = np.column_stack([_random_walk(1), _with_nans(2), _plateaus(3)])
+    is_peak, is_trough = AnalysisService._pivot_masks(panel, window)
+    for col in range(panel.shape[1]):
+        peaks, troughs = _reference(pd.Series(panel[:, col]), window=window)
+        assert list(np.flatnonzero(is_peak[:, col])) == [p[2] for p in peaks]
+        assert list(np.flatnonzero(is_trough[:, col])) == [t[2] for t in troughs]
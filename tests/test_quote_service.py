@@ -0,0 +1,68 @@
+# tests/test_quote_service.py
+import asyncio
+import threading
+import time
+import pytest
+from services.market_data import MarketDataService
+from services.quote_service import QuoteService
+from services.symbol_directory import SymbolDirectory
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(MarketDataService, "_get_store", staticmethod(lambda: None))
+    monkeypatch.setattr(SymbolDirectory, "PATH", "")
+    monkeypatch.setattr(SymbolDirectory, "_entries", None)
+    monkeypatch.setattr(QuoteService, "_meta", {})
+    QuoteService._cache.clear()
+    QuoteService._meta_flights.clear()
+    QuoteService._not_found.clear()
+    SymbolDirectory._unknown.clear()
+    yield
+    QuoteService._cache.clear()
+    SymbolDirectory._unknown.clear()
+
+def test_cold_quotes_batch_prices_and_fetch_meta_concurrently(monkeypatch):
+    symbols = ["THYAO", "GARAN", "AKBNK", "ASELS", "SISE"]
+    batches = []
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def download(search_symbols):
+        batches.append(list(search_symbols))
+        return {s: 10.0 for s in search_symbols if s != "SISE.IS"}
+
+    def fast(search_symbol):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.1)
+        with lock:
+            active["now"] -= 1
+        QuoteService._remember_meta(search_symbol, {"currency": "TRY", "exchange": "IST", "timezone": None})
+        return 11.0
+
+    monkeypatch.setattr(QuoteService, "_download_prices", staticmethod(download))
+    monkeypatch.setattr(QuoteService, "_fetch_fast", staticmethod(fast))
+
+    quotes = asyncio.run(QuoteService.get_quotes(symbols))
+
+    assert len(batches) == 1 and len(batches[0]) == len(symbols)
+    assert active["max"] > 1  # fast_info çağrıları ardışık değil
+    assert {s: q["currency"] for s, q in quotes.items()} == dict.fromkeys(symbols, "TRY")
+    assert quotes["THYAO"]["price"] == 10.0
+    assert quotes["SISE"]["price"] == 11.0  # toplu istekte yoksa fast_info fiyatı
+
+def test_warm_meta_skips_fast_info(monkeypatch):
+    QuoteService._meta["THYAO.IS"] = {"currency": "TRY", "exchange": "IST", "timezone": None}
+    monkeypatch.setattr(QuoteService, "_download_prices", staticmethod(lambda syms: {s: 5.0 for s in syms}))
+    monkeypatch.setattr(QuoteService, "_fetch_fast", staticmethod(lambda s: pytest.fail("fast_info çağrılmamalı")))
+    quotes = asyncio.run(QuoteService.get_quotes(["THYAO"]))
+    assert quotes["THYAO"]["price"] == 5.0
+
+def test_missing_symbol_is_marked_unknown(monkeypatch):
+    monkeypatch.setattr(QuoteService, "_download_prices", staticmethod(lambda syms: {}))
+    # fast_info "sembol yok" yanıtı
+    monkeypatch.setattr(QuoteService, "_fetch_fast", staticmethod(lambda s: QuoteService._not_found.set(s, True)))
+    assert asyncio.run(QuoteService.get_quotes(["KRDMA"])) == {"KRDMA": None}
+    assert SymbolDirectory.is_unknown("KRDMA")
+    assert asyncio.run(QuoteService.get_quotes(["KRDMA"])) == {"KRDMA": None}
@@ -0,0 +1,71 @@
+# tests/test_report_service.py
+import asyncio
+import pandas as pd
+import pytest
+import yfinance
+from services.market_data import MarketDataService
+from services.quote_service import QuoteService
+from services.report_service import ReportService
+from services.symbol_directory import SymbolDirectory
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(ReportService, "MODE", "local")
+    monkeypatch.setattr(MarketDataService, "_get_store", staticmethod(lambda: None))
+    monkeypatch.setattr(SymbolDirectory, "PATH", "")
+    monkeypatch.setattr(SymbolDirectory, "_entries", None)
+    monkeypatch.setattr(QuoteService, "_meta", {})
+    caches = (
+        MarketDataService._cache, MarketDataService._no_data, QuoteService._cache,
+        QuoteService._meta_flights, QuoteService._not_found, SymbolDirectory._unknown, ReportService._cache,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
+
+def _outage(*args, **kwargs):
+    raise ConnectionError("Yahoo'ya ulaşılamıyor")
+
+class _MissingTicker:
+    """Yahoo'nun tanımadığı sembol: boş geçmiş, fast_info metadata'sız."""
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, **kwargs):
+        return pd.DataFrame()
+
+    @property
+    def fast_info(self):
+        class _Info:
+            @property
+            def last_price(self):
+                raise KeyError("currentTradingPeriod")
+        return _Info()
+
+def test_outage_does_not_mark_symbol_unknown(monkeypatch):
+    monkeypatch.setattr(yfinance, "Ticker", _outage)
+    monkeypatch.setattr(yfinance, "download", _outage)
+
+    assert asyncio.run(ReportService.get("AAPL", "1d")) is None
+    assert not SymbolDirectory.is_unknown("AAPL")
+    assert asyncio.run(QuoteService.get_quotes(["AAPL", "KRDMA"])) == {"AAPL": None, "KRDMA": None}
+    assert not SymbolDirectory.is_unknown("AAPL")
+    assert not SymbolDirectory.is_unknown("KRDMA")
+    # Ağ düzelince sembol düzeltilmeden olduğu gibi denenir
+    assert SymbolDirectory.resolve("KRDMA")["symbol"] == "KRDMA"
+
+def test_yahoo_not_found_marks_symbol_unknown(monkeypatch):
+    monkeypatch.setattr(yfinance, "Ticker", _MissingTicker)
+
+    assert asyncio.run(ReportService.get("THYOA", "1d")) is None
+    assert SymbolDirectory.is_unknown("THYOA")
+    assert SymbolDirectory.resolve("THYOA")["symbol"] == "THYAO"
+
+def test_failed_batch_alone_does_not_mark_unknown(monkeypatch):
+    # Metadata bilinen sembolde fast_info çağrılmaz; toplu istek hatası geçicidir
+    QuoteService._meta["GARAN.IS"] = {"currency": "TRY", "exchange": "IST", "timezone": None}
+    monkeypatch.setattr(yfinance, "download", _outage)
+    assert asyncio.run(QuoteService.get_quotes(["GARAN", "AKBNK"]))["GARAN"] is None
+    assert not SymbolDirectory.is_unknown("GARAN")
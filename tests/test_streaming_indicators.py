@@ -0,0 +1,61 @@
+# tests/test_streaming_indicators.py
+import numpy as np
+import pandas as pd
+import pytest
+from services.indicator_engine import IndicatorEngine
+from services.streaming_indicators import _StreamingIndicator, EMAState, StreamingIndicatorSet
+
+KEYS = ("rsi", "macd", "macd_signal", "atr", "obv", "ema50")
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "Open": close + rng.normal(0, 0.3, n),
+            "High": close + rng.uniform(0.1, 1, n),
+            "Low": close - rng.uniform(0.1, 1, n),
+            "Close": close,
+            "Volume": rng.uniform(1e3, 1e4, n),
+        },
+        index=pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC"),
+    )
+
+def _assert_matches_batch(snapshot: dict, df: pd.DataFrame):
+    batch = IndicatorEngine.compute(df)
+    for key in KEYS:
+        assert np.isclose(snapshot[key], batch[key][-1]), key
+
+def test_indicator_without_apply_fails_on_creation():
+    class Broken(_StreamingIndicator):
+        _fields = ("value",)
+
+    with pytest.raises(TypeError):
+        Broken()
+
+def test_revising_last_bar_restores_previous_state():
+    ema = EMAState(2)
+    ema.update(10.0)
+    ema.update(20.0)
+    revised = ema.update(30.0, new_bar=False)
+    fresh = EMAState(2)
+    fresh.update(10.0)
+    assert revised == fresh.update(30.0)
+
+def test_streaming_matches_batch_with_revisions():
+    df = _frame(300, seed=3)
+    state = StreamingIndicatorSet.from_frame(df.iloc[:200])
+    _assert_matches_batch(state.snapshot(), df.iloc[:200])
+
+    rng = np.random.default_rng(7)
+    for i in range(200, len(df)):
+        ts, final = df.index[i], df.iloc[i]
+        # Bar kapanana kadar aynı zaman damgasıyla birkaç kez revize edilir
+        for _ in range(2):
+            draft = df.iloc[: i + 1].copy()
+            close = final["Close"] + rng.normal(0, 0.5)
+            draft.iloc[-1] = [close, close + 0.5, close - 0.5, close, final["Volume"] * rng.uniform(0.2, 1)]
+            snapshot = state.update_bar(ts, *draft.iloc[-1])
+            _assert_matches_batch(snapshot, draft)
+        snapshot = state.update_bar(ts, *final)
+        _assert_matches_batch(snapshot, df.iloc[: i + 1])
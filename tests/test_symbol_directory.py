@@ -0,0 +1,42 @@
+# tests/test_symbol_directory.py
+import pytest
+from services.market_data import MarketDataService
+from services.symbol_directory import SymbolDirectory
+
+@pytest.fixture(autouse=True)
+def directory(monkeypatch):
+    """Sadece yerleşik listelerden kurulan dizin (CSV ve bar deposu yok)."""
+    monkeypatch.setattr(SymbolDirectory, "PATH", "")
+    monkeypatch.setattr(MarketDataService, "_get_store", staticmethod(lambda: None))
+    monkeypatch.setattr(SymbolDirectory, "_entries", None)
+    SymbolDirectory._unknown.clear()
+    yield
+    SymbolDirectory._unknown.clear()
+
+@pytest.mark.parametrize("symbol, near", [("KRDMA", "KRDMD"), ("KRDMB", "KRDMD"), ("ALBRK", "ALARK")])
+def test_unlisted_real_tickers_are_not_replaced(symbol, near):
+    # Dizinde olmayan gerçek semboller bir harf uzaktaki başka şirkete çevrilmez
+    resolved = SymbolDirectory.resolve(symbol)
+    assert resolved["symbol"] == symbol
+    assert resolved["corrected"] is False
+    assert near in resolved["suggestions"]
+
+def test_listed_symbol_is_used_as_is():
+    assert SymbolDirectory.resolve("krdmd") == {"symbol": "KRDMD", "corrected": False, "suggestions": []}
+
+def test_typo_is_corrected_once_known_unknown():
+    assert SymbolDirectory.resolve("THYOA")["symbol"] == "THYOA"
+    SymbolDirectory.mark_unknown("THYOA")
+    assert SymbolDirectory.resolve("THYOA") == {"symbol": "THYAO", "corrected": True, "suggestions": ["THYAO"]}
+
+def test_ambiguous_unknown_symbol_is_rejected():
+    SymbolDirectory.mark_unknown("KOZAX")
+    resolved = SymbolDirectory.resolve("KOZAX")
+    assert resolved["symbol"] is None
+    assert set(resolved["suggestions"]) == {"KOZAL", "KOZAA"}
+
+def test_learned_symbol_leaves_negative_cache():
+    SymbolDirectory.mark_unknown("KRDMA")
+    SymbolDirectory.learn("KRDMA")
+    assert SymbolDirectory.resolve("KRDMA") == {"symbol": "KRDMA", "corrected": False, "suggestions": []}
+    assert "KRDMA" not in SymbolDirectory.suggestions("KRDMA")
@@ -0,0 +1,83 @@
+# worker.py
+"""
+/analiz worker süreçleri (ANALYSIS_MODE=queue). Bot işleri kuyruğa ekler; bu süreçler veriyi
+çeker, analiz eder, grafiği çizer ve sonucu kuyruğa geri yazar.
+
+Kullanım:
+    python worker.py                  # tek worker
+    python worker.py --processes 4    # 4 worker süreci
+    python worker.py status           # kuyruk ve worker durumu
+"""
+import sys
+import time
+import signal
+import argparse
+import threading
+import multiprocessing
+from dotenv import load_dotenv
+
+# Servisler ayarlarını (.env) import anında okur; bu yüzden önce yüklenir
+load_dotenv()
+
+from services.job_queue import JobQueue
+from services.analysis_worker import AnalysisWorker
+
+def _run_worker():
+    """Worker süreci: SIGTERM/SIGINT gelince elindeki işi bitirip çıkar."""
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    AnalysisWorker.run(JobQueue.get(), stop=stop)
+
+def print_status() -> int:
+    queue = JobQueue.get()
+    stats = queue.stats()
+    print(f"kuyruk ({JobQueue.BACKEND}): sırada {stats['queued']} | çalışan {stats['running']} | "
+          f"biten {stats['done']} | başarısız {stats['failed']} | tekrar denenen {stats['retried']}")
+    if stats["by_priority"]:
+        print("sıradaki (öncelik: adet): " + ", ".join(f"{p}: {n}" for p, n in stats["by_priority"].items()))
+    workers = queue.workers()
+    if not workers:
+        print("kayıtlı worker yok")
+    now = time.time()
+    for w in workers:
+        health = "✅" if w["healthy"] else "❌"
+        job = f"iş #{w['current_job']}" if w.get("current_job") else "boşta"
+        print(f"{health} {w['worker']:<28} {job:<12} biten {w.get('processed', 0):<6} hata {w.get('failed', 0):<4} "
+              f"son iş {w.get('last_job_ms') or '-'} ms | {now - w['last_seen']:.0f} sn önce")
+    return 0 if any(w["healthy"] for w in workers) else 1
+
+def main():
+    parser = argparse.ArgumentParser(description="/analiz worker süreçleri")
+    parser.add_argument("command", nargs="?", default="run", choices=("run", "status"))
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        sys.exit(print_status())
+
+    if JobQueue.BACKEND == "memory":
+        print("🚨 HATA: JOB_QUEUE_BACKEND=memory süreçler arası paylaşılamaz; bot kendi worker thread'lerini başlatır.")
+        sys.exit(1)
+
+    if args.processes <= 1:
+        _run_worker()
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_run_worker, name=f"analysis-worker-{i}") for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    print(f"✅ {len(processes)} worker süreci başlatıldı.")
+
+    def stop_all(*_):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()  # SIGTERM: iş bitince çıkar
+    signal.signal(signal.SIGTERM, stop_all)
+    signal.signal(signal.SIGINT, stop_all)
+    for process in processes:
+        process.join()
+
+if __name__ == "__main__":
+    main()